@@ -0,0 +1,263 @@
+from agrupamiento import agrupar, sumar_por_clave
+from cuantiles import SketchCuantiles
+import vectorizado
+
+class SumasParciales:
+    """
+    Sumas de un conjunto de transacciones, sin los agregados derivados (por ejemplo, las de un balde de tiempo).
+
+    Atributos:
+    - `acciones_por_usuario` / `inversion_por_usuario` (dict): id de usuario -> acciones / centavos acumulados.
+    - `acciones_por_empresa` / `inversion_por_empresa` (dict): id de empresa -> acciones / centavos acumulados.
+    - `tenencias` (dict): (id de usuario, id de empresa) -> acciones acumuladas del par.
+    - `inversion_total` (int, centavos) y `total_acciones` (int): totales de la cartera.
+    - `cuantiles_transacciones` (SketchCuantiles): sketch del total invertido por transacción, en centavos.
+
+    Comportamiento:
+    - Es lo único que hace falta para combinar rangos de filas (`combinar`): no mantiene la mayor tenencia
+      por usuario ni el orden de las tenencias, que se derivan al final con `reporte.completar_mayores`.
+    - Todos los diccionarios conservan el orden de primera aparición, igual que las consultas originales.
+    - Todas las sumas son enteras, por lo que son exactas y no dependen del orden en que se acumulan.
+    """
+
+    def __init__(self) -> None:
+        self.acciones_por_usuario = {}
+        self.inversion_por_usuario = {}
+        self.acciones_por_empresa = {}
+        self.inversion_por_empresa = {}
+        self.tenencias = {}
+        self.inversion_total = 0
+        self.total_acciones = 0
+        self.cuantiles_transacciones = SketchCuantiles()
+
+    def registrar(self, id_usuario: int, id_empresa: int, cantidad: int, total: int) -> None:
+        """
+        Suma una transacción a los diccionarios, los totales y el sketch.
+
+        Args:
+            id_usuario (int): Id del usuario en el almacén.
+            id_empresa (int): Id de la empresa en el almacén.
+            cantidad (int): Cantidad de acciones adquiridas.
+            total (int): Total invertido en la transacción, en centavos.
+
+        Retorno:
+        None
+        """
+        self.acciones_por_usuario[id_usuario] = self.acciones_por_usuario.get(id_usuario, 0) + cantidad
+        self.inversion_por_usuario[id_usuario] = self.inversion_por_usuario.get(id_usuario, 0) + total
+        self.acciones_por_empresa[id_empresa] = self.acciones_por_empresa.get(id_empresa, 0) + cantidad
+        self.inversion_por_empresa[id_empresa] = self.inversion_por_empresa.get(id_empresa, 0) + total
+        self.inversion_total += total
+        self.total_acciones += cantidad
+        self.cuantiles_transacciones.agregar(total)
+        par = (id_usuario, id_empresa)
+        self.tenencias[par] = self.tenencias.get(par, 0) + cantidad
+        return None
+
+    def combinar(self, otro: "SumasParciales") -> None:
+        """
+        Suma a estos agregados los de otro rango de filas posterior (por ejemplo, otro fragmento o balde).
+
+        Comportamiento:
+        - Las claves nuevas quedan después de las existentes, en el orden en que aparecen en `otro`.
+        - No actualiza la mayor tenencia por usuario: una vez combinados todos los rangos se deriva
+          con `reporte.completar_mayores`.
+
+        Retorno:
+        None
+        """
+        for nombre in ("acciones_por_usuario", "inversion_por_usuario", "acciones_por_empresa", "inversion_por_empresa", "tenencias"):
+            destino = getattr(self, nombre)
+            for clave, valor in getattr(otro, nombre).items():
+                acumulado = destino.get(clave)
+                destino[clave] = valor if acumulado is None else acumulado + valor
+        self.inversion_total += otro.inversion_total
+        self.total_acciones += otro.total_acciones
+        self.cuantiles_transacciones.combinar(otro.cuantiles_transacciones)
+        return None
+
+    def extraer(self, ids_usuarios, ids_empresas, pares) -> "SumasParciales":
+        """
+        Copia los valores actuales de las claves indicadas (0 si todavía no existen), en ese orden.
+
+        Args:
+            ids_usuarios, ids_empresas, pares (iterable): Claves de usuario, de empresa y (usuario, empresa).
+
+        Comportamiento:
+        - Junto con `restar`, permite obtener cuánto sumó un bloque de transacciones a los agregados
+          leyendo sólo las claves que tocó, en O(claves) y no O(transacciones).
+        - Copia también los totales; no copia el sketch de cuantiles.
+
+        Retorno:
+        - (SumasParciales): Sumas con sólo las claves pedidas.
+        """
+        copia = SumasParciales()
+        for id_usuario in ids_usuarios:
+            copia.acciones_por_usuario[id_usuario] = self.acciones_por_usuario.get(id_usuario, 0)
+            copia.inversion_por_usuario[id_usuario] = self.inversion_por_usuario.get(id_usuario, 0)
+        for id_empresa in ids_empresas:
+            copia.acciones_por_empresa[id_empresa] = self.acciones_por_empresa.get(id_empresa, 0)
+            copia.inversion_por_empresa[id_empresa] = self.inversion_por_empresa.get(id_empresa, 0)
+        for par in pares:
+            copia.tenencias[par] = self.tenencias.get(par, 0)
+        copia.inversion_total = self.inversion_total
+        copia.total_acciones = self.total_acciones
+        return copia
+
+    def restar(self, anteriores: "SumasParciales") -> None:
+        """
+        Resta, clave por clave, unas sumas extraídas antes con las mismas claves (ver `extraer`).
+
+        Retorno:
+        None
+        """
+        for nombre in ("acciones_por_usuario", "inversion_por_usuario", "acciones_por_empresa", "inversion_por_empresa", "tenencias"):
+            destino = getattr(self, nombre)
+            for clave, valor in getattr(anteriores, nombre).items():
+                destino[clave] -= valor
+        self.inversion_total -= anteriores.inversion_total
+        self.total_acciones -= anteriores.total_acciones
+        return None
+
+class AgregadosIncrementales(SumasParciales):
+    """
+    Agregados materializados de la cartera, actualizados en O(1) por cada transacción registrada.
+
+    Atributos:
+    - Los de `SumasParciales` (sumas por usuario, por empresa y por par, totales y sketch de cuantiles).
+    - `mayor_por_usuario` (dict): id de usuario -> [id de empresa, acciones] de su mayor tenencia.
+
+    Comportamiento:
+    - La cantidad de usuarios distintos es `len(inversion_por_usuario)`.
+    - Ante un empate en la mayor tenencia de un usuario gana la empresa que apareció primero para ese usuario.
+    - El sketch de cuantiles recibe los totales en orden de registro, por lo que registrar fila por fila
+      y reconstruir con `desde_columnas` producen el mismo sketch.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.orden_tenencias = {}
+        self.mayor_por_usuario = {}
+
+    def registrar(self, id_usuario: int, id_empresa: int, cantidad: int, total: int) -> None:
+        """
+        Incorpora una transacción a todos los agregados.
+
+        Args:
+            id_usuario (int): Id del usuario en el almacén.
+            id_empresa (int): Id de la empresa en el almacén.
+            cantidad (int): Cantidad de acciones adquiridas.
+            total (int): Total invertido en la transacción, en centavos.
+
+        Retorno:
+        None
+        """
+        self.acciones_por_usuario[id_usuario] = self.acciones_por_usuario.get(id_usuario, 0) + cantidad
+        self.inversion_por_usuario[id_usuario] = self.inversion_por_usuario.get(id_usuario, 0) + total
+        self.acciones_por_empresa[id_empresa] = self.acciones_por_empresa.get(id_empresa, 0) + cantidad
+        self.inversion_por_empresa[id_empresa] = self.inversion_por_empresa.get(id_empresa, 0) + total
+        self.inversion_total += total
+        self.total_acciones += cantidad
+        self.cuantiles_transacciones.agregar(total)
+
+        par = (id_usuario, id_empresa)
+        tenencia = self.tenencias.get(par)
+        if tenencia is None:
+            tenencia = 0
+            self.orden_tenencias[par] = len(self.orden_tenencias)
+        tenencia += cantidad
+        self.tenencias[par] = tenencia
+        self._actualizar_mayor(id_usuario, id_empresa, tenencia)
+        return None
+
+    def _actualizar_mayor(self, id_usuario: int, id_empresa: int, tenencia: int) -> None:
+        """
+        Actualiza la mayor tenencia del usuario tras modificar la tenencia de (usuario, empresa).
+
+        Comportamiento:
+        - Las tenencias sólo crecen, por lo que basta comparar contra la mayor actual.
+        - En caso de empate se queda con la empresa cuyo par apareció primero.
+
+        Retorno:
+        None
+        """
+        mayor_actual = self.mayor_por_usuario.get(id_usuario)
+        if mayor_actual is None:
+            self.mayor_por_usuario[id_usuario] = [id_empresa, tenencia]
+        elif mayor_actual[0] == id_empresa:
+            mayor_actual[1] = tenencia
+        elif tenencia > mayor_actual[1] or (
+            tenencia == mayor_actual[1]
+            and self.orden_tenencias[(id_usuario, id_empresa)] < self.orden_tenencias[(id_usuario, mayor_actual[0])]
+        ):
+            self.mayor_por_usuario[id_usuario] = [id_empresa, tenencia]
+        return None
+
+    @classmethod
+    def desde_columnas(cls, usuarios, empresas, cantidades, totales) -> "AgregadosIncrementales":
+        """
+        Reconstruye los agregados a partir de las columnas completas de un almacén.
+
+        Args:
+            usuarios, empresas, cantidades, totales (sequence): Columnas del almacén.
+
+        Comportamiento:
+        - Usa el motor de `agrupamiento`: una pasada por usuario (acciones y USD a la vez), una por empresa
+          y una por par (usuario, empresa).
+        - Deriva la mayor tenencia de cada usuario recorriendo los pares, no las transacciones.
+        - Pensado para cargas masivas o reinicios; en el uso normal los agregados se mantienen con `registrar`.
+        - Con el backend de NumPy activo, las sumas por grupo se hacen en int64 con `np.add.at` (mismos resultados).
+        - El sketch de cuantiles se alimenta con una pasada más sobre los totales, en orden.
+
+        Retorno:
+        - (AgregadosIncrementales): Agregados equivalentes a registrar fila por fila.
+        """
+        agregados = cls()
+        if vectorizado.numpy_activo():
+            agregados._sumar_con_numpy(usuarios, empresas, cantidades, totales)
+        else:
+            agregados._sumar_en_python(usuarios, empresas, cantidades, totales)
+        agregados.cuantiles_transacciones.extender(totales)
+        for par, tenencia in agregados.tenencias.items():
+            agregados.orden_tenencias[par] = len(agregados.orden_tenencias)
+            mayor_actual = agregados.mayor_por_usuario.get(par[0])
+            if mayor_actual is None or tenencia > mayor_actual[1]:
+                agregados.mayor_por_usuario[par[0]] = [par[1], tenencia]
+        return agregados
+
+    def _sumar_en_python(self, usuarios, empresas, cantidades, totales) -> None:
+        """
+        Calcula las sumas por usuario, por empresa y por par con el motor de `agrupamiento`.
+
+        Retorno:
+        None
+        """
+        por_usuario = agrupar(usuarios, [("suma", cantidades), ("suma", totales)])
+        for id_usuario, (acciones, inversion) in por_usuario.items():
+            self.acciones_por_usuario[id_usuario] = acciones
+            self.inversion_por_usuario[id_usuario] = inversion
+            self.total_acciones += acciones
+        por_empresa = agrupar(empresas, [("suma", cantidades), ("suma", totales)])
+        for id_empresa, (acciones, inversion) in por_empresa.items():
+            self.acciones_por_empresa[id_empresa] = acciones
+            self.inversion_por_empresa[id_empresa] = inversion
+        for i in range(len(totales)):
+            self.inversion_total += totales[i]
+        self.tenencias = sumar_por_clave(list(zip(usuarios, empresas)), cantidades)
+        return None
+
+    def _sumar_con_numpy(self, usuarios, empresas, cantidades, totales) -> None:
+        """
+        Calcula las mismas sumas que `_sumar_en_python` con reducciones enteras (`np.add.at`) sobre los ids.
+
+        Retorno:
+        None
+        """
+        self.acciones_por_usuario = vectorizado.sumas_por_clave(usuarios, cantidades, enteros=True)
+        self.inversion_por_usuario = vectorizado.sumas_por_clave(usuarios, totales, enteros=True)
+        self.acciones_por_empresa = vectorizado.sumas_por_clave(empresas, cantidades, enteros=True)
+        self.inversion_por_empresa = vectorizado.sumas_por_clave(empresas, totales, enteros=True)
+        self.inversion_total = vectorizado.suma_entera(totales)
+        self.total_acciones = sum(self.acciones_por_usuario.values())
+        self.tenencias = vectorizado.sumas_por_par(usuarios, empresas, cantidades)
+        return None
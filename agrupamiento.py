@@ -0,0 +1,74 @@
+OPERACIONES = ("suma", "conteo", "maximo", "minimo")
+
+def agrupar(claves, agregados: list) -> dict:
+    """
+    Agrupa filas por clave y calcula varios agregados en una sola pasada.
+
+    Args:
+        claves (sequence): Columna de claves. Para claves compuestas puede ser una secuencia de tuplas
+            (por ejemplo `list(zip(usuarios, empresas))`).
+        agregados (list): Lista de pares (operacion, columna). `operacion` es "suma", "conteo", "maximo"
+            o "minimo"; para "conteo" la columna puede ser None.
+
+    Comportamiento:
+    - Recorre las filas una única vez, ubicando el grupo de cada clave en un diccionario (O(1) por fila).
+    - Cada grupo guarda una lista de acumuladores, uno por agregado pedido y en el mismo orden.
+    - Los grupos conservan el orden de primera aparición de cada clave.
+
+    Retorno:
+    - (dict): clave -> [acumulador_1, acumulador_2, ...].
+    """
+    operaciones = []
+    columnas = []
+    for i in range(len(agregados)):
+        operacion, columna = agregados[i]
+        if operacion not in OPERACIONES:
+            raise ValueError(f"Operación de agregación desconocida: {operacion}")
+        operaciones += [operacion]
+        columnas += [columna]
+
+    grupos = {}
+    for i in range(len(claves)):
+        clave = claves[i]
+        acumuladores = grupos.get(clave)
+        if acumuladores is None:
+            acumuladores = []
+            for k in range(len(operaciones)):
+                if operaciones[k] == "conteo":
+                    acumuladores += [1]
+                else:
+                    acumuladores += [columnas[k][i]]
+            grupos[clave] = acumuladores
+            continue
+        for k in range(len(operaciones)):
+            operacion = operaciones[k]
+            if operacion == "suma":
+                acumuladores[k] += columnas[k][i]
+            elif operacion == "conteo":
+                acumuladores[k] += 1
+            elif operacion == "maximo":
+                if columnas[k][i] > acumuladores[k]:
+                    acumuladores[k] = columnas[k][i]
+            elif columnas[k][i] < acumuladores[k]:
+                acumuladores[k] = columnas[k][i]
+    return grupos
+
+def sumar_por_clave(claves, valores) -> dict:
+    """
+    Atajo de `agrupar` para el caso más común: una única suma por clave.
+
+    Args:
+        claves (sequence): Columna de claves.
+        valores (sequence): Columna de valores a sumar.
+
+    Comportamiento:
+    - Recorre ambas columnas en paralelo acumulando el valor en el grupo de su clave.
+    - Evita la lista de acumuladores de `agrupar`, por lo que es el camino rápido de las consultas.
+
+    Retorno:
+    - (dict): clave -> suma de los valores de esa clave, en orden de primera aparición.
+    """
+    sumas = {}
+    for clave, valor in zip(claves, valores):
+        sumas[clave] = sumas.get(clave, 0) + valor
+    return sumas
@@ -0,0 +1,341 @@
+import time
+from array import array
+from itertools import count
+from registro import obtener_precio, obtener_precios
+from moneda import a_centavos, a_dolares
+from acumulados import AgregadosIncrementales
+from ventanas import VentanasAgregados
+import vectorizado
+
+FILAS_POR_TANDA = 65536
+
+identificadores_almacen = count()
+
+class AlmacenTransacciones:
+    """
+    Almacén columnar de transacciones respaldado por arreglos tipados.
+
+    Reemplaza las tres listas paralelas (nombres, acciones y cantidades) por columnas compactas:
+    - `usuarios` (array 'i'): id del usuario, codificado por diccionario.
+    - `empresas` (array 'i'): id de la empresa, codificado por diccionario.
+    - `cantidades` (array 'i'): cantidad de acciones adquiridas.
+    - `precios` (array 'q'): precio unitario vigente al momento de registrar la transacción, en centavos.
+    - `totales` (array 'q'): total invertido (precio unitario * cantidad), en centavos.
+    - `instantes` (array 'd'): momento de la transacción, en segundos desde la época Unix.
+
+    Comportamiento:
+    - Los montos son enteros en centavos (punto fijo): los totales y sus sumas son exactos y no dependen
+      del orden de acumulación. Se convierten a USD sólo al mostrarlos (`fila` y las consultas).
+    - Los nombres de usuarios y empresas se guardan una sola vez en `nombres_usuarios` / `nombres_empresas`;
+      cada fila sólo guarda su id entero.
+    - Los agregados a las columnas son amortizados (crecimiento geométrico de `array`).
+    - `acumulados` (AgregadosIncrementales) se actualiza en O(1) con cada transacción agregada, de modo que
+      las consultas no necesitan recorrer el historial.
+    - `ventanas` (VentanasAgregados) guarda además los agregados por balde de tiempo de las últimas 24 horas,
+      para resolver las consultas sobre una ventana (la última hora, hoy) sin recorrer sus transacciones.
+    - `version` aumenta con cada transacción o lote agregado; junto con `identificador` (único por
+      almacén) permite reconocer resultados calculados sobre datos que ya cambiaron.
+    - `vista()` expone una columna sin copiarla (memoryview). La vista debe liberarse antes de
+      volver a agregar transacciones, porque un arreglo con vistas activas no puede redimensionarse.
+    """
+
+    def __init__(self) -> None:
+        self.nombres_usuarios = []
+        self.ids_usuarios = {}
+        self.nombres_empresas = []
+        self.ids_empresas = {}
+        self.usuarios = array('i')
+        self.empresas = array('i')
+        self.cantidades = array('i')
+        self.precios = array('q')
+        self.totales = array('q')
+        self.instantes = array('d')
+        self.acumulados = AgregadosIncrementales()
+        self.ventanas = VentanasAgregados()
+        self.identificador = next(identificadores_almacen)
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self.cantidades)
+
+    def codificar_usuario(self, usuario: str) -> int:
+        """
+        Obtiene el id de un usuario, asignándole uno nuevo si todavía no fue registrado.
+
+        Args:
+            usuario (str): Nombre de usuario normalizado.
+
+        Retorno:
+        - (int): Id compacto del usuario.
+        """
+        id_usuario = self.ids_usuarios.get(usuario)
+        if id_usuario is None:
+            id_usuario = len(self.nombres_usuarios)
+            self.ids_usuarios[usuario] = id_usuario
+            self.nombres_usuarios += [usuario]
+        return id_usuario
+
+    def codificar_empresa(self, empresa: str) -> int:
+        """
+        Obtiene el id de una empresa, asignándole uno nuevo si todavía no fue registrada.
+
+        Args:
+            empresa (str): Nombre de la empresa normalizado.
+
+        Retorno:
+        - (int): Id compacto de la empresa.
+        """
+        id_empresa = self.ids_empresas.get(empresa)
+        if id_empresa is None:
+            id_empresa = len(self.nombres_empresas)
+            self.ids_empresas[empresa] = id_empresa
+            self.nombres_empresas += [empresa]
+        return id_empresa
+
+    def agregar(self, usuario: str, empresa: str, cantidad: int, instante: float = None) -> None:
+        """
+        Agrega una transacción al almacén.
+
+        Args:
+            usuario (str): Nombre de usuario normalizado y validado.
+            empresa (str): Nombre de la empresa normalizado y validado.
+            cantidad (int): Cantidad de acciones adquiridas.
+            instante (float, opcional): Momento de la transacción. Si se indica, se valúa al precio
+                vigente en ese instante según el historial de precios; si no, al precio vigente hoy y
+                se registra con el instante actual.
+
+        Comportamiento:
+        - Codifica usuario y empresa a sus ids.
+        - Obtiene el precio unitario con "obtener_precio()", lo pasa a centavos y calcula el total invertido
+          como producto entero.
+        - Agrega un valor al final de cada columna y actualiza los agregados incrementales y los de su balde de tiempo.
+
+        Retorno:
+        None
+        """
+        precio_unitario = a_centavos(obtener_precio(empresa, instante))
+        id_usuario = self.codificar_usuario(usuario)
+        id_empresa = self.codificar_empresa(empresa)
+        total_invertido = precio_unitario * cantidad
+        if instante is None:
+            instante = time.time()
+        self.usuarios.append(id_usuario)
+        self.empresas.append(id_empresa)
+        self.cantidades.append(cantidad)
+        self.precios.append(precio_unitario)
+        self.totales.append(total_invertido)
+        self.instantes.append(instante)
+        self.acumulados.registrar(id_usuario, id_empresa, cantidad, total_invertido)
+        self.ventanas.registrar(instante, id_usuario, id_empresa, cantidad, total_invertido)
+        self.version += 1
+        return None
+
+    def agregar_lote(self, usuarios: list, empresas: list, cantidades: list, instantes: list = None) -> None:
+        """
+        Agrega un bloque de transacciones ya validadas.
+
+        Args:
+            usuarios (list): Nombres de usuario normalizados y validados.
+            empresas (list): Nombres de empresas normalizados y validados.
+            cantidades (list): Cantidades de acciones adquiridas.
+            instantes (list, opcional): Momento de cada transacción (o None en las filas sin instante).
+
+        Comportamiento:
+        - Codifica usuarios y empresas a ids (una búsqueda en el diccionario por fila; `codificar_*` sólo
+          para los nombres nuevos) y arma las columnas del bloque en arreglos temporales.
+        - Con instantes, los precios del bloque se resuelven en lote contra el historial de precios
+          (`obtener_precios`), cada fila al precio vigente en su instante.
+        - Los precios se pasan a centavos y los totales son productos enteros (exactos).
+        - Con el backend de NumPy activo, precios y totales se calculan vectorialmente
+          (`vectorizado.calcular_precios_y_totales`); si no, el precio de cada empresa se resuelve una vez por bloque.
+        - Las filas sin instante se registran con el instante actual (uno para todo el bloque).
+        - Agrega las columnas con `extend` y actualiza los agregados incrementales fila por fila (O(1) cada una).
+        - Suma las filas a los baldes de tiempo. Un bloque sin instantes cae entero en un balde: lo que sumó
+          se obtiene de los agregados incrementales, leyendo antes y después sólo las claves que tocó
+          (`extraer` / `restar`), y se agrega al balde de una vez; con instantes, fila por fila.
+
+        Retorno:
+        None
+        """
+        ahora = time.time()
+        if instantes is None:
+            instantes_filas = array('d', [ahora]) * len(usuarios)
+        else:
+            instantes_filas = array('d')
+            for instante in instantes:
+                instantes_filas.append(ahora if instante is None else instante)
+        ids_usuarios = array('i')
+        ids_empresas = array('i')
+        for i in range(len(usuarios)):
+            id_usuario = self.ids_usuarios.get(usuarios[i])
+            if id_usuario is None:
+                id_usuario = self.codificar_usuario(usuarios[i])
+            id_empresa = self.ids_empresas.get(empresas[i])
+            if id_empresa is None:
+                id_empresa = self.codificar_empresa(empresas[i])
+            ids_usuarios.append(id_usuario)
+            ids_empresas.append(id_empresa)
+        cantidades_filas = array('i', cantidades)
+
+        precios_filas = array('q')
+        totales_filas = array('q')
+        if instantes is not None:
+            precios_dolares = obtener_precios(empresas, instantes)
+            for i in range(len(precios_dolares)):
+                precio_unitario = a_centavos(precios_dolares[i])
+                precios_filas.append(precio_unitario)
+                totales_filas.append(precio_unitario * cantidades_filas[i])
+        elif vectorizado.numpy_activo():
+            precios_por_id = []
+            for i in range(len(self.nombres_empresas)):
+                precios_por_id += [a_centavos(obtener_precio(self.nombres_empresas[i]))]
+            precios_np, totales_np = vectorizado.calcular_precios_y_totales(ids_empresas, cantidades_filas, precios_por_id)
+            precios_filas.frombytes(precios_np.tobytes())
+            totales_filas.frombytes(totales_np.tobytes())
+        else:
+            precios_bloque = {}
+            for i in range(len(ids_empresas)):
+                precio_unitario = precios_bloque.get(ids_empresas[i])
+                if precio_unitario is None:
+                    precio_unitario = a_centavos(obtener_precio(self.nombres_empresas[ids_empresas[i]]))
+                    precios_bloque[ids_empresas[i]] = precio_unitario
+                precios_filas.append(precio_unitario)
+                totales_filas.append(precio_unitario * cantidades_filas[i])
+
+        if instantes is None:
+            previos = self.acumulados.extraer(dict.fromkeys(ids_usuarios), dict.fromkeys(ids_empresas), dict.fromkeys(zip(ids_usuarios, ids_empresas)))
+        for i in range(len(ids_usuarios)):
+            self.acumulados.registrar(ids_usuarios[i], ids_empresas[i], cantidades_filas[i], totales_filas[i])
+        if instantes is None:
+            bloque = self.acumulados.extraer(previos.acciones_por_usuario, previos.acciones_por_empresa, previos.tenencias)
+            bloque.restar(previos)
+            self.ventanas.registrar_bloque(ahora, bloque, totales_filas)
+        else:
+            for i in range(len(ids_usuarios)):
+                self.ventanas.registrar(instantes_filas[i], ids_usuarios[i], ids_empresas[i], cantidades_filas[i], totales_filas[i])
+        self.usuarios.extend(ids_usuarios)
+        self.empresas.extend(ids_empresas)
+        self.cantidades.extend(cantidades_filas)
+        self.precios.extend(precios_filas)
+        self.totales.extend(totales_filas)
+        self.instantes.extend(instantes_filas)
+        self.version += 1
+        return None
+
+    def vista(self, columna: str) -> memoryview:
+        """
+        Devuelve una vista de solo lectura, sin copia, de una columna del almacén.
+
+        Args:
+            columna (str): Nombre de la columna ("usuarios", "empresas", "cantidades", "precios", "totales" o "instantes").
+
+        Retorno:
+        - (memoryview): Vista de la columna pedida.
+        """
+        return memoryview(getattr(self, columna)).toreadonly()
+
+    def fila(self, indice: int) -> list:
+        """
+        Reconstruye una transacción con el formato histórico de `detallar_transacciones`.
+
+        Args:
+            indice (int): Posición de la transacción en el almacén.
+
+        Retorno:
+        - (list): [usuario, empresa, precio por unidad, cantidad adquirida, total invertido], con los montos en USD.
+        """
+        return [
+            self.nombres_usuarios[self.usuarios[indice]],
+            self.nombres_empresas[self.empresas[indice]],
+            a_dolares(self.precios[indice]),
+            self.cantidades[indice],
+            a_dolares(self.totales[indice]),
+        ]
+
+    def iterar(self, inicio: int = 0, fin: int = None):
+        """
+        Recorre perezosamente las transacciones en orden de registro.
+
+        Args:
+            inicio (int, opcional): Primera fila (incluida).
+            fin (int, opcional): Última fila (excluida). Por defecto, el final del almacén al empezar a recorrer.
+
+        Retorno:
+        - (generator): Transacciones con la estructura de `fila`, construidas a medida que se piden.
+        """
+        if fin is None:
+            fin = len(self)
+        for i in range(inicio, fin):
+            yield self.fila(i)
+
+    def iterar_por_usuario(self, desde: int = 0):
+        """
+        Recorre perezosamente las transacciones ordenadas por usuario A-Z, a partir de una posición de ese orden.
+
+        Args:
+            desde (int, opcional): Cantidad de transacciones del orden a saltear (desplazamiento o cursor).
+
+        Comportamiento:
+        - Produce el mismo orden que ordenar todas las filas por usuario con un ordenamiento estable:
+          usuarios por nombre y, dentro de cada usuario, en orden de registro.
+        - Cuenta las filas de cada usuario y ordena sólo los usuarios (no las filas); los usuarios
+          completos anteriores a `desde` se saltean sin recorrer sus filas.
+        - Reúne los índices de fila de a tandas de hasta `FILAS_POR_TANDA` filas (un recorrido de la
+          columna por tanda); un usuario con más filas que la tanda se emite directamente durante su
+          recorrido. La memoria queda acotada por la tanda y la cantidad de usuarios, no por el historial.
+        - Las transacciones agregadas después de empezar a recorrer no se incluyen.
+
+        Retorno:
+        - (generator): Transacciones con la estructura de `fila`.
+        """
+        cantidad_filas = len(self)
+        usuarios = self.usuarios
+        conteos = {}
+        for i in range(cantidad_filas):
+            conteos[usuarios[i]] = conteos.get(usuarios[i], 0) + 1
+        ids_ordenados = sorted(conteos, key=self.nombres_usuarios.__getitem__)
+
+        posicion = 0
+        while posicion < len(ids_ordenados) and desde >= conteos[ids_ordenados[posicion]]:
+            desde -= conteos[ids_ordenados[posicion]]
+            posicion += 1
+        while posicion < len(ids_ordenados):
+            tanda = [ids_ordenados[posicion]]
+            filas_tanda = conteos[ids_ordenados[posicion]]
+            posicion += 1
+            while posicion < len(ids_ordenados) and filas_tanda + conteos[ids_ordenados[posicion]] <= FILAS_POR_TANDA:
+                tanda += [ids_ordenados[posicion]]
+                filas_tanda += conteos[ids_ordenados[posicion]]
+                posicion += 1
+
+            if len(tanda) == 1:
+                id_usuario = tanda[0]
+                for i in range(cantidad_filas):
+                    if usuarios[i] == id_usuario:
+                        if desde:
+                            desde -= 1
+                        else:
+                            yield self.fila(i)
+            else:
+                indices_por_usuario = {}
+                for id_usuario in tanda:
+                    indices_por_usuario[id_usuario] = []
+                for i in range(cantidad_filas):
+                    indices = indices_por_usuario.get(usuarios[i])
+                    if indices is not None:
+                        indices.append(i)
+                for id_usuario in tanda:
+                    indices = indices_por_usuario[id_usuario]
+                    for j in range(desde, len(indices)):
+                        yield self.fila(indices[j])
+                    desde = 0
+                    indices_por_usuario[id_usuario] = None
+
+    def detallar(self) -> list:
+        """
+        Genera el registro completo de transacciones como lista de listas.
+
+        Retorno:
+        - (list): Lista de transacciones con la misma estructura que `detallar_transacciones`.
+        """
+        return list(self.iterar())
@@ -0,0 +1,579 @@
+import json
+import sqlite3
+import time
+from registro import obtener_precio, obtener_precios
+from almacen import identificadores_almacen
+from moneda import a_centavos, a_dolares
+from cuantiles import SketchCuantiles
+from acumulados import SumasParciales
+from ventanas import VentanasAgregados
+
+FILAS_POR_INSERCION = 65536
+FILAS_POR_RESUMEN = 65536
+VERSION_ESQUEMA = 3
+VERSION_ESQUEMA_SIN_ID = 2
+VERSION_ESQUEMA_SIN_INSTANTES = 1
+
+ESQUEMA_TRANSACCIONES = """
+CREATE TABLE IF NOT EXISTS transacciones (
+    id INTEGER PRIMARY KEY,
+    usuario INTEGER NOT NULL,
+    empresa INTEGER NOT NULL,
+    cantidad INTEGER NOT NULL,
+    precio INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    instante REAL NOT NULL DEFAULT 0
+)"""
+
+ESQUEMA = f"""
+CREATE TABLE IF NOT EXISTS usuarios (id INTEGER PRIMARY KEY, nombre TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS empresas (id INTEGER PRIMARY KEY, nombre TEXT NOT NULL UNIQUE);
+{ESQUEMA_TRANSACCIONES};
+CREATE INDEX IF NOT EXISTS transacciones_usuario ON transacciones (usuario);
+CREATE INDEX IF NOT EXISTS transacciones_empresa ON transacciones (empresa);
+CREATE INDEX IF NOT EXISTS transacciones_instante ON transacciones (instante);
+CREATE TABLE IF NOT EXISTS resumenes (nombre TEXT PRIMARY KEY, filas INTEGER NOT NULL, contenido TEXT NOT NULL);
+"""
+
+SQL_INSERTAR = "INSERT INTO transacciones (id, usuario, empresa, cantidad, precio, total, instante) VALUES (?, ?, ?, ?, ?, ?, ?)"
+SQL_GUARDAR_RESUMEN = "INSERT OR REPLACE INTO resumenes (nombre, filas, contenido) VALUES (?, ?, ?)"
+SQL_BALDE = "(CAST(instante / :ancho AS INTEGER) - (CAST(instante / :ancho AS INTEGER) * :ancho > instante))"
+SQL_SUMAS_POR_BALDE = f"""
+SELECT {SQL_BALDE} AS balde, usuario, empresa, SUM(cantidad), SUM(total), COUNT(*)
+FROM transacciones WHERE instante >= :limite
+GROUP BY balde, usuario, empresa ORDER BY balde, MIN(id)
+"""
+SQL_TOTALES_POR_BALDE = f"SELECT {SQL_BALDE}, total FROM transacciones INDEXED BY transacciones_instante WHERE instante >= :limite ORDER BY id"
+SQL_FILAS = """
+SELECT u.nombre, e.nombre, t.precio, t.cantidad, t.total
+FROM transacciones t JOIN usuarios u ON u.id = t.usuario JOIN empresas e ON e.id = t.empresa
+"""
+
+def _decodificar_fila(resultado: tuple) -> list:
+    """
+    Arma una transacción con la estructura de `fila` a partir de una fila de `SQL_FILAS`.
+
+    Retorno:
+    - (list): [usuario, empresa, precio por unidad, cantidad adquirida, total invertido], con los montos en USD.
+    """
+    usuario, empresa, precio, cantidad, total = resultado
+    return [usuario, empresa, a_dolares(precio), cantidad, a_dolares(total)]
+
+class AgregadosSQL:
+    """
+    Agregados de la cartera con la misma interfaz que `AgregadosIncrementales`, calculados con SQL.
+
+    Args:
+        conexion (sqlite3.Connection): Conexión a la base del almacén.
+
+    Comportamiento:
+    - Cada atributo se resuelve con una consulta de agregación (GROUP BY / SUM / ORDER BY) al momento de
+      leerlo; salvo el sketch de cuantiles (de tamaño acotado), no se guarda nada en memoria, por lo que
+      sirve para historiales más grandes que la RAM.
+    - Los diccionarios se devuelven en orden de primera aparición (ORDER BY MIN(id)), igual que los
+      agregados en memoria.
+    - Los montos son centavos enteros y SQLite los suma en enteros de 64 bits: los totales son exactos
+      e idénticos a los del motor en memoria.
+    - Ante un empate en la mayor tenencia de un usuario gana la empresa que apareció primero para ese usuario.
+    - SQLite no tiene un agregado de cuantiles: `cuantiles_transacciones` es un sketch en memoria que
+      `AlmacenSQLite` carga al abrir la base y actualiza con cada inserción confirmada (ver `AlmacenSQLite._cargar_sketch`).
+      Es idéntico al que mantiene el motor en memoria.
+    """
+
+    def __init__(self, conexion: sqlite3.Connection) -> None:
+        self.conexion = conexion
+        self.cuantiles_transacciones = SketchCuantiles()
+
+    def _sumas_por_clave(self, clave: str, columna: str) -> dict:
+        """
+        Suma una columna agrupando por `clave` ("usuario" o "empresa").
+
+        Retorno:
+        - (dict): id -> suma, en orden de primera aparición.
+        """
+        cursor = self.conexion.execute(
+            f"SELECT {clave}, SUM({columna}) FROM transacciones GROUP BY {clave} ORDER BY MIN(id)"
+        )
+        return dict(cursor)
+
+    @property
+    def acciones_por_usuario(self) -> dict:
+        return self._sumas_por_clave("usuario", "cantidad")
+
+    @property
+    def inversion_por_usuario(self) -> dict:
+        return self._sumas_por_clave("usuario", "total")
+
+    @property
+    def acciones_por_empresa(self) -> dict:
+        return self._sumas_por_clave("empresa", "cantidad")
+
+    @property
+    def inversion_por_empresa(self) -> dict:
+        return self._sumas_por_clave("empresa", "total")
+
+    @property
+    def inversion_total(self) -> int:
+        return self.conexion.execute("SELECT COALESCE(SUM(total), 0) FROM transacciones").fetchone()[0]
+
+    @property
+    def total_acciones(self) -> int:
+        return self.conexion.execute("SELECT COALESCE(SUM(cantidad), 0) FROM transacciones").fetchone()[0]
+
+    @property
+    def tenencias(self) -> dict:
+        cursor = self.conexion.execute(
+            "SELECT usuario, empresa, SUM(cantidad) FROM transacciones GROUP BY usuario, empresa ORDER BY MIN(id)"
+        )
+        resultado = {}
+        for id_usuario, id_empresa, tenencia in cursor:
+            resultado[(id_usuario, id_empresa)] = tenencia
+        return resultado
+
+    @property
+    def mayor_por_usuario(self) -> dict:
+        cursor = self.conexion.execute("""
+            SELECT usuario, empresa, tenencia FROM (
+                SELECT usuario, empresa, tenencia,
+                    ROW_NUMBER() OVER (PARTITION BY usuario ORDER BY tenencia DESC, primera) AS puesto,
+                    MIN(primera) OVER (PARTITION BY usuario) AS primera_usuario
+                FROM (
+                    SELECT usuario, empresa, SUM(cantidad) AS tenencia, MIN(id) AS primera
+                    FROM transacciones GROUP BY usuario, empresa
+                )
+            )
+            WHERE puesto = 1
+            ORDER BY primera_usuario
+        """)
+        resultado = {}
+        for id_usuario, id_empresa, tenencia in cursor:
+            resultado[id_usuario] = [id_empresa, tenencia]
+        return resultado
+
+class AlmacenSQLite:
+    """
+    Almacén de transacciones sobre una base SQLite, alternativo al almacén columnar en memoria.
+
+    Args:
+        ruta (str): Archivo de la base (se crea si no existe). Con ":memory:" la base vive en memoria.
+
+    Tablas:
+    - `usuarios` / `empresas`: id y nombre (codificación por diccionario, como en el almacén en memoria).
+    - `transacciones`: id de la fila (`INTEGER PRIMARY KEY`, igual a la posición de registro + 1), id de
+      usuario, id de empresa, cantidad, precio unitario y total invertido (en centavos) e instante, con
+      índices por usuario, por empresa y por instante. El id se asigna al insertar y, a diferencia de un
+      rowid implícito, VACUUM no lo renumera.
+    - `resumenes`: agregados serializados (JSON) junto con la cantidad de filas que cubren; hoy, el sketch
+      de cuantiles por transacción.
+    - `PRAGMA user_version` guarda la versión del esquema. Una base de la versión 1 (sin instantes) o 2 (sin
+      columna id) se actualiza reconstruyendo la tabla de transacciones (ver `_migrar_transacciones`); otra
+      versión no se abre.
+
+    Comportamiento:
+    - Ofrece la interfaz que usan `consultas`, `importacion` y `main` (`agregar`, `agregar_lote`, `fila`,
+      `iterar`, `iterar_por_usuario`, `acumulados`, nombres e ids), de modo que se elige al iniciar el
+      programa sin cambiar el resto del código.
+    - `acumulados` es un `AgregadosSQL`: cada consulta se resuelve con una agregación en la base, sin
+      recorrer filas en Python.
+    - Las inserciones usan una única sentencia preparada con `executemany` y se confirman una vez por
+      lote (o por transacción, con `agregar`).
+    - Sólo los diccionarios de nombres, el sketch de cuantiles y el anillo de ventanas de tiempo (`ventanas`, las últimas 24 horas
+      agregadas por balde) se mantienen en memoria; las transacciones quedan en disco. El anillo se
+      reconstruye al abrir la base con las filas recientes.
+    - El sketch de cuantiles por transacción también vive en memoria: se guarda en `resumenes` (con la cantidad
+      de filas que cubre) cada `FILAS_POR_RESUMEN` filas y al cerrar, no en cada inserción. Al abrir sólo se
+      recorren las filas que no cubre: a lo sumo `FILAS_POR_RESUMEN` si el programa terminó sin cerrar.
+    - No expone columnas (`vista`): el reporte de una pasada y el cálculo en paralelo requieren el almacén en memoria.
+    - La conexión admite usarse desde otro hilo que el que la abrió (`check_same_thread=False`), como hace
+      el servicio de ingesta con su hilo de escritura; no admite usarse desde dos hilos a la vez.
+    """
+
+    def __init__(self, ruta: str) -> None:
+        self.ruta = ruta
+        self.conexion = sqlite3.connect(ruta, check_same_thread=False)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        version_esquema = self.conexion.execute("PRAGMA user_version").fetchone()[0]
+        tablas = self.conexion.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'transacciones'").fetchone()[0]
+        if tablas and version_esquema in (VERSION_ESQUEMA_SIN_INSTANTES, VERSION_ESQUEMA_SIN_ID):
+            self._migrar_transacciones(version_esquema)
+        elif tablas and version_esquema != VERSION_ESQUEMA:
+            self.conexion.close()
+            raise ValueError(f"La base {ruta} no tiene un formato compatible.")
+        self.conexion.executescript(ESQUEMA)
+        self.conexion.execute(f"PRAGMA user_version = {VERSION_ESQUEMA}")
+        self.nombres_usuarios = []
+        self.ids_usuarios = {}
+        self.nombres_empresas = []
+        self.ids_empresas = {}
+        for id_usuario, nombre in self.conexion.execute("SELECT id, nombre FROM usuarios ORDER BY id"):
+            self.ids_usuarios[nombre] = id_usuario
+            self.nombres_usuarios += [nombre]
+        for id_empresa, nombre in self.conexion.execute("SELECT id, nombre FROM empresas ORDER BY id"):
+            self.ids_empresas[nombre] = id_empresa
+            self.nombres_empresas += [nombre]
+        self.cantidad_filas = self.conexion.execute("SELECT COUNT(*) FROM transacciones").fetchone()[0]
+        self.acumulados = AgregadosSQL(self.conexion)
+        self._cargar_sketch()
+        self.ventanas = self._reconstruir_ventanas()
+        self.identificador = next(identificadores_almacen)
+        self.version = 0
+
+    def __len__(self) -> int:
+        return self.cantidad_filas
+
+    def _migrar_transacciones(self, version_esquema: int) -> None:
+        """
+        Reconstruye la tabla de transacciones de una base anterior con la columna `id` del esquema actual.
+
+        Comportamiento:
+        - Copia las filas en orden de rowid y numera los ids desde 1 (ROW_NUMBER), de modo que el id queda
+          igual a la posición de registro + 1 aunque la base se haya compactado con VACUUM.
+        - Las bases de la versión 1 no tenían instantes: las filas existentes quedan con instante 0.
+        - Todo ocurre en una única transacción: si falla, la base queda como estaba. Los índices se
+          vuelven a crear con `ESQUEMA`.
+
+        Retorno:
+        None
+        """
+        instante = "0" if version_esquema == VERSION_ESQUEMA_SIN_INSTANTES else "instante"
+        with self.conexion:
+            self.conexion.execute("BEGIN")
+            self.conexion.execute("ALTER TABLE transacciones RENAME TO transacciones_anterior")
+            self.conexion.execute("DROP INDEX IF EXISTS transacciones_usuario")
+            self.conexion.execute("DROP INDEX IF EXISTS transacciones_empresa")
+            self.conexion.execute("DROP INDEX IF EXISTS transacciones_instante")
+            self.conexion.execute(ESQUEMA_TRANSACCIONES)
+            self.conexion.execute(f"""
+                INSERT INTO transacciones (id, usuario, empresa, cantidad, precio, total, instante)
+                SELECT ROW_NUMBER() OVER (ORDER BY rowid), usuario, empresa, cantidad, precio, total, {instante}
+                FROM transacciones_anterior
+            """)
+            self.conexion.execute("DROP TABLE transacciones_anterior")
+        return None
+
+    def _reconstruir_ventanas(self) -> VentanasAgregados:
+        """
+        Arma el anillo de ventanas de tiempo con las filas de los baldes que conserva.
+
+        Comportamiento:
+        - Busca el último instante y filtra las filas recientes por el índice de instantes: las más viejas no se leen.
+        - Las sumas de cada balde salen de una única agregación GROUP BY (balde, usuario, empresa), con los
+          pares en orden de primera aparición dentro del balde; el número de balde se calcula en SQL con
+          el mismo redondeo hacia abajo que `VentanasAgregados.balde`.
+        - El sketch de cada balde necesita los totales en orden de registro: se leen sólo (balde, total)
+          de las filas recientes, por id, y se agregan de una vez por balde.
+
+        Retorno:
+        - (VentanasAgregados): Anillo equivalente a registrar cada fila en orden.
+        """
+        ventanas = VentanasAgregados()
+        ultimo_instante = self.conexion.execute("SELECT MAX(instante) FROM transacciones").fetchone()[0]
+        if ultimo_instante is None:
+            return ventanas
+        ventanas.ultimo_balde = ventanas.balde(ultimo_instante)
+        parametros = {"ancho": ventanas.ancho_balde, "limite": ventanas.primer_balde() * ventanas.ancho_balde}
+        for balde, id_usuario, id_empresa, cantidad, total, filas in self.conexion.execute(SQL_SUMAS_POR_BALDE, parametros):
+            posicion = balde % ventanas.cantidad_baldes
+            sumas = ventanas.baldes[posicion]
+            if sumas is None:
+                sumas = SumasParciales()
+                ventanas.baldes[posicion] = sumas
+            sumas.acciones_por_usuario[id_usuario] = sumas.acciones_por_usuario.get(id_usuario, 0) + cantidad
+            sumas.inversion_por_usuario[id_usuario] = sumas.inversion_por_usuario.get(id_usuario, 0) + total
+            sumas.acciones_por_empresa[id_empresa] = sumas.acciones_por_empresa.get(id_empresa, 0) + cantidad
+            sumas.inversion_por_empresa[id_empresa] = sumas.inversion_por_empresa.get(id_empresa, 0) + total
+            sumas.tenencias[(id_usuario, id_empresa)] = cantidad
+            sumas.inversion_total += total
+            sumas.total_acciones += cantidad
+            ventanas.filas[posicion] += filas
+        totales_por_balde = {}
+        for balde, total in self.conexion.execute(SQL_TOTALES_POR_BALDE, parametros):
+            totales = totales_por_balde.get(balde)
+            if totales is None:
+                totales = []
+                totales_por_balde[balde] = totales
+            totales.append(total)
+        for balde, totales in totales_por_balde.items():
+            ventanas.baldes[balde % ventanas.cantidad_baldes].cuantiles_transacciones.extender(totales)
+        return ventanas
+
+    def _cargar_sketch(self) -> None:
+        """
+        Carga el sketch de cuantiles por transacción guardado en `resumenes` y le agrega las filas que no cubre.
+
+        Comportamiento:
+        - Si la base no tiene el sketch guardado (por ejemplo, una base creada antes de guardarlo), o cubre
+          más filas de las que hay, lo reconstruye desde la primera fila.
+        - Recorre los totales por id, en orden de registro, de a `FILAS_POR_INSERCION`: el sketch es
+          idéntico a haberlo alimentado fila por fila.
+        - Si tuvo que recorrer filas, guarda el sketch actualizado para no repetir el recorrido al reabrir.
+
+        Retorno:
+        None
+        """
+        sketch = SketchCuantiles()
+        filas_cubiertas = 0
+        guardado = self.conexion.execute("SELECT filas, contenido FROM resumenes WHERE nombre = 'cuantiles_transacciones'").fetchone()
+        if guardado is not None and guardado[0] <= self.cantidad_filas:
+            filas_cubiertas = guardado[0]
+            sketch = SketchCuantiles.desde_diccionario(json.loads(guardado[1]))
+        cursor = self.conexion.execute("SELECT total FROM transacciones WHERE id > ? ORDER BY id", (filas_cubiertas,))
+        tanda = cursor.fetchmany(FILAS_POR_INSERCION)
+        while tanda:
+            sketch.extender([total for (total,) in tanda])
+            tanda = cursor.fetchmany(FILAS_POR_INSERCION)
+        self.acumulados.cuantiles_transacciones = sketch
+        self.filas_resumen = filas_cubiertas
+        if filas_cubiertas < self.cantidad_filas:
+            self._guardar_sketch()
+        return None
+
+    def _guardar_sketch(self) -> None:
+        """
+        Guarda el sketch de cuantiles en `resumenes`, en su propia transacción de la base.
+
+        Comportamiento:
+        - Registra que cubre las `cantidad_filas` filas confirmadas: el sketch sólo incorpora filas ya
+          confirmadas, así que nunca cubre filas que la base no tiene.
+
+        Retorno:
+        None
+        """
+        contenido = json.dumps(self.acumulados.cuantiles_transacciones.a_diccionario())
+        with self.conexion:
+            self.conexion.execute(SQL_GUARDAR_RESUMEN, ("cuantiles_transacciones", self.cantidad_filas, contenido))
+        self.filas_resumen = self.cantidad_filas
+        return None
+
+    def _descartar_nombres_desde(self, cantidad_usuarios: int, cantidad_empresas: int) -> None:
+        """
+        Olvida los nombres codificados después de las primeras `cantidad_usuarios` / `cantidad_empresas`.
+
+        Comportamiento:
+        - Se usa cuando la transacción de la base que los insertó se deshace: los diccionarios en memoria
+          vuelven a coincidir con las tablas `usuarios` y `empresas`.
+
+        Retorno:
+        None
+        """
+        for nombre in self.nombres_usuarios[cantidad_usuarios:]:
+            del self.ids_usuarios[nombre]
+        del self.nombres_usuarios[cantidad_usuarios:]
+        for nombre in self.nombres_empresas[cantidad_empresas:]:
+            del self.ids_empresas[nombre]
+        del self.nombres_empresas[cantidad_empresas:]
+        return None
+
+    def codificar_usuario(self, usuario: str) -> int:
+        """
+        Obtiene el id de un usuario, registrándolo en la tabla `usuarios` si todavía no existe.
+
+        Comportamiento:
+        - El nombre se inserta dentro de la transacción de la base en curso; si esa transacción se deshace,
+          `agregar` y `agregar_lote` lo quitan también de los diccionarios en memoria.
+
+        Retorno:
+        - (int): Id compacto del usuario.
+        """
+        id_usuario = self.ids_usuarios.get(usuario)
+        if id_usuario is None:
+            id_usuario = len(self.nombres_usuarios)
+            self.conexion.execute("INSERT INTO usuarios (id, nombre) VALUES (?, ?)", (id_usuario, usuario))
+            self.ids_usuarios[usuario] = id_usuario
+            self.nombres_usuarios += [usuario]
+        return id_usuario
+
+    def codificar_empresa(self, empresa: str) -> int:
+        """
+        Obtiene el id de una empresa, registrándola en la tabla `empresas` si todavía no existe.
+
+        Comportamiento:
+        - Igual que `codificar_usuario`: si la transacción de la base se deshace, el nombre se descarta.
+
+        Retorno:
+        - (int): Id compacto de la empresa.
+        """
+        id_empresa = self.ids_empresas.get(empresa)
+        if id_empresa is None:
+            id_empresa = len(self.nombres_empresas)
+            self.conexion.execute("INSERT INTO empresas (id, nombre) VALUES (?, ?)", (id_empresa, empresa))
+            self.ids_empresas[empresa] = id_empresa
+            self.nombres_empresas += [empresa]
+        return id_empresa
+
+    def agregar(self, usuario: str, empresa: str, cantidad: int, instante: float = None) -> None:
+        """
+        Agrega y confirma una transacción.
+
+        Args:
+            usuario (str): Nombre de usuario normalizado y validado.
+            empresa (str): Nombre de la empresa normalizado y validado.
+            cantidad (int): Cantidad de acciones adquiridas.
+            instante (float, opcional): Momento de la transacción, para valuarla según el historial de precios.
+                Si no se indica, se registra con el instante actual.
+
+        Retorno:
+        None
+        """
+        precio_unitario = a_centavos(obtener_precio(empresa, instante))
+        if instante is None:
+            instante = time.time()
+        cantidad_usuarios = len(self.nombres_usuarios)
+        cantidad_empresas = len(self.nombres_empresas)
+        try:
+            with self.conexion:
+                id_usuario = self.codificar_usuario(usuario)
+                id_empresa = self.codificar_empresa(empresa)
+                self.conexion.execute(SQL_INSERTAR, (self.cantidad_filas + 1, id_usuario, id_empresa, cantidad, precio_unitario, precio_unitario * cantidad, instante))
+        except BaseException:
+            self._descartar_nombres_desde(cantidad_usuarios, cantidad_empresas)
+            raise
+        self.acumulados.cuantiles_transacciones.agregar(precio_unitario * cantidad)
+        self.ventanas.registrar(instante, id_usuario, id_empresa, cantidad, precio_unitario * cantidad)
+        self.cantidad_filas += 1
+        self.version += 1
+        if self.cantidad_filas - self.filas_resumen >= FILAS_POR_RESUMEN:
+            self._guardar_sketch()
+        return None
+
+    def agregar_lote(self, usuarios: list, empresas: list, cantidades: list, instantes: list = None) -> None:
+        """
+        Agrega un bloque de transacciones ya validadas en una sola transacción de la base.
+
+        Args:
+            usuarios (list): Nombres de usuario normalizados y validados.
+            empresas (list): Nombres de empresas normalizados y validados.
+            cantidades (list): Cantidades de acciones adquiridas.
+            instantes (list, opcional): Momento de cada transacción (o None en las filas sin instante).
+
+        Comportamiento:
+        - Valúa el bloque igual que el almacén en memoria: con instantes, en lote contra el historial de
+          precios; sin ellos, resolviendo el precio de cada empresa una vez por bloque. Precios y totales
+          se guardan en centavos.
+        - Las filas sin instante se registran con el instante actual (uno para todo el bloque).
+        - Inserta las filas con `executemany` de a `FILAS_POR_INSERCION` y confirma al final del bloque;
+          después suma las filas al sketch de cuantiles y a los baldes de tiempo, y guarda el sketch si ya
+          pasaron `FILAS_POR_RESUMEN` filas desde la última vez.
+
+        Retorno:
+        None
+        """
+        if instantes is not None:
+            precios_filas = []
+            for precio_unitario in obtener_precios(empresas, instantes):
+                precios_filas += [a_centavos(precio_unitario)]
+        else:
+            precios_bloque = {}
+            precios_filas = []
+            for i in range(len(empresas)):
+                precio_unitario = precios_bloque.get(empresas[i])
+                if precio_unitario is None:
+                    precio_unitario = a_centavos(obtener_precio(empresas[i]))
+                    precios_bloque[empresas[i]] = precio_unitario
+                precios_filas += [precio_unitario]
+
+        ahora = time.time()
+        lote_ventanas = []
+        cantidad_usuarios = len(self.nombres_usuarios)
+        cantidad_empresas = len(self.nombres_empresas)
+        try:
+            with self.conexion:
+                for inicio in range(0, len(usuarios), FILAS_POR_INSERCION):
+                    filas = []
+                    for i in range(inicio, min(inicio + FILAS_POR_INSERCION, len(usuarios))):
+                        instante = ahora if instantes is None or instantes[i] is None else instantes[i]
+                        filas += [(
+                            self.cantidad_filas + i + 1, self.codificar_usuario(usuarios[i]), self.codificar_empresa(empresas[i]),
+                            cantidades[i], precios_filas[i], precios_filas[i] * cantidades[i], instante,
+                        )]
+                    self.conexion.executemany(SQL_INSERTAR, filas)
+                    lote_ventanas += filas
+        except BaseException:
+            self._descartar_nombres_desde(cantidad_usuarios, cantidad_empresas)
+            raise
+        self.acumulados.cuantiles_transacciones.extender([fila[5] for fila in lote_ventanas])
+        for _, id_usuario, id_empresa, cantidad, _, total, instante in lote_ventanas:
+            self.ventanas.registrar(instante, id_usuario, id_empresa, cantidad, total)
+        self.cantidad_filas += len(usuarios)
+        self.version += 1
+        if self.cantidad_filas - self.filas_resumen >= FILAS_POR_RESUMEN:
+            self._guardar_sketch()
+        return None
+
+    def fila(self, indice: int) -> list:
+        """
+        Reconstruye una transacción con el formato histórico de `detallar_transacciones`.
+
+        Retorno:
+        - (list): [usuario, empresa, precio por unidad, cantidad adquirida, total invertido].
+        """
+        resultado = self.conexion.execute(SQL_FILAS + "WHERE t.id = ?", (indice + 1,)).fetchone()
+        if resultado is None:
+            raise IndexError(f"No existe la transacción {indice}.")
+        return _decodificar_fila(resultado)
+
+    def iterar(self, inicio: int = 0, fin: int = None):
+        """
+        Recorre perezosamente las transacciones en orden de registro, leyéndolas de la base por tandas.
+
+        Retorno:
+        - (generator): Transacciones con la estructura de `fila`.
+        """
+        if fin is None:
+            fin = len(self)
+        cursor = self.conexion.execute(SQL_FILAS + "WHERE t.id > ? AND t.id <= ? ORDER BY t.id", (inicio, fin))
+        for resultado in cursor:
+            yield _decodificar_fila(resultado)
+
+    def iterar_por_usuario(self, desde: int = 0):
+        """
+        Recorre perezosamente las transacciones ordenadas por usuario A-Z, a partir de una posición de ese orden.
+
+        Comportamiento:
+        - Mismo orden que el almacén en memoria: usuarios por nombre y, dentro de cada usuario, en orden de registro.
+        - Cuenta las filas por usuario con una agregación, ordena sólo los usuarios y lee las filas de cada
+          uno por el índice de usuario: la base nunca ordena el historial completo.
+        - Las transacciones agregadas después de empezar a recorrer no se incluyen.
+
+        Retorno:
+        - (generator): Transacciones con la estructura de `fila`.
+        """
+        ultima_fila = len(self)
+        conteos = dict(self.conexion.execute(
+            "SELECT usuario, COUNT(*) FROM transacciones WHERE id <= ? GROUP BY usuario", (ultima_fila,)
+        ))
+        ids_ordenados = sorted(conteos, key=self.nombres_usuarios.__getitem__)
+        for id_usuario in ids_ordenados:
+            if desde >= conteos[id_usuario]:
+                desde -= conteos[id_usuario]
+                continue
+            cursor = self.conexion.execute(
+                SQL_FILAS + "WHERE t.usuario = ? AND t.id <= ? ORDER BY t.id LIMIT -1 OFFSET ?",
+                (id_usuario, ultima_fila, desde),
+            )
+            desde = 0
+            for resultado in cursor:
+                yield _decodificar_fila(resultado)
+
+    def detallar(self) -> list:
+        """
+        Genera el registro completo de transacciones como lista de listas.
+
+        Retorno:
+        - (list): Lista de transacciones con la misma estructura que `detallar_transacciones`.
+        """
+        return list(self.iterar())
+
+    def cerrar(self) -> None:
+        """
+        Confirma lo pendiente, guarda el sketch de cuantiles si cambió y cierra la conexión a la base.
+
+        Retorno:
+        None
+        """
+        if self.filas_resumen < self.cantidad_filas:
+            self._guardar_sketch()
+        self.conexion.commit()
+        self.conexion.close()
+        return None
@@ -0,0 +1,101 @@
+import io
+import sys
+from collections import OrderedDict
+from contextlib import redirect_stdout
+
+CAPACIDAD_CACHE = 256
+
+class CacheConsultas:
+    """
+    Cache LRU de resultados de consultas, versionado por almacén.
+
+    Args:
+        capacidad (int, opcional): Cantidad máxima de resultados guardados; al superarla se descarta
+            el usado hace más tiempo.
+
+    Comportamiento:
+    - La clave es (identificador del almacén, nombre de la consulta, parámetros, versión del almacén).
+      Como la versión aumenta con cada transacción agregada, un resultado guardado nunca se reutiliza
+      sobre datos distintos: la invalidación es automática.
+    - Al ver una versión nueva de un almacén, descarta los resultados de sus versiones anteriores,
+      que ya no pueden volver a pedirse.
+    - Además del resultado guarda el texto que imprimió la consulta, para volver a mostrarlo sin recalcular.
+    """
+
+    def __init__(self, capacidad: int = CAPACIDAD_CACHE) -> None:
+        self.capacidad = capacidad
+        self.entradas = OrderedDict()
+        self.versiones = {}
+        self.aciertos = 0
+        self.fallos = 0
+
+    def __len__(self) -> int:
+        return len(self.entradas)
+
+    def _descartar_versiones_anteriores(self, identificador: int, version: int) -> None:
+        """
+        Elimina las entradas de un almacén calculadas con una versión anterior a `version`.
+
+        Retorno:
+        None
+        """
+        if self.versiones.get(identificador, version) != version:
+            obsoletas = [clave for clave in self.entradas if clave[0] == identificador and clave[3] != version]
+            for clave in obsoletas:
+                del self.entradas[clave]
+        self.versiones[identificador] = version
+        return None
+
+    def ejecutar(self, almacen, nombre: str, funcion, parametros: tuple = (), mostrar: bool = True):
+        """
+        Devuelve el resultado de una consulta, calculándolo sólo si no está en el cache.
+
+        Args:
+            almacen (AlmacenTransacciones): Almacén consultado (debe tener `identificador` y `version`).
+            nombre (str): Nombre de la consulta.
+            funcion (function): Consulta, con la firma `funcion(almacen, *parametros, mostrar=...)`.
+            parametros (tuple, opcional): Parámetros adicionales de la consulta (forman parte de la clave).
+            mostrar (bool, opcional): Si es True, muestra el resultado (guardado o recién calculado).
+
+        Retorno:
+        - El resultado de la consulta. Es el mismo objeto para llamadas repetidas: no debe modificarse.
+        """
+        self._descartar_versiones_anteriores(almacen.identificador, almacen.version)
+        clave = (almacen.identificador, nombre, tuple(parametros), almacen.version)
+        entrada = self.entradas.get(clave)
+        if entrada is not None and (entrada[1] is not None or not mostrar):
+            self.aciertos += 1
+            self.entradas.move_to_end(clave)
+        else:
+            self.fallos += 1
+            texto = None
+            if mostrar:
+                salida = io.StringIO()
+                with redirect_stdout(salida):
+                    resultado = funcion(almacen, *parametros, mostrar=True)
+                texto = salida.getvalue()
+            else:
+                resultado = funcion(almacen, *parametros, mostrar=False)
+            entrada = [resultado, texto]
+            self.entradas[clave] = entrada
+            self.entradas.move_to_end(clave)
+            while len(self.entradas) > self.capacidad:
+                self.entradas.popitem(last=False)
+        if mostrar:
+            sys.stdout.write(entrada[1])
+        return entrada[0]
+
+    def limpiar(self) -> None:
+        """
+        Vacía el cache y sus contadores.
+
+        Retorno:
+        None
+        """
+        self.entradas.clear()
+        self.versiones.clear()
+        self.aciertos = 0
+        self.fallos = 0
+        return None
+
+cache_consultas = CacheConsultas()
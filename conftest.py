@@ -0,0 +1,100 @@
+import random
+import time
+import pytest
+from consultas import CONSULTAS, parametros_consulta
+from datos import empresas_normalizadas
+
+CANTIDAD_FILAS = 3000
+CANTIDAD_USUARIOS = 250
+HORAS_DE_DATOS = 30
+
+def generar_transacciones(semilla: int = 7) -> list:
+    """
+    Genera transacciones deterministas en orden cronológico, repartidas en las últimas `HORAS_DE_DATOS` horas.
+
+    Retorno:
+    - (list): [usuarios, empresas, cantidades, instantes].
+    """
+    generador = random.Random(semilla)
+    inicio = int(time.time()) - HORAS_DE_DATOS * 3600
+    usuarios, empresas, cantidades, instantes = [], [], [], []
+    for i in range(CANTIDAD_FILAS):
+        usuarios += [f"usuario{generador.randrange(CANTIDAD_USUARIOS):03d}"]
+        empresas += [generador.choice(empresas_normalizadas)]
+        cantidades += [generador.randint(1, 500)]
+        instantes += [inicio + i * HORAS_DE_DATOS * 3600 / CANTIDAD_FILAS]
+    return [usuarios, empresas, cantidades, instantes]
+
+def desordenar_instantes(transacciones: list, semilla: int = 5) -> list:
+    """
+    Copia de las transacciones con una de cada cinco filas atrasada hasta `HORAS_DE_DATOS` horas
+    (algunas quedan fuera de las últimas 24 horas) y la última fila una hora antes que la más reciente.
+
+    Retorno:
+    - (list): [usuarios, empresas, cantidades, instantes].
+    """
+    generador = random.Random(semilla)
+    instantes = list(transacciones[3])
+    for i in range(0, len(instantes), 5):
+        instantes[i] -= generador.uniform(0, HORAS_DE_DATOS * 3600)
+    instantes[-1] = max(instantes) - 3600
+    return transacciones[:3] + [instantes]
+
+def cargar_en_lotes(almacen, transacciones: list, tamano_lote: int = 700):
+    """
+    Agrega las transacciones al almacén con `agregar_lote`, de a `tamano_lote` filas.
+
+    Retorno:
+    - El mismo almacén.
+    """
+    usuarios, empresas, cantidades, instantes = transacciones
+    for inicio in range(0, len(usuarios), tamano_lote):
+        fin = inicio + tamano_lote
+        almacen.agregar_lote(usuarios[inicio:fin], empresas[inicio:fin], cantidades[inicio:fin], instantes[inicio:fin])
+    return almacen
+
+def estado_agregados(agregados) -> list:
+    """
+    Estado comparable de unos agregados: sumas en orden de aparición, totales y sketch de cuantiles.
+
+    Retorno:
+    - (list): Partes del estado, comparables con ==.
+    """
+    return [
+        list(agregados.acciones_por_usuario.items()), list(agregados.inversion_por_usuario.items()),
+        list(agregados.acciones_por_empresa.items()), list(agregados.inversion_por_empresa.items()),
+        list(agregados.tenencias.items()), agregados.inversion_total, agregados.total_acciones,
+        agregados.cuantiles_transacciones.a_diccionario(),
+    ]
+
+def resultados_consultas(almacen) -> dict:
+    """
+    Ejecuta todas las consultas del submenú sobre el almacén, sin mostrarlas.
+
+    Retorno:
+    - (dict): nombre de la consulta -> resultado.
+    """
+    resultados = {}
+    for numero, (nombre, consulta) in CONSULTAS.items():
+        resultados[nombre] = consulta(almacen, *parametros_consulta(numero, 4, 75), mostrar=False)
+    return resultados
+
+@pytest.fixture
+def transacciones() -> list:
+    return generar_transacciones()
+
+@pytest.fixture
+def transacciones_desordenadas(transacciones) -> list:
+    return desordenar_instantes(transacciones)
+
+@pytest.fixture
+def cargar():
+    return cargar_en_lotes
+
+@pytest.fixture
+def estado():
+    return estado_agregados
+
+@pytest.fixture
+def resultados():
+    return resultados_consultas
@@ -1,489 +1,720 @@
-from utilidades import ordenar_alfabeticamente, reconocer_numero
-from registro import detallar_transacciones
-from datos import empresas_normalizadas
-
-def visualizar(registro_transacciones: list) -> None:
-    """
-    Muestra un listado de transacciones ordenadas alfabéticamente por usuario.
-
-    Args:
-        registro_transacciones (list): Lista de transacciones: i[0]=Nombre, i[1]=Empresa, i[2]=Precio, i[3]= Cantidad, i[4]= Total invertido.
-        
-    Returns:
-        None: Imprime un informe estructurado de las transacciones en la consola.
-
-    Funcionamiento:
-    - Si no hay transacciones, muestra un mensaje de advertencia.
-    - Crea una copia de la lista de transacciones para evitar modificar la original.
-    - Ordena las transacciones alfabéticamente por el nombre del usuario usando `ordenar_alfabeticamente`.
-    - Formatea y muestra los datos en una tabla estructurada con alineación adecuada.
-    """
-    if not registro_transacciones:
-        print("\n⚠️ No hay transacciones registradas para mostrar.")
-    else:
-        copia_array_transacciones = []
-        for i in range(len(registro_transacciones)):
-            copia_array_transacciones += [registro_transacciones[i][:]]
-        ordenar_alfabeticamente(copia_array_transacciones, 0) 
-        print("\n--- 🧾 Listado Completo de Transacciones (Ordenado por Usuario A-Z) ---")
-        print(f"{'Usuario':<20} {'Acción':<10} {'Precio/U':<12} {'Cantidad':<10} {'Total USD':<12}")
-        print("-" * 70)
-        for i in range(len(copia_array_transacciones)):
-            transaccion = copia_array_transacciones[i]
-            usuario = transaccion[0]
-            accion = transaccion[1]
-            precio_unidad = f"${transaccion[2]:.2f}"
-            cantidad_ingresada = f"{transaccion[3]}" 
-            total_invertido = f"${transaccion[4]:.2f}"
-            print(f"{usuario:<20} {accion:<10} {precio_unidad:<12} {cantidad_ingresada:<10} {total_invertido:<12}")
-        print("-" * 70)
-    return None
-
-def consultar_total_acciones(registro_transacciones: list) -> None:
-    """
-    Calcula y muestra la cantidad total de acciones por usuario a partir de un registro de transacciones.
-
-    Args:
-        registro_transacciones (list): Lista de transacciones: i[0]=Nombre, i[1]=Empresa, i[2]=Precio, i[3]= Cantidad, i[4]= Total invertido.
-        
-    Returns:
-        None: Imprime la cantidad total de acciones por usuario en la consola.
-
-    Funcionamiento:
-    - Se recorre la lista de transacciones y se acumulan las acciones por usuario.
-    - Se evita el doble conteo utilizando listas auxiliares (`suma_usuarios` y `nombres_procesados`).
-    - Se muestran los resultados en pantalla con el formato adecuado.
-    """
-    print("\n--- 🔢 Cantidad Total de Acciones por Usuario ---")
-    if not registro_transacciones:
-        print("No hay datos.")
-    else:
-        suma_usuarios = []
-        nombres_procesados = []
-        for i in range(len(registro_transacciones)):
-            usuario = registro_transacciones[i][0]
-            cantidad = registro_transacciones[i][3]
-            esta = False
-            for j in range(len(nombres_procesados)):
-                if nombres_procesados[j] == usuario:
-                    esta = True
-                    for i in range(len(suma_usuarios)):
-                        if suma_usuarios[i][0] == usuario:
-                            suma_usuarios[i][1] += cantidad
-                            break
-                    break
-            if not esta:
-                suma_usuarios += [[usuario, cantidad]]
-                nombres_procesados += [usuario]
-        for i in range(len(suma_usuarios)):
-            print(f"👤 {suma_usuarios[i][0]}: {suma_usuarios[i][1]} acciones")
-    return None
-
-def consultar_promedio_empresas(registro_transacciones: list) -> None:
-    """
-    Calcula y muestra el promedio de acciones adquiridas por empresa en base a un registro de transacciones.
-
-    Args:
-        registro_transacciones (list): Lista de transacciones: i[0]=Nombre, i[1]=Empresa, i[2]=Precio, i[3]= Cantidad, i[4]= Total invertido.
-        
-    Returns:
-        None: Imprime el promedio de acciones adquiridas por empresa en la consola.
-
-    Funcionamiento:
-    - Se extrae el conjunto de usuarios únicos que han participado en transacciones.
-    - Se calcula la cantidad total de acciones adquiridas por empresa.
-    - Se obtiene el promedio de acciones por empresa dividiendo la cantidad total entre el número de usuarios activos.
-    - Si no hay usuarios activos, se ajusta el divisor para evitar errores de división por cero.
-    - Se muestra el resultado.
-    """
-    print("\n--- 📈 Promedio de Acciones Adquiridas por Empresa ---")
-    if not registro_transacciones:
-        print("No hay datos.")
-    else:
-        acciones_sumas = [] 
-        usuarios_unicos = [] 
-        for i in range(len(registro_transacciones)):
-            usuario = registro_transacciones[i][0]
-            esta = False
-            for j in range(len(usuarios_unicos)):
-                if usuarios_unicos[j] == usuario:
-                    esta = True
-                    break
-            if not esta:
-                usuarios_unicos += [usuario]
-        usuarios_activos = len(usuarios_unicos)
-        if usuarios_activos == 0:
-            usuarios_activos = 1 
-        for i in range(len(empresas_normalizadas)):
-            accion = empresas_normalizadas[i]
-            suma_cantidad_accion = 0
-            for j in range(len(registro_transacciones)):
-                if registro_transacciones[j][1] == accion:
-                    suma_cantidad_accion += registro_transacciones[j][3]
-            promedio = suma_cantidad_accion / usuarios_activos
-            acciones_sumas += [[accion, promedio]]
-        for i in range(len(acciones_sumas)):
-            print(f"🏭 {acciones_sumas[i][0]}: {acciones_sumas[i][1]:.2f} acciones en promedio")
-    return None
-
-def consultar_usuarios_total(registro_transacciones: list) -> None:
-    """
-    Calcula y muestra el total invertido por cada usuario en orden alfabético.
-
-    Args:
-        registro_transacciones (list): Lista de transacciones: i[0]=Nombre, i[1]=Empresa, i[2]=Precio, i[3]= Cantidad, i[4]= Total invertido.
-
-    Comportamiento:
-    - Si `registro_transacciones` está vacío, muestra "No hay datos."
-    - Suma el total invertido por cada usuario, asegurando que no se dupliquen nombres.
-    - Ordena la lista de usuarios alfabéticamente utilizando `ordenar_alfabeticamente`.
-    - Imprime el resultado con cada usuario y su inversión total en USD.
-
-    Retorno:
-    None
-    """
-    print("\n--- 🔃 Usuarios (A-Z) con Total Invertido ---")
-    if not registro_transacciones:
-        print("No hay datos.")
-    else:
-        usuarios_inversiones = []
-        nombres_procesados = []
-        for i in range(len(registro_transacciones)):
-            usuario = registro_transacciones[i][0]
-            total_invertido_transaccion = registro_transacciones[i][4]
-            esta = False
-            for j in range(len(nombres_procesados)):
-                if nombres_procesados[j] == usuario:
-                    esta = True
-                    for k in range(len(usuarios_inversiones)):
-                        if usuarios_inversiones[k][0] == usuario:
-                            usuarios_inversiones[k][1] += total_invertido_transaccion
-                            break
-                    break
-            if not esta:
-                usuarios_inversiones += [[usuario, total_invertido_transaccion]]
-                nombres_procesados += [usuario]
-        ordenar_alfabeticamente(usuarios_inversiones, 0)
-        for i in range(len(usuarios_inversiones)):
-            print(f"👤 {usuarios_inversiones[i][0]}: ${usuarios_inversiones[i][1]:.2f} USD")
-    return None
-
-def consultar_inversion_total(registro_transacciones: list) -> float:
-    """
-    Calcula el monto total invertido en todas las transacciones registradas.
-
-    Args:
-        registro_transacciones (list): Lista de transacciones: i[0]=Nombre, i[1]=Empresa, i[2]=Precio, i[3]= Cantidad, i[4]= Total invertido.
-
-    Comportamiento:
-    - Recorre `registro_transacciones` sumando el monto invertido de cada transacción.
-    - Devuelve el valor acumulado.
-
-    Retorno:
-    - (float): Monto total invertido en la cartera de transacciones.
-    """
-    inversion_total = 0.0
-    for i in range(len(registro_transacciones)):
-        inversion_total += registro_transacciones[i][4]
-    return inversion_total
-
-def consultar_acciones_usuario(registro_transacciones: list) -> None:
-    """
-    Identifica la empresa en la que cada usuario ha adquirido la mayor cantidad de acciones y muestra el resultado.
-
-    Args:
-        registro_transacciones (list): Lista de transacciones: i[0]=Nombre, i[1]=Empresa, i[2]=Precio, i[3]= Cantidad, i[4]= Total invertido.
-
-    Comportamiento:
-    - Si no hay registros en `registro_transacciones`, muestra "No hay datos."
-    - Obtiene una lista de usuarios únicos.
-    - Calcula la cantidad total de acciones adquiridas por cada usuario, agrupadas por empresa.
-    - Determina la empresa con más acciones por usuario y muestra el resultado.
-
-    Retorno:
-    None
-    """    
-    print("\n--- 🥇 Empresa con Mayor Cantidad de Acciones por Usuario ---")
-    
-    if not registro_transacciones:
-        print("No hay datos.")
-    else:
-        lista_usuarios = []
-        for i in range(len(registro_transacciones)):
-            usuario_actual = registro_transacciones[i][0]
-            existe_usuario = False
-            for j in range(len(lista_usuarios)):
-                if lista_usuarios[j] == usuario_actual:
-                    existe_usuario = True
-                    break
-            if not existe_usuario:
-                lista_usuarios += [usuario_actual]
-
-        for i in range(len(lista_usuarios) - 1):
-            for j in range(len(lista_usuarios) - i - 1):
-                if lista_usuarios[j] > lista_usuarios[j+1]:
-                    lista_usuarios[j], lista_usuarios[j+1] = lista_usuarios[j+1], lista_usuarios[j]
-                    
-        for i in range(len(lista_usuarios)):
-            usuario = lista_usuarios[i]
-            acciones_por_empresa = []
-            for j in range(len(registro_transacciones)):
-                if registro_transacciones[j][0] == usuario:
-                    empresa_actual = registro_transacciones[j][1]
-                    cantidad_acciones = registro_transacciones[j][3]
-                    empresa_existente = False
-                    for k in range(len(acciones_por_empresa)):
-                        if acciones_por_empresa[k][0] == empresa_actual:
-                            acciones_por_empresa[k][1] += cantidad_acciones
-                            empresa_existente = True
-                            break
-                    if not empresa_existente:
-                        acciones_por_empresa += [[empresa_actual, cantidad_acciones]]
-            
-            if not acciones_por_empresa:
-                print(f"👤 {usuario}: No tiene acciones registradas.")
-                continue
-            
-            empresa_mayor_acciones = acciones_por_empresa[0][0]
-            cantidad_maxima = acciones_por_empresa[0][1]
-            for j in range(1, len(acciones_por_empresa)):
-                if acciones_por_empresa[j][1] > cantidad_maxima:
-                    cantidad_maxima = acciones_por_empresa[j][1]
-                    empresa_mayor_acciones = acciones_por_empresa[j][0]
-            
-            print(f"👤 {usuario}: Más acciones en {empresa_mayor_acciones} ({cantidad_maxima} acciones)")
-    
-    return None
-
-def consultar_mayor_accion(registro_transacciones: list) -> None:
-    """
-    Determina qué acción tuvo la mayor inversión total en dólares dentro de la cartera de usuarios.
-
-    Args:
-        registro_transacciones (list): Lista de transacciones: i[0]=Nombre, i[1]=Empresa, i[2]=Precio, i[3]= Cantidad, i[4]= Total invertido.
-
-    Comportamiento:
-    - Si `registro_transacciones` está vacío, muestra "No hay datos."
-    - Calcula la inversión total por cada empresa.
-    - Identifica la empresa con el mayor monto de inversión acumulada.
-    - Muestra el resultado con el nombre de la acción y el total invertido.
-
-    Retorno:
-    None
-    """    
-    print("\n--- 💰 Acción con Mayor Inversión Total (USD) ---")
-    
-    if not registro_transacciones:
-        print("No hay datos.")
-    else:
-        inversiones_por_empresa = []
-        for i in range(len(empresas_normalizadas)):
-            empresa_actual = empresas_normalizadas[i]
-            total_invertido_empresa = 0.0
-            for j in range(len(registro_transacciones)):
-                if registro_transacciones[j][1] == empresa_actual:
-                    total_invertido_empresa += registro_transacciones[j][4]
-            inversiones_por_empresa += [[empresa_actual, total_invertido_empresa]]
-
-        if not inversiones_por_empresa:
-            print("No se pudo calcular la inversión por empresa.")
-        else:
-            empresa_mayor_inversion = inversiones_por_empresa[0][0]
-            monto_mayor_inversion = inversiones_por_empresa[0][1]
-            for i in range(1, len(inversiones_por_empresa)):
-                if inversiones_por_empresa[i][1] > monto_mayor_inversion:
-                    monto_mayor_inversion = inversiones_por_empresa[i][1]
-                    empresa_mayor_inversion = inversiones_por_empresa[i][0]
-
-            print(f"🥇 Acción: {empresa_mayor_inversion}, Total Invertido: ${monto_mayor_inversion:.2f} USD")
-
-    return None
-
-def consulta_porcentaje_inversion_por_usuario(registro_transacciones: list) -> None:
-    """
-    Calcula y muestra el porcentaje de inversión de cada usuario respecto al total de la cartera.
-
-    Args:
-        registro_transacciones (list): Lista de transacciones: i[0]=Nombre, i[1]=Empresa, i[2]=Precio, i[3]= Cantidad, i[4]= Total invertido.
-
-    Comportamiento:
-    - Si "registro_transacciones" está vacío, muestra "No hay datos."
-    - Obtiene la inversión total acumulada de la cartera.
-    - Suma la inversión individual de cada usuario.
-    - Calcula y muestra el porcentaje que representa cada usuario respecto al total.
-
-    Retorno:
-    None
-    """    
-    print("\n--- 📉 Porcentaje de Inversión por Usuario ---")
-    if not registro_transacciones:
-        print("No hay datos.")
-    else:
-        total_cartera = consultar_inversion_total(registro_transacciones)
-        if total_cartera == 0:
-            print("La inversión total de la cartera es 0, no se puede calcular porcentaje.")
-        else:
-            usuarios_inversiones = [] 
-            nombres_procesados = []
-            for i in range(len(registro_transacciones)):
-                usuario = registro_transacciones[i][0]
-                total_invertido_transaccion = registro_transacciones[i][4]
-                esta = False
-                for j in range(len(nombres_procesados)):
-                    if nombres_procesados[j] == usuario:
-                        esta = True
-                        for k in range(len(usuarios_inversiones)):
-                            if usuarios_inversiones[k][0] == usuario:
-                                usuarios_inversiones[k][1] += total_invertido_transaccion
-                                break
-                        break
-                if not esta:
-                    usuarios_inversiones += [[usuario, total_invertido_transaccion]]
-                    nombres_procesados += [usuario]
-            for i in range(len(usuarios_inversiones)):
-                porcentaje = (usuarios_inversiones[i][1] / total_cartera) * 100
-                print(f"👤 {usuarios_inversiones[i][0]}: {porcentaje:.2f}% del total")
-    return None
-
-def consulta_usuarios_superan_promedio_inversion(registro_transacciones: list) -> None:
-    """
-    Identifica y muestra los usuarios cuya inversión total supera el promedio de inversión.
-
-    Args:
-        registro_transacciones (list): Lista de transacciones: i[0]=Nombre, i[1]=Empresa, i[2]=Precio, i[3]= Cantidad, i[4]= Total invertido.
-
-    Comportamiento:
-    - Si "registro_transacciones" está vacío, muestra "No hay datos."
-    - Obtiene la lista de usuarios únicos con transacciones registradas.
-    - Calcula la inversión promedio de todos los usuarios.
-    - Recorre los usuarios y verifica quiénes superan la inversión promedio.
-    - Muestra el listado de usuarios que cumplen la condición.
-
-    Retorno:
-    None
-    """
-    print("\n--- 💰 Usuarios que Superan la Inversión Promedio ---")
-    if not registro_transacciones:
-        print("No hay datos.")
-    else:
-        usuarios_unicos = []
-        for i in range(len(registro_transacciones)):
-            usuario = registro_transacciones[i][0]
-            esta = False
-            for j in range(len(usuarios_unicos)):
-                if usuarios_unicos[j] == usuario:
-                    esta = True
-                break
-            if not esta: usuarios_unicos += [usuario]
-        usuarios_activos = len(usuarios_unicos)
-        if usuarios_activos == 0:
-            print("No hay usuarios con transacciones para calcular el promedio.")
-        else:
-            total_cartera = consultar_inversion_total(registro_transacciones)
-            promedio_inversion = total_cartera / usuarios_activos
-            print(f"(Inversión promedio por usuario: ${promedio_inversion:.2f} USD)")
-            usuarios_superan_res = []
-            usuarios_inversiones_totales = []
-            nombres_procesados_para_total = []
-            for i in range(len(registro_transacciones)):
-                usuario = registro_transacciones[i][0]
-                total_invertido_transaccion = registro_transacciones[i][4]
-                esta = False
-                for j in range(len(nombres_procesados_para_total)):
-                    if nombres_procesados_para_total[j] == usuario:
-                        esta = True
-                        for k in range(len(usuarios_inversiones_totales)):
-                            if usuarios_inversiones_totales[k][0] == usuario:
-                                usuarios_inversiones_totales[k][1] += total_invertido_transaccion
-                                break
-                        break
-                if not esta:
-                    usuarios_inversiones_totales += [[usuario, total_invertido_transaccion]]
-                    nombres_procesados_para_total += [usuario]
-            for i in range(len(usuarios_inversiones_totales)):
-                if usuarios_inversiones_totales[i][1] > promedio_inversion:
-                    usuarios_superan_res += [usuarios_inversiones_totales[i][0]]
-            if not usuarios_superan_res:
-                print("Ningún usuario supera la inversión promedio.")
-            else:
-                for i in range(len(usuarios_superan_res)):
-                    print(f"👤 {usuarios_superan_res[i]}")
-    return None
-
-def ejecutar_submenu_consultas(nombres_t: list, acciones_t: list, cantidades_t: list) -> None:
-    """
-    Muestra un submenú de consultas sobre las transacciones registradas y ejecuta la opción elegida por el usuario.
-
-    Args:
-        nombres_t (list): Lista con los nombres de usuarios que realizaron transacciones.
-        acciones_t (list): Lista con los nombres de las empresas cuyas acciones fueron adquiridas.
-        cantidades_t (list): Lista con la cantidad de acciones compradas por cada usuario.
-
-    Comportamiento:
-    - Si no hay transacciones registradas (nombres_t = vacío), muestra un mensaje de advertencia.
-    - Construye el "registro_transacciones" con los datos ingresados.
-    - Presenta un submenú con diferentes opciones de consulta.
-    - Valida la entrada del usuario para asegurarse de que es un número válido.
-    - Ejecuta la función correspondiente a la opción seleccionada, gestionando los errores si la opción es inválida.
-    - Permite al usuario volver al menú principal tras finalizar una consulta.
-
-    Retorno:
-    None
-    """
-    if not nombres_t:
-        print("⚠️ Primero debe registrar transacciones (opción 1 del menú principal).")
-    else:
-        registro_transacciones = detallar_transacciones(nombres_t, acciones_t, cantidades_t)
-        continuar_submenu = True
-        while continuar_submenu:
-            print("\n📋 Submenú de Consultas:")
-            print("  1. Cantidad total de acciones por usuario.")
-            print("  2. Promedio de acciones por empresa.")
-            print("  3. Usuarios (Z-A) con total invertido.")
-            print("  4. Inversión total acumulada.")
-            print("  5. Empresa con más acciones por usuario.")
-            print("  6. Acción con mayor inversión total (USD).")
-            print("  7. Porcentaje de inversión por usuario.")
-            print("  8. Usuarios que superan la inversión promedio.")
-            print("  9. Volver al menú principal.")
-            opcion_str = input("Seleccione una opción de consulta: ")
-            es_opcion_valida_formato = True
-            if not opcion_str: es_opcion_valida_formato = False
-            else:
-                for i in range(len(opcion_str)):
-                    if not reconocer_numero(opcion_str[i]):
-                        es_opcion_valida_formato = False
-                        break
-            if not es_opcion_valida_formato:
-                print("Error: Opción inválida, ingrese un número.")
-                continue
-            opcion_consulta = int(opcion_str)
-
-            match opcion_consulta:
-                case 1:
-                    consultar_total_acciones(registro_transacciones)
-                case 2:
-                    consultar_promedio_empresas(registro_transacciones)
-                case 3:
-                    consultar_usuarios_total(registro_transacciones)
-                case 4:
-                    total_g = consultar_inversion_total(registro_transacciones)
-                    print(f"\n💲 Inversión Total Acumulada: ${total_g:.2f} USD")
-                case 5:
-                    consultar_acciones_usuario(registro_transacciones)
-                case 6:
-                    consultar_mayor_accion(registro_transacciones)
-                case 7:
-                    consulta_porcentaje_inversion_por_usuario(registro_transacciones)
-                case 8:
-                    consulta_usuarios_superan_promedio_inversion(registro_transacciones)
-                case 9:
-                    print("↩️ Volviendo al menú principal...")
-                    continuar_submenu = False
-                case _:
-                    print("❌ Opción de consulta no válida.")
-
-            if continuar_submenu:
-                input("\nPresione Enter para continuar en Consultas...")
-
-    return None
+from itertools import islice
+from math import ceil
+import heapq
+from utilidades import ordenar_alfabeticamente, primeros_ordenados, reconocer_numero
+from datos import empresas_normalizadas
+from almacen import AlmacenTransacciones
+from presentacion import COLUMNAS_TRANSACCIONES, mostrar_lineas, renderizar_filas
+from cache_resultados import cache_consultas
+from moneda import a_dolares
+
+CANTIDAD_RANKING = 10
+PERCENTILES_REPORTADOS = (50, 90, 99)
+PERCENTIL_POR_DEFECTO = 90
+
+def visualizar(almacen: AlmacenTransacciones, limite: int = None, desplazamiento: int = 0, formato: str = "tabla", destino=None, cabeza: int = None, cola: int = None) -> int:
+    """
+    Muestra un listado de transacciones ordenadas alfabéticamente por usuario.
+
+    Args:
+        almacen (AlmacenTransacciones): Almacén columnar con las transacciones registradas.
+        limite (int, opcional): Tamaño de página: si se indica, muestra sólo `limite` transacciones del orden.
+        desplazamiento (int, opcional): Cantidad de transacciones del orden a saltear antes de mostrar
+            (cursor de la página; se obtiene del retorno de la página anterior).
+        formato (str, opcional): "tabla" (por defecto), "csv" o "jsonl".
+        destino (file-like, opcional): Dónde escribir el listado. Por defecto, la salida estándar.
+        cabeza (int, opcional): Vista truncada: muestra sólo las primeras `cabeza` transacciones...
+        cola (int, opcional): ...y las últimas `cola`, indicando cuántas se omitieron.
+        
+    Returns:
+        int: Desplazamiento de la página siguiente, o None si ya no quedan transacciones por mostrar.
+
+    Funcionamiento:
+    - Si no hay transacciones, muestra un mensaje de advertencia.
+    - Recorre las filas con `almacen.iterar_por_usuario`, que las arma de a una y ya en orden
+      alfabético por usuario (sin copiar ni ordenar todo el historial, y sin modificar el almacén).
+    - Escribe las filas con `renderizar_filas`, que las formatea en lotes y escribe en bloques grandes;
+      la memoria usada no depende de la cantidad de transacciones.
+    """
+    siguiente = None
+    if not almacen:
+        mostrar_lineas(["\n⚠️ No hay transacciones registradas para mostrar."], destino)
+    else:
+        filas = almacen.iterar_por_usuario(desplazamiento)
+        pagina = filas if limite is None else islice(filas, limite)
+        mostradas = renderizar_filas(
+            pagina, COLUMNAS_TRANSACCIONES, formato, destino, cabeza, cola,
+            titulo="\n--- 🧾 Listado Completo de Transacciones (Ordenado por Usuario A-Z) ---",
+        )
+        if limite is not None and mostradas == limite and next(filas, None) is not None:
+            siguiente = desplazamiento + mostradas
+    return siguiente
+
+def consultar_total_acciones(almacen: AlmacenTransacciones, mostrar: bool = True) -> list:
+    """
+    Calcula y muestra la cantidad total de acciones por usuario a partir de un registro de transacciones.
+
+    Args:
+        almacen (AlmacenTransacciones): Almacén columnar con las transacciones registradas.
+        mostrar (bool, opcional): Si es True (por defecto) imprime el resultado en la consola.
+        
+    Returns:
+        list: [[usuario, acciones], ...] en orden de primera aparición del usuario.
+
+    Funcionamiento:
+    - Lee las acciones por usuario de los agregados incrementales del almacén (no recorre el historial).
+    - Se muestran los resultados en pantalla con el formato adecuado.
+    """
+    suma_usuarios = []
+    for id_usuario, cantidad in almacen.acumulados.acciones_por_usuario.items():
+        suma_usuarios += [[almacen.nombres_usuarios[id_usuario], cantidad]]
+    if mostrar:
+        lineas = ["\n--- 🔢 Cantidad Total de Acciones por Usuario ---"]
+        if not almacen:
+            lineas += ["No hay datos."]
+        lineas += [f"👤 {usuario}: {acciones} acciones" for usuario, acciones in suma_usuarios]
+        mostrar_lineas(lineas)
+    return suma_usuarios
+
+def consultar_promedio_empresas(almacen: AlmacenTransacciones, mostrar: bool = True) -> list:
+    """
+    Calcula y muestra el promedio de acciones adquiridas por empresa en base a un registro de transacciones.
+
+    Args:
+        almacen (AlmacenTransacciones): Almacén columnar con las transacciones registradas.
+        mostrar (bool, opcional): Si es True (por defecto) imprime el resultado en la consola.
+        
+    Returns:
+        list: [[empresa, promedio], ...] en el orden de `empresas_normalizadas` (vacía si no hay datos).
+
+    Funcionamiento:
+    - La cantidad de usuarios únicos es la cantidad de claves de las acciones por usuario.
+    - La cantidad total de acciones por empresa se lee de los agregados incrementales.
+    - Se obtiene el promedio de acciones por empresa dividiendo la cantidad total entre el número de usuarios activos.
+    - Si no hay usuarios activos, se ajusta el divisor para evitar errores de división por cero.
+    - Se muestra el resultado.
+    """
+    acciones_sumas = [] 
+    if almacen:
+        usuarios_activos = len(almacen.acumulados.acciones_por_usuario)
+        if usuarios_activos == 0:
+            usuarios_activos = 1 
+        suma_por_empresa = almacen.acumulados.acciones_por_empresa
+        for i in range(len(empresas_normalizadas)):
+            accion = empresas_normalizadas[i]
+            suma_cantidad_accion = suma_por_empresa.get(almacen.ids_empresas.get(accion, -1), 0)
+            promedio = suma_cantidad_accion / usuarios_activos
+            acciones_sumas += [[accion, promedio]]
+    if mostrar:
+        lineas = ["\n--- 📈 Promedio de Acciones Adquiridas por Empresa ---"]
+        if not almacen:
+            lineas += ["No hay datos."]
+        lineas += [f"🏭 {empresa}: {promedio:.2f} acciones en promedio" for empresa, promedio in acciones_sumas]
+        mostrar_lineas(lineas)
+    return acciones_sumas
+
+def consultar_usuarios_total(almacen: AlmacenTransacciones, mostrar: bool = True) -> list:
+    """
+    Calcula y muestra el total invertido por cada usuario en orden alfabético.
+
+    Args:
+        almacen (AlmacenTransacciones): Almacén columnar con las transacciones registradas.
+        mostrar (bool, opcional): Si es True (por defecto) imprime el resultado en la consola.
+
+    Comportamiento:
+    - Si `almacen` está vacío, muestra "No hay datos."
+    - Toma el total invertido por cada usuario (en centavos) de los agregados incrementales del almacén
+      y lo convierte a USD.
+    - Ordena la lista de usuarios alfabéticamente utilizando `ordenar_alfabeticamente`.
+    - Imprime el resultado con cada usuario y su inversión total en USD.
+
+    Retorno:
+    - (list): [[usuario, total invertido], ...] ordenada por usuario (A-Z).
+    """
+    usuarios_inversiones = []
+    for id_usuario, total_usuario in almacen.acumulados.inversion_por_usuario.items():
+        usuarios_inversiones += [[almacen.nombres_usuarios[id_usuario], a_dolares(total_usuario)]]
+    ordenar_alfabeticamente(usuarios_inversiones, 0)
+    if mostrar:
+        lineas = ["\n--- 🔃 Usuarios (A-Z) con Total Invertido ---"]
+        if not almacen:
+            lineas += ["No hay datos."]
+        lineas += [f"👤 {usuario}: ${total:.2f} USD" for usuario, total in usuarios_inversiones]
+        mostrar_lineas(lineas)
+    return usuarios_inversiones
+
+def consultar_inversion_total(almacen: AlmacenTransacciones, mostrar: bool = False) -> float:
+    """
+    Calcula el monto total invertido en todas las transacciones registradas.
+
+    Args:
+        almacen (AlmacenTransacciones): Almacén columnar con las transacciones registradas.
+        mostrar (bool, opcional): Si es True imprime el resultado. Por defecto es False, ya que otras consultas la usan como cálculo auxiliar.
+
+    Comportamiento:
+    - Devuelve la inversión total mantenida incrementalmente por el almacén (O(1)), convertida de centavos a USD.
+
+    Retorno:
+    - (float): Monto total invertido en la cartera de transacciones.
+    """
+    inversion_total = a_dolares(almacen.acumulados.inversion_total)
+    if mostrar:
+        print(f"\n💲 Inversión Total Acumulada: ${inversion_total:.2f} USD")
+    return inversion_total
+
+def consultar_acciones_usuario(almacen: AlmacenTransacciones, mostrar: bool = True) -> list:
+    """
+    Identifica la empresa en la que cada usuario ha adquirido la mayor cantidad de acciones y muestra el resultado.
+
+    Args:
+        almacen (AlmacenTransacciones): Almacén columnar con las transacciones registradas.
+        mostrar (bool, opcional): Si es True (por defecto) imprime el resultado en la consola.
+
+    Comportamiento:
+    - Si no hay registros en `almacen`, muestra "No hay datos."
+    - Toma la mayor tenencia de cada usuario, mantenida incrementalmente por el almacén.
+    - Ordena los usuarios alfabéticamente y muestra el resultado.
+
+    Retorno:
+    - (list): [[usuario, empresa con más acciones, cantidad], ...] ordenada por usuario (A-Z).
+    """    
+    lista_usuarios = []
+    for id_usuario, (id_empresa, cantidad_maxima) in almacen.acumulados.mayor_por_usuario.items():
+        lista_usuarios += [[almacen.nombres_usuarios[id_usuario], almacen.nombres_empresas[id_empresa], cantidad_maxima]]
+    ordenar_alfabeticamente(lista_usuarios, 0)
+    if mostrar:
+        lineas = ["\n--- 🥇 Empresa con Mayor Cantidad de Acciones por Usuario ---"]
+        if not almacen:
+            lineas += ["No hay datos."]
+        lineas += [
+            f"👤 {usuario}: Más acciones en {empresa_mayor_acciones} ({cantidad_maxima} acciones)"
+            for usuario, empresa_mayor_acciones, cantidad_maxima in lista_usuarios
+        ]
+        mostrar_lineas(lineas)
+    return lista_usuarios
+
+def consultar_mayor_accion(almacen: AlmacenTransacciones, mostrar: bool = True) -> list:
+    """
+    Determina qué acción tuvo la mayor inversión total en dólares dentro de la cartera de usuarios.
+
+    Args:
+        almacen (AlmacenTransacciones): Almacén columnar con las transacciones registradas.
+        mostrar (bool, opcional): Si es True (por defecto) imprime el resultado en la consola.
+
+    Comportamiento:
+    - Si `almacen` está vacío, muestra "No hay datos."
+    - Toma la inversión total por cada empresa de los agregados incrementales.
+    - Identifica la empresa con el mayor monto de inversión acumulada (comparando centavos enteros).
+    - Muestra el resultado con el nombre de la acción y el total invertido.
+
+    Retorno:
+    - (list): [empresa, total invertido], o lista vacía si no hay datos.
+    """    
+    mayor_inversion = []
+    if almacen:
+        total_por_empresa = almacen.acumulados.inversion_por_empresa
+        inversiones_por_empresa = []
+        for i in range(len(empresas_normalizadas)):
+            empresa_actual = empresas_normalizadas[i]
+            total_invertido_empresa = total_por_empresa.get(almacen.ids_empresas.get(empresa_actual, -1), 0)
+            inversiones_por_empresa += [[empresa_actual, total_invertido_empresa]]
+        if inversiones_por_empresa:
+            mayor_inversion = inversiones_por_empresa[0]
+            for i in range(1, len(inversiones_por_empresa)):
+                if inversiones_por_empresa[i][1] > mayor_inversion[1]:
+                    mayor_inversion = inversiones_por_empresa[i]
+            mayor_inversion = [mayor_inversion[0], a_dolares(mayor_inversion[1])]
+    if mostrar:
+        print("\n--- 💰 Acción con Mayor Inversión Total (USD) ---")
+        if not almacen:
+            print("No hay datos.")
+        elif not mayor_inversion:
+            print("No se pudo calcular la inversión por empresa.")
+        else:
+            print(f"🥇 Acción: {mayor_inversion[0]}, Total Invertido: ${mayor_inversion[1]:.2f} USD")
+    return mayor_inversion
+
+def consulta_porcentaje_inversion_por_usuario(almacen: AlmacenTransacciones, mostrar: bool = True) -> list:
+    """
+    Calcula y muestra el porcentaje de inversión de cada usuario respecto al total de la cartera.
+
+    Args:
+        almacen (AlmacenTransacciones): Almacén columnar con las transacciones registradas.
+        mostrar (bool, opcional): Si es True (por defecto) imprime el resultado en la consola.
+
+    Comportamiento:
+    - Si "almacen" está vacío, muestra "No hay datos."
+    - Toma la inversión de cada usuario y la inversión total de la cartera de los agregados incrementales.
+    - Calcula y muestra el porcentaje que representa cada usuario respecto al total (cociente de centavos exactos).
+
+    Retorno:
+    - (list): [[usuario, porcentaje], ...] en orden de primera aparición (vacía si el total es 0).
+    """    
+    porcentajes = []
+    total_cartera = almacen.acumulados.inversion_total
+    if total_cartera != 0:
+        for id_usuario, total_usuario in almacen.acumulados.inversion_por_usuario.items():
+            porcentajes += [[almacen.nombres_usuarios[id_usuario], (total_usuario / total_cartera) * 100]]
+    if mostrar:
+        lineas = ["\n--- 📉 Porcentaje de Inversión por Usuario ---"]
+        if not almacen:
+            lineas += ["No hay datos."]
+        elif total_cartera == 0:
+            lineas += ["La inversión total de la cartera es 0, no se puede calcular porcentaje."]
+        lineas += [f"👤 {usuario}: {porcentaje:.2f}% del total" for usuario, porcentaje in porcentajes]
+        mostrar_lineas(lineas)
+    return porcentajes
+
+def consulta_usuarios_superan_promedio_inversion(almacen: AlmacenTransacciones, mostrar: bool = True) -> list:
+    """
+    Identifica y muestra los usuarios cuya inversión total supera el promedio de inversión.
+
+    Args:
+        almacen (AlmacenTransacciones): Almacén columnar con las transacciones registradas.
+        mostrar (bool, opcional): Si es True (por defecto) imprime el resultado en la consola.
+
+    Comportamiento:
+    - Si "almacen" está vacío, muestra "No hay datos."
+    - Toma la inversión por usuario de los agregados incrementales; sus claves son los usuarios únicos.
+    - Calcula la inversión promedio de todos los usuarios con la inversión total de la cartera.
+    - Recorre los usuarios y verifica quiénes superan la inversión promedio. La comparación se hace en
+      enteros (total del usuario * usuarios > total de la cartera), sin redondear el promedio.
+    - Muestra el listado de usuarios que cumplen la condición.
+
+    Retorno:
+    - (list): Nombres de los usuarios que superan el promedio, en orden de primera aparición.
+    """
+    suma_usuarios = almacen.acumulados.inversion_por_usuario
+    usuarios_activos = len(suma_usuarios)
+    promedio_inversion = 0.0
+    usuarios_superan_res = []
+    if usuarios_activos:
+        inversion_total = almacen.acumulados.inversion_total
+        promedio_inversion = a_dolares(inversion_total) / usuarios_activos
+        for id_usuario, total_usuario in suma_usuarios.items():
+            if total_usuario * usuarios_activos > inversion_total:
+                usuarios_superan_res += [almacen.nombres_usuarios[id_usuario]]
+    if mostrar:
+        print("\n--- 💰 Usuarios que Superan la Inversión Promedio ---")
+        if not almacen:
+            print("No hay datos.")
+        elif usuarios_activos == 0:
+            print("No hay usuarios con transacciones para calcular el promedio.")
+        else:
+            print(f"(Inversión promedio por usuario: ${promedio_inversion:.2f} USD)")
+            if not usuarios_superan_res:
+                print("Ningún usuario supera la inversión promedio.")
+            mostrar_lineas([f"👤 {usuario}" for usuario in usuarios_superan_res])
+    return usuarios_superan_res
+
+def consultar_top_inversores(almacen: AlmacenTransacciones, cantidad: int = CANTIDAD_RANKING, mostrar: bool = True) -> list:
+    """
+    Obtiene los `cantidad` usuarios con mayor inversión total (USD).
+
+    Args:
+        almacen (AlmacenTransacciones): Almacén columnar con las transacciones registradas.
+        cantidad (int, opcional): Cantidad de posiciones del ranking (N).
+        mostrar (bool, opcional): Si es True (por defecto) imprime el resultado en la consola.
+
+    Comportamiento:
+    - Toma la inversión por usuario de los agregados incrementales y elige los N mayores con un heap
+      acotado (`primeros_ordenados`), en O(u log N) para u usuarios, sin ordenar a todos.
+    - A igual inversión queda primero el usuario que apareció antes.
+
+    Retorno:
+    - (list): [[usuario, total invertido en USD], ...] de mayor a menor.
+    """
+    inversiones = []
+    for id_usuario, total_usuario in almacen.acumulados.inversion_por_usuario.items():
+        inversiones += [[id_usuario, total_usuario]]
+    ranking = []
+    for id_usuario, total_usuario in primeros_ordenados(inversiones, 1, cantidad, descendente=True):
+        ranking += [[almacen.nombres_usuarios[id_usuario], a_dolares(total_usuario)]]
+    if mostrar:
+        lineas = [f"\n--- 🏆 Top {cantidad} Inversores (USD) ---"]
+        if not almacen:
+            lineas += ["No hay datos."]
+        lineas += [f"{posicion}. 👤 {usuario}: ${total:.2f} USD" for posicion, (usuario, total) in enumerate(ranking, 1)]
+        mostrar_lineas(lineas)
+    return ranking
+
+def _top_empresas(almacen: AlmacenTransacciones, por_empresa: dict, cantidad: int) -> list:
+    """
+    Elige las `cantidad` empresas con mayor valor en un agregado por empresa (id -> valor).
+
+    Retorno:
+    - (list): [[empresa, valor], ...] de mayor a menor; a igual valor, en el orden de `empresas_normalizadas`
+      y luego el de aparición.
+    """
+    valores = []
+    vistas = set()
+    for empresa in empresas_normalizadas:
+        id_empresa = almacen.ids_empresas.get(empresa, -1)
+        if id_empresa in por_empresa:
+            valores += [[empresa, por_empresa[id_empresa]]]
+            vistas.add(id_empresa)
+    for id_empresa, valor in por_empresa.items():
+        if id_empresa not in vistas:
+            valores += [[almacen.nombres_empresas[id_empresa], valor]]
+    return primeros_ordenados(valores, 1, cantidad, descendente=True)
+
+def consultar_top_empresas_inversion(almacen: AlmacenTransacciones, cantidad: int = CANTIDAD_RANKING, mostrar: bool = True) -> list:
+    """
+    Obtiene las `cantidad` empresas con mayor inversión total (USD).
+
+    Args:
+        almacen (AlmacenTransacciones): Almacén columnar con las transacciones registradas.
+        cantidad (int, opcional): Cantidad de posiciones del ranking (N).
+        mostrar (bool, opcional): Si es True (por defecto) imprime el resultado en la consola.
+
+    Comportamiento:
+    - Elige las N mayores de la inversión por empresa de los agregados incrementales con un heap acotado.
+
+    Retorno:
+    - (list): [[empresa, total invertido en USD], ...] de mayor a menor.
+    """
+    ranking = []
+    for empresa, total_empresa in _top_empresas(almacen, almacen.acumulados.inversion_por_empresa, cantidad):
+        ranking += [[empresa, a_dolares(total_empresa)]]
+    if mostrar:
+        lineas = [f"\n--- 🏆 Top {cantidad} Empresas por Inversión (USD) ---"]
+        if not almacen:
+            lineas += ["No hay datos."]
+        lineas += [f"{posicion}. 🏭 {empresa}: ${total:.2f} USD" for posicion, (empresa, total) in enumerate(ranking, 1)]
+        mostrar_lineas(lineas)
+    return ranking
+
+def consultar_top_empresas_acciones(almacen: AlmacenTransacciones, cantidad: int = CANTIDAD_RANKING, mostrar: bool = True) -> list:
+    """
+    Obtiene las `cantidad` empresas con más acciones adquiridas.
+
+    Args:
+        almacen (AlmacenTransacciones): Almacén columnar con las transacciones registradas.
+        cantidad (int, opcional): Cantidad de posiciones del ranking (N).
+        mostrar (bool, opcional): Si es True (por defecto) imprime el resultado en la consola.
+
+    Comportamiento:
+    - Elige las N mayores de las acciones por empresa de los agregados incrementales con un heap acotado.
+
+    Retorno:
+    - (list): [[empresa, acciones], ...] de mayor a menor.
+    """
+    ranking = _top_empresas(almacen, almacen.acumulados.acciones_por_empresa, cantidad)
+    if mostrar:
+        lineas = [f"\n--- 🏆 Top {cantidad} Empresas por Acciones ---"]
+        if not almacen:
+            lineas += ["No hay datos."]
+        lineas += [f"{posicion}. 🏭 {empresa}: {acciones} acciones" for posicion, (empresa, acciones) in enumerate(ranking, 1)]
+        mostrar_lineas(lineas)
+    return ranking
+
+def consultar_top_tenencias_usuario(almacen: AlmacenTransacciones, cantidad: int = CANTIDAD_RANKING, mostrar: bool = True) -> list:
+    """
+    Obtiene las `cantidad` mayores tenencias (empresas con más acciones) de cada usuario.
+
+    Args:
+        almacen (AlmacenTransacciones): Almacén columnar con las transacciones registradas.
+        cantidad (int, opcional): Cantidad de tenencias por usuario (k).
+        mostrar (bool, opcional): Si es True (por defecto) imprime el resultado en la consola.
+
+    Comportamiento:
+    - Recorre una vez las tenencias (pares usuario-empresa) de los agregados incrementales y mantiene un
+      heap de a lo sumo k elementos por usuario: O(p log k) para p pares, sin ordenar las tenencias.
+    - A igual cantidad de acciones gana la empresa que el usuario compró primero, igual que en
+      `consultar_acciones_usuario` (cuyo resultado coincide con la primera posición de este ranking).
+
+    Retorno:
+    - (list): [[usuario, empresa, acciones], ...] por usuario (A-Z) y, dentro de cada usuario, de mayor a menor.
+    """
+    tenencias_por_usuario = {}
+    if cantidad > 0:
+        for orden, ((id_usuario, id_empresa), tenencia) in enumerate(almacen.acumulados.tenencias.items()):
+            monticulo = tenencias_por_usuario.get(id_usuario)
+            if monticulo is None:
+                monticulo = []
+                tenencias_por_usuario[id_usuario] = monticulo
+            elemento = (tenencia, -orden, id_empresa)
+            if len(monticulo) < cantidad:
+                heapq.heappush(monticulo, elemento)
+            elif elemento > monticulo[0]:
+                heapq.heapreplace(monticulo, elemento)
+    ranking = []
+    for id_usuario, monticulo in tenencias_por_usuario.items():
+        for tenencia, _, id_empresa in sorted(monticulo, reverse=True):
+            ranking += [[almacen.nombres_usuarios[id_usuario], almacen.nombres_empresas[id_empresa], tenencia]]
+    ranking.sort(key=lambda fila: fila[0])
+    if mostrar:
+        lineas = [f"\n--- 🏆 Top {cantidad} Tenencias por Usuario ---"]
+        if not almacen:
+            lineas += ["No hay datos."]
+        lineas += [f"👤 {usuario}: {empresa} ({acciones} acciones)" for usuario, empresa, acciones in ranking]
+        mostrar_lineas(lineas)
+    return ranking
+
+def _percentiles_exactos(valores, fracciones: list) -> list:
+    """
+    Calcula percentiles exactos de una colección de valores por el método del rango más cercano.
+
+    Args:
+        valores (iterable): Valores a resumir (por ejemplo, la inversión de cada usuario en centavos).
+        fracciones (list): Fracciones pedidas, entre 0 y 1.
+
+    Comportamiento:
+    - Ordena los valores una sola vez (O(u log u)) y toma, para cada fracción f, el menor valor v tal que
+      al menos f del total es menor o igual a v: la misma definición que `SketchCuantiles.cuantil`.
+
+    Retorno:
+    - (list): Valor de cada fracción, en el mismo orden (None si no hay valores).
+    """
+    ordenados = sorted(valores)
+    if not ordenados:
+        return [None] * len(fracciones)
+    resultado = []
+    for fraccion in fracciones:
+        resultado += [ordenados[max(ceil(fraccion * len(ordenados)) - 1, 0)]]
+    return resultado
+
+def consultar_percentiles_inversion(almacen: AlmacenTransacciones, mostrar: bool = True) -> list:
+    """
+    Estima la mediana, el p90 y el p99 de la inversión por usuario y de la inversión por transacción (USD).
+
+    Args:
+        almacen (AlmacenTransacciones): Almacén columnar con las transacciones registradas.
+        mostrar (bool, opcional): Si es True (por defecto) imprime el resultado en la consola.
+
+    Comportamiento:
+    - Los percentiles por transacción salen del sketch que los agregados incrementales alimentan con
+      cada transacción registrada: la consulta sólo recorre el sketch (tamaño acotado), no el historial.
+    - Son estimaciones con error de rango de alrededor del 1%; con pocos valores (hasta unos 200) son exactos.
+    - Los percentiles por usuario son exactos: se ordena una vez la inversión de cada usuario (O(u log u)),
+      ya que su valor final recién se conoce al consultar y la cantidad de usuarios es acotada.
+
+    Retorno:
+    - (list): [[medida, percentil, valor en USD], ...], con medida "por_usuario" o "por_transaccion".
+    """
+    fracciones = [percentil / 100 for percentil in PERCENTILES_REPORTADOS]
+    sketch = almacen.acumulados.cuantiles_transacciones
+    inversion_por_usuario = almacen.acumulados.inversion_por_usuario
+    medidas = [
+        ["por_usuario", _percentiles_exactos(inversion_por_usuario.values(), fracciones)],
+        ["por_transaccion", sketch.cuantiles(fracciones)],
+    ]
+    percentiles = []
+    for medida, valores in medidas:
+        for percentil, valor in zip(PERCENTILES_REPORTADOS, valores):
+            if valor is not None:
+                percentiles += [[medida, percentil, a_dolares(valor)]]
+    if mostrar:
+        lineas = ["\n--- 📊 Percentiles de Inversión (USD) ---"]
+        if not almacen:
+            lineas += ["No hay datos."]
+        for medida, titulo, cantidad in (
+            ["por_usuario", "Por usuario", len(inversion_por_usuario)],
+            ["por_transaccion", "Por transacción", len(sketch)],
+        ):
+            valores = [f"p{percentil} ${valor:.2f}" for nombre, percentil, valor in percentiles if nombre == medida]
+            if valores:
+                lineas += [f"{titulo} ({cantidad}): " + " | ".join(valores) + " USD"]
+        mostrar_lineas(lineas)
+    return percentiles
+
+def consultar_usuarios_sobre_percentil(almacen: AlmacenTransacciones, percentil: int = PERCENTIL_POR_DEFECTO, mostrar: bool = True) -> list:
+    """
+    Obtiene los usuarios cuya inversión total supera el percentil `percentil` de la inversión por usuario.
+
+    Args:
+        almacen (AlmacenTransacciones): Almacén columnar con las transacciones registradas.
+        percentil (int, opcional): Percentil de corte, entre 1 y 99.
+        mostrar (bool, opcional): Si es True (por defecto) imprime el resultado en la consola.
+
+    Comportamiento:
+    - Calcula el umbral exacto ordenando la inversión de los u usuarios (O(u log u)) y luego los recorre
+      una vez, comparando en centavos enteros.
+
+    Retorno:
+    - (list): [[usuario, total invertido en USD], ...] en orden de primera aparición.
+    """
+    inversion_por_usuario = almacen.acumulados.inversion_por_usuario
+    umbral = _percentiles_exactos(inversion_por_usuario.values(), [percentil / 100])[0]
+    usuarios_sobre = []
+    if umbral is not None:
+        for id_usuario, total_usuario in inversion_por_usuario.items():
+            if total_usuario > umbral:
+                usuarios_sobre += [[almacen.nombres_usuarios[id_usuario], a_dolares(total_usuario)]]
+    if mostrar:
+        lineas = [f"\n--- 📊 Usuarios sobre el Percentil {percentil} de Inversión ---"]
+        if umbral is None:
+            lineas += ["No hay datos."]
+        else:
+            lineas += [f"(p{percentil} de la inversión por usuario: ${a_dolares(umbral):.2f} USD)"]
+            if not usuarios_sobre:
+                lineas += ["Ningún usuario supera ese percentil."]
+        lineas += [f"👤 {usuario}: ${total:.2f} USD" for usuario, total in usuarios_sobre]
+        mostrar_lineas(lineas)
+    return usuarios_sobre
+
+CONSULTAS = {
+    1: ["total_acciones_por_usuario", consultar_total_acciones],
+    2: ["promedio_acciones_por_empresa", consultar_promedio_empresas],
+    3: ["total_invertido_por_usuario", consultar_usuarios_total],
+    4: ["inversion_total", consultar_inversion_total],
+    5: ["empresa_con_mas_acciones_por_usuario", consultar_acciones_usuario],
+    6: ["accion_con_mayor_inversion", consultar_mayor_accion],
+    7: ["porcentaje_inversion_por_usuario", consulta_porcentaje_inversion_por_usuario],
+    8: ["usuarios_superan_promedio", consulta_usuarios_superan_promedio_inversion],
+    10: ["top_inversores", consultar_top_inversores],
+    11: ["top_empresas_por_inversion", consultar_top_empresas_inversion],
+    12: ["top_empresas_por_acciones", consultar_top_empresas_acciones],
+    13: ["top_tenencias_por_usuario", consultar_top_tenencias_usuario],
+    14: ["percentiles_inversion", consultar_percentiles_inversion],
+    15: ["usuarios_sobre_percentil", consultar_usuarios_sobre_percentil],
+}
+
+CONSULTAS_RANKING = (10, 11, 12, 13)
+CONSULTAS_PERCENTIL = (15,)
+
+def parametros_consulta(numero_consulta: int, cantidad_ranking: int = CANTIDAD_RANKING, percentil: int = PERCENTIL_POR_DEFECTO) -> tuple:
+    """
+    Obtiene los parámetros adicionales con que se llama a una consulta de `CONSULTAS`.
+
+    Retorno:
+    - (tuple): (cantidad_ranking,) para las consultas de ranking (`CONSULTAS_RANKING`), (percentil,) para
+      las de percentil (`CONSULTAS_PERCENTIL`); vacía para las demás.
+    """
+    if numero_consulta in CONSULTAS_RANKING:
+        return (cantidad_ranking,)
+    if numero_consulta in CONSULTAS_PERCENTIL:
+        return (percentil,)
+    return ()
+
+def es_entero_positivo(texto: str) -> bool:
+    """
+    Verifica que un texto contenga sólo dígitos y represente un entero mayor a 0.
+
+    Retorno:
+    - (bool): True si es un entero positivo.
+    """
+    for i in range(len(texto)):
+        if not reconocer_numero(texto[i]):
+            return False
+    return bool(texto) and int(texto) > 0
+
+def pedir_cantidad_ranking() -> int:
+    """
+    Solicita la cantidad de posiciones (N) de un ranking.
+
+    Comportamiento:
+    - Enter vacío usa `CANTIDAD_RANKING`; vuelve a preguntar si lo ingresado no es un entero positivo.
+
+    Retorno:
+    - (int): Cantidad de posiciones.
+    """
+    cantidad = 0
+    while cantidad <= 0:
+        cantidad_str = input(f"Cantidad de posiciones (Enter = {CANTIDAD_RANKING}): ")
+        if not cantidad_str:
+            cantidad = CANTIDAD_RANKING
+        elif es_entero_positivo(cantidad_str):
+            cantidad = int(cantidad_str)
+        else:
+            print("Error: Ingrese un número entero mayor a 0.")
+    return cantidad
+
+def pedir_percentil() -> int:
+    """
+    Solicita el percentil de corte (1 a 99).
+
+    Comportamiento:
+    - Enter vacío usa `PERCENTIL_POR_DEFECTO`; vuelve a preguntar si lo ingresado no es un entero entre 1 y 99.
+
+    Retorno:
+    - (int): Percentil.
+    """
+    percentil = 0
+    while percentil <= 0:
+        percentil_str = input(f"Percentil (1-99, Enter = {PERCENTIL_POR_DEFECTO}): ")
+        if not percentil_str:
+            percentil = PERCENTIL_POR_DEFECTO
+        elif es_entero_positivo(percentil_str) and int(percentil_str) < 100:
+            percentil = int(percentil_str)
+        else:
+            print("Error: Ingrese un número entero entre 1 y 99.")
+    return percentil
+
+def ejecutar_submenu_consultas(almacen: AlmacenTransacciones) -> None:
+    """
+    Muestra un submenú de consultas sobre las transacciones registradas y ejecuta la opción elegida por el usuario.
+
+    Args:
+        almacen (AlmacenTransacciones): Almacén columnar con las transacciones registradas.
+
+    Comportamiento:
+    - Si no hay transacciones registradas (almacen vacío), muestra un mensaje de advertencia.
+    - Las consultas leen directamente las columnas del almacén, sin reconstruir un registro intermedio.
+    - Presenta un submenú con diferentes opciones de consulta. Los rankings (opciones 10 a 13) piden
+      además la cantidad de posiciones N, y la opción 15 el percentil de corte.
+    - Valida la entrada del usuario para asegurarse de que es un número válido.
+    - Ejecuta la función correspondiente a la opción seleccionada, gestionando los errores si la opción es inválida.
+    - Los resultados pasan por `cache_consultas`: repetir una consulta sin que se hayan registrado
+      transacciones nuevas muestra el resultado guardado sin recalcularlo.
+    - Permite al usuario volver al menú principal tras finalizar una consulta.
+
+    Retorno:
+    None
+    """
+    if not almacen:
+        print("⚠️ Primero debe registrar transacciones (opción 1 del menú principal).")
+    else:
+        continuar_submenu = True
+        while continuar_submenu:
+            print("\n📋 Submenú de Consultas:")
+            print("  1. Cantidad total de acciones por usuario.")
+            print("  2. Promedio de acciones por empresa.")
+            print("  3. Usuarios (Z-A) con total invertido.")
+            print("  4. Inversión total acumulada.")
+            print("  5. Empresa con más acciones por usuario.")
+            print("  6. Acción con mayor inversión total (USD).")
+            print("  7. Porcentaje de inversión por usuario.")
+            print("  8. Usuarios que superan la inversión promedio.")
+            print("  9. Volver al menú principal.")
+            print(" 10. Top N inversores (USD).")
+            print(" 11. Top N empresas por inversión (USD).")
+            print(" 12. Top N empresas por acciones.")
+            print(" 13. Top N tenencias de cada usuario.")
+            print(" 14. Mediana, p90 y p99 de la inversión.")
+            print(" 15. Usuarios sobre el percentil X de inversión.")
+            opcion_str = input("Seleccione una opción de consulta: ")
+            es_opcion_valida_formato = True
+            if not opcion_str: es_opcion_valida_formato = False
+            else:
+                for i in range(len(opcion_str)):
+                    if not reconocer_numero(opcion_str[i]):
+                        es_opcion_valida_formato = False
+                        break
+            if not es_opcion_valida_formato:
+                print("Error: Opción inválida, ingrese un número.")
+                continue
+            opcion_consulta = int(opcion_str)
+
+            match opcion_consulta:
+                case 1 | 2 | 3 | 4 | 5 | 6 | 7 | 8 | 14:
+                    nombre_consulta, funcion_consulta = CONSULTAS[opcion_consulta]
+                    cache_consultas.ejecutar(almacen, nombre_consulta, funcion_consulta)
+                case 10 | 11 | 12 | 13:
+                    nombre_consulta, funcion_consulta = CONSULTAS[opcion_consulta]
+                    parametros = parametros_consulta(opcion_consulta, pedir_cantidad_ranking())
+                    cache_consultas.ejecutar(almacen, nombre_consulta, funcion_consulta, parametros)
+                case 15:
+                    nombre_consulta, funcion_consulta = CONSULTAS[opcion_consulta]
+                    parametros = parametros_consulta(opcion_consulta, percentil=pedir_percentil())
+                    cache_consultas.ejecutar(almacen, nombre_consulta, funcion_consulta, parametros)
+                case 9:
+                    print("↩️ Volviendo al menú principal...")
+                    continuar_submenu = False
+                case _:
+                    print("❌ Opción de consulta no válida.")
+
+            if continuar_submenu:
+                input("\nPresione Enter para continuar en Consultas...")
+
+    return None
@@ -0,0 +1,222 @@
+from math import ceil
+
+PRECISION_SKETCH = 200
+FACTOR_NIVELES = 2 / 3
+
+class SketchCuantiles:
+    """
+    Sketch de cuantiles KLL: resume un flujo de valores con memoria acotada y se puede combinar.
+
+    Args:
+        k (int, opcional): Precisión. El error de rango es del orden de 1.7 / k (≈1% con k=200) y la
+            memoria es O(k) valores, sin importar cuántos se agreguen.
+
+    Comportamiento:
+    - Los valores se guardan en niveles (compactadores); un valor del nivel h representa 2**h valores originales.
+    - Cuando el sketch llega a su capacidad, el nivel lleno más bajo se ordena y pasa la mitad de sus
+      valores (los de posición par o impar, alternando) al nivel siguiente.
+    - La elección par/impar alterna de forma determinista en cada nivel, de modo que el mismo flujo de
+      valores produce siempre el mismo sketch (y los mismos resultados) en todos los motores.
+    - Mientras no haya compactaciones (hasta unos k valores) los cuantiles son exactos.
+    - `combinar` une dos sketches (por ejemplo, de fragmentos procesados en paralelo) nivel por nivel.
+    """
+
+    def __init__(self, k: int = PRECISION_SKETCH) -> None:
+        self.k = k
+        self.niveles = [[]]
+        self.desplazamientos = [0]
+        self.cantidad = 0
+        self.tamano = 0
+        self.tamano_maximo = self._capacidad(0)
+
+    def __len__(self) -> int:
+        return self.cantidad
+
+    def _capacidad(self, nivel: int) -> int:
+        """
+        Capacidad de un nivel: los niveles más bajos son más chicos (factor 2/3 por nivel de distancia al más alto).
+
+        Retorno:
+        - (int): Cantidad de valores que admite el nivel antes de compactarse.
+        """
+        profundidad = len(self.niveles) - nivel - 1
+        return int(ceil(self.k * FACTOR_NIVELES ** profundidad)) + 1
+
+    def _crecer(self) -> None:
+        """
+        Agrega un nivel y recalcula la capacidad total.
+
+        Retorno:
+        None
+        """
+        self.niveles += [[]]
+        self.desplazamientos += [0]
+        self.tamano_maximo = 0
+        for nivel in range(len(self.niveles)):
+            self.tamano_maximo += self._capacidad(nivel)
+        return None
+
+    def _compactar(self) -> None:
+        """
+        Compacta el nivel lleno más bajo hacia el siguiente.
+
+        Retorno:
+        None
+        """
+        for nivel in range(len(self.niveles)):
+            if len(self.niveles[nivel]) >= self._capacidad(nivel):
+                if nivel + 1 == len(self.niveles):
+                    self._crecer()
+                valores = sorted(self.niveles[nivel])
+                sobrante = []
+                if len(valores) % 2:
+                    sobrante = [valores.pop()]
+                desplazamiento = self.desplazamientos[nivel]
+                self.desplazamientos[nivel] = 1 - desplazamiento
+                self.niveles[nivel + 1] += valores[desplazamiento::2]
+                self.niveles[nivel] = sobrante
+                self.tamano -= len(valores) // 2
+                return None
+        return None
+
+    def agregar(self, valor) -> None:
+        """
+        Incorpora un valor al sketch en O(1) amortizado.
+
+        Retorno:
+        None
+        """
+        self.niveles[0].append(valor)
+        self.cantidad += 1
+        self.tamano += 1
+        if self.tamano >= self.tamano_maximo:
+            self._compactar()
+        return None
+
+    def extender(self, valores) -> None:
+        """
+        Incorpora una secuencia de valores, en orden.
+
+        Comportamiento:
+        - Copia los valores al primer nivel de a tramos, hasta la capacidad libre del sketch, y compacta
+          en los mismos puntos que `agregar` valor por valor: el sketch resultante es idéntico.
+
+        Retorno:
+        None
+        """
+        valores = list(valores)
+        posicion = 0
+        while posicion < len(valores):
+            tramo = valores[posicion:posicion + max(1, self.tamano_maximo - self.tamano)]
+            self.niveles[0] += tramo
+            self.cantidad += len(tramo)
+            self.tamano += len(tramo)
+            posicion += len(tramo)
+            if self.tamano >= self.tamano_maximo:
+                self._compactar()
+        return None
+
+    def combinar(self, otro: "SketchCuantiles") -> None:
+        """
+        Incorpora a este sketch los valores resumidos en `otro` (que no se modifica).
+
+        Comportamiento:
+        - Si `otro` nunca se compactó, su primer nivel guarda sus valores tal cual y en orden: se agregan
+          con `extender`, y el resultado es idéntico al de un único sketch alimentado con todos los valores.
+        - Si no, une los niveles y compacta; las estimaciones quedan dentro del error del sketch.
+
+        Retorno:
+        None
+        """
+        if len(otro.niveles) == 1:
+            self.extender(otro.niveles[0])
+            return None
+        while len(self.niveles) < len(otro.niveles):
+            self._crecer()
+        for nivel in range(len(otro.niveles)):
+            self.niveles[nivel] += otro.niveles[nivel]
+        self.cantidad += otro.cantidad
+        self.tamano += otro.tamano
+        while self.tamano >= self.tamano_maximo:
+            self._compactar()
+        return None
+
+    def _ponderados(self) -> list:
+        """
+        Lista ordenada de [valor, peso] de todos los valores guardados.
+
+        Retorno:
+        - (list): Pares [valor, peso], con peso 2**nivel, ordenados por valor.
+        """
+        ponderados = []
+        for nivel in range(len(self.niveles)):
+            peso = 1 << nivel
+            for valor in self.niveles[nivel]:
+                ponderados += [[valor, peso]]
+        ponderados.sort(key=lambda par: par[0])
+        return ponderados
+
+    def cuantil(self, fraccion: float):
+        """
+        Estima el cuantil `fraccion` (entre 0 y 1) de los valores agregados.
+
+        Comportamiento:
+        - Usa el método del rango más cercano: el menor valor v tal que al menos `fraccion` del total
+          es menor o igual a v (la mediana de 1, 2, 3, 4 es 2).
+        - Recorre sólo los valores del sketch (O(k log k)), no los originales.
+
+        Retorno:
+        - El valor estimado, o None si el sketch está vacío.
+        """
+        return self.cuantiles([fraccion])[0]
+
+    def cuantiles(self, fracciones: list) -> list:
+        """
+        Estima varios cuantiles con un único ordenamiento del sketch.
+
+        Retorno:
+        - (list): Valor estimado de cada fracción pedida, en el mismo orden (None si el sketch está vacío).
+        """
+        if self.cantidad == 0:
+            return [None] * len(fracciones)
+        ponderados = self._ponderados()
+        resultado = []
+        for fraccion in fracciones:
+            objetivo = fraccion * self.cantidad
+            acumulado = 0
+            valor_cuantil = ponderados[-1][0]
+            for valor, peso in ponderados:
+                acumulado += peso
+                if acumulado >= objetivo:
+                    valor_cuantil = valor
+                    break
+            resultado += [valor_cuantil]
+        return resultado
+
+    def a_diccionario(self) -> dict:
+        """
+        Representación serializable (JSON) del sketch.
+
+        Retorno:
+        - (dict): Estado completo del sketch.
+        """
+        return {"k": self.k, "niveles": self.niveles, "desplazamientos": self.desplazamientos, "cantidad": self.cantidad}
+
+    @classmethod
+    def desde_diccionario(cls, contenido: dict) -> "SketchCuantiles":
+        """
+        Reconstruye un sketch guardado con `a_diccionario`.
+
+        Retorno:
+        - (SketchCuantiles): Sketch equivalente al guardado.
+        """
+        sketch = cls(contenido["k"])
+        while len(sketch.niveles) < len(contenido["niveles"]):
+            sketch._crecer()
+        sketch.niveles = [list(nivel) for nivel in contenido["niveles"]]
+        sketch.desplazamientos = list(contenido["desplazamientos"])
+        sketch.cantidad = contenido["cantidad"]
+        sketch.tamano = 0
+        for nivel in sketch.niveles:
+            sketch.tamano += len(nivel)
+        return sketch
@@ -1,19 +1,109 @@
-from normalizacion import normalizar_nombre_usuario, normalizar_empresas
-
-usuarios_vip = [
-    "lunatico_pixel", "sombra_cristal", "ecoerrante", "navefantasma",
-    "bytesdelabahia", "tintaenelviento", "relojoxidado", "miradacodificada",
-    "circuitoazul", "fuego_niebla", "teclaerrante", "nebulosa_urbana",
-    "sueño_binario", "saltofantasma", "claveoculta"
-]
-empresas = ["Apple", "Tesla", "NVIDIA"]
-
-precios = [10.41, 7.71, 8.50]
-
-vip_normalizados = []
-for i in range(len(usuarios_vip)):
-    vip_normalizados += [normalizar_nombre_usuario(usuarios_vip[i])]
-
-empresas_normalizadas = []
-for i in range(len(empresas)):
-    empresas_normalizadas += [normalizar_empresas(empresas[i])]
\ No newline at end of file
+from normalizacion import normalizar_nombres_usuario, normalizar_lista_empresas
+from historial import HistorialPrecios
+
+usuarios_vip = [
+    "lunatico_pixel", "sombra_cristal", "ecoerrante", "navefantasma",
+    "bytesdelabahia", "tintaenelviento", "relojoxidado", "miradacodificada",
+    "circuitoazul", "fuego_niebla", "teclaerrante", "nebulosa_urbana",
+    "sueño_binario", "saltofantasma", "claveoculta"
+]
+empresas = ["Apple", "Tesla", "NVIDIA"]
+
+precios = [10.41, 7.71, 8.50]
+
+vip_normalizados = normalizar_nombres_usuario(usuarios_vip)
+
+empresas_normalizadas = normalizar_lista_empresas(empresas)
+
+class Catalogo:
+    """
+    Catálogo de usuarios VIP y empresas con búsquedas en O(1).
+
+    Args:
+        usuarios (list): Nombres de usuarios VIP ya normalizados.
+        empresas (list): Nombres de empresas ya normalizados.
+        precios (list): Precio en USD de cada empresa, en el mismo orden que `empresas`.
+
+    Comportamiento:
+    - Se construye una sola vez y lo comparten el registro interactivo, la importación masiva y `obtener_precio`.
+    - `ids_usuarios` / `empresas` son diccionarios: nombre -> id y nombre -> [id, precio].
+    """
+
+    def __init__(self, usuarios: list, empresas: list, precios: list) -> None:
+        self.ids_usuarios = {}
+        for i in range(len(usuarios)):
+            if usuarios[i] not in self.ids_usuarios:
+                self.ids_usuarios[usuarios[i]] = i
+        self.empresas = {}
+        for i in range(len(empresas)):
+            if empresas[i] not in self.empresas:
+                self.empresas[empresas[i]] = [i, precios[i]]
+        self.siguiente_id_usuario = len(usuarios)
+        self.siguiente_id_empresa = len(empresas)
+
+    def agregar_usuario(self, usuario: str) -> None:
+        """
+        Incorpora un usuario VIP (ya normalizado) al catálogo, si todavía no estaba.
+
+        Retorno:
+        None
+        """
+        if usuario not in self.ids_usuarios:
+            self.ids_usuarios[usuario] = self.siguiente_id_usuario
+            self.siguiente_id_usuario += 1
+        return None
+
+    def agregar_empresa(self, empresa: str, precio: float) -> None:
+        """
+        Incorpora una empresa (ya normalizada) con su precio, si todavía no estaba.
+
+        Retorno:
+        None
+        """
+        if empresa not in self.empresas:
+            self.empresas[empresa] = [self.siguiente_id_empresa, precio]
+            self.siguiente_id_empresa += 1
+        return None
+
+    def es_usuario_vip(self, usuario: str) -> bool:
+        """
+        Indica si un nombre de usuario normalizado pertenece a la lista VIP.
+
+        Retorno:
+        - (bool): True si es VIP.
+        """
+        return usuario in self.ids_usuarios
+
+    def es_empresa_valida(self, empresa: str) -> bool:
+        """
+        Indica si un nombre de empresa normalizado es una de las acciones permitidas.
+
+        Retorno:
+        - (bool): True si la empresa está en el catálogo.
+        """
+        return empresa in self.empresas
+
+    def buscar_empresa(self, empresa: str) -> list:
+        """
+        Busca el id y el precio de una empresa.
+
+        Retorno:
+        - (list): [id, precio], o None si la empresa no está en el catálogo.
+        """
+        return self.empresas.get(empresa)
+
+    def precio(self, empresa: str) -> float:
+        """
+        Obtiene el precio de una empresa.
+
+        Retorno:
+        - (float): Precio en USD, o 0.0 si la empresa no está en el catálogo.
+        """
+        datos_empresa = self.empresas.get(empresa)
+        if datos_empresa is None:
+            return 0.0
+        return datos_empresa[1]
+
+catalogo = Catalogo(vip_normalizados, empresas_normalizadas, precios)
+
+historial_precios = HistorialPrecios()
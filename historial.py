@@ -0,0 +1,242 @@
+import csv
+from array import array
+from bisect import bisect_right
+
+class HistorialPrecios:
+    """
+    Historial de precios por empresa, versionado en el tiempo.
+
+    Cada empresa tiene dos columnas paralelas respaldadas por arreglos tipados ('d'):
+    - `instantes`: momento de cada cotización (segundos desde la época Unix), en orden creciente.
+    - `precios`: precio en USD vigente desde ese instante hasta la cotización siguiente.
+
+    Comportamiento:
+    - El precio vigente en un instante se obtiene por búsqueda binaria (`bisect`), en O(log n).
+    - Las cotizaciones en orden cronológico se agregan al final en O(1) amortizado; una cotización
+      atrasada se inserta en su posición (O(n)), por lo que conviene cargar los lotes ordenados.
+    - Antes de la primera cotización de una empresa (o si no tiene historial) no hay precio
+      registrado y las búsquedas devuelven el valor `por_defecto` que reciben.
+    """
+
+    def __init__(self) -> None:
+        self.instantes = {}
+        self.precios = {}
+
+    def __len__(self) -> int:
+        cantidad = 0
+        for instantes in self.instantes.values():
+            cantidad += len(instantes)
+        return cantidad
+
+    def tiene_historial(self, empresa: str) -> bool:
+        """
+        Indica si la empresa tiene al menos una cotización registrada.
+
+        Retorno:
+        - (bool): True si hay cotizaciones de la empresa.
+        """
+        return empresa in self.instantes
+
+    def agregar(self, empresa: str, instante: float, precio: float) -> None:
+        """
+        Registra una cotización de una empresa.
+
+        Args:
+            empresa (str): Nombre de la empresa normalizado.
+            instante (float): Momento desde el cual rige el precio.
+            precio (float): Precio en USD.
+
+        Comportamiento:
+        - Si ya había una cotización en el mismo instante, la nueva la reemplaza.
+
+        Retorno:
+        None
+        """
+        instantes = self.instantes.get(empresa)
+        if instantes is None:
+            self.instantes[empresa] = array('d', [instante])
+            self.precios[empresa] = array('d', [precio])
+            return None
+        precios = self.precios[empresa]
+        if instante > instantes[-1]:
+            instantes.append(instante)
+            precios.append(precio)
+            return None
+        posicion = bisect_right(instantes, instante)
+        if posicion and instantes[posicion - 1] == instante:
+            precios[posicion - 1] = precio
+        else:
+            instantes.insert(posicion, instante)
+            precios.insert(posicion, precio)
+        return None
+
+    def agregar_lote(self, empresa: str, instantes, precios) -> None:
+        """
+        Registra muchas cotizaciones de una empresa de una sola vez.
+
+        Args:
+            empresa (str): Nombre de la empresa normalizado.
+            instantes (sequence): Instantes de las cotizaciones.
+            precios (sequence): Precio de cada cotización.
+
+        Comportamiento:
+        - Si el lote viene ordenado y es posterior a lo ya registrado, se agrega con `extend` (sin copias fila a fila).
+        - Si no, se combina con el historial existente y se reordena una vez (ordenamiento estable: ante
+          instantes repetidos prevalece la última cotización).
+
+        Retorno:
+        None
+        """
+        nuevos_instantes = array('d', instantes)
+        nuevos_precios = array('d', precios)
+        ordenado = True
+        for i in range(1, len(nuevos_instantes)):
+            if nuevos_instantes[i] <= nuevos_instantes[i - 1]:
+                ordenado = False
+                break
+        actuales = self.instantes.get(empresa)
+        if ordenado and (actuales is None or not nuevos_instantes or nuevos_instantes[0] > actuales[-1]):
+            if actuales is None:
+                self.instantes[empresa] = nuevos_instantes
+                self.precios[empresa] = nuevos_precios
+            else:
+                actuales.extend(nuevos_instantes)
+                self.precios[empresa].extend(nuevos_precios)
+            return None
+
+        pares = []
+        if actuales is not None:
+            pares = list(zip(actuales, self.precios[empresa]))
+        pares += list(zip(nuevos_instantes, nuevos_precios))
+        pares.sort(key=lambda par: par[0])
+        instantes_finales = array('d')
+        precios_finales = array('d')
+        for instante, precio in pares:
+            if instantes_finales and instantes_finales[-1] == instante:
+                precios_finales[-1] = precio
+            else:
+                instantes_finales.append(instante)
+                precios_finales.append(precio)
+        self.instantes[empresa] = instantes_finales
+        self.precios[empresa] = precios_finales
+        return None
+
+    def precio_en(self, empresa: str, instante: float, por_defecto: float = None) -> float:
+        """
+        Obtiene el precio de una empresa vigente en un instante.
+
+        Args:
+            empresa (str): Nombre de la empresa normalizado.
+            instante (float): Momento consultado.
+            por_defecto (float, opcional): Valor a devolver si no hay cotización vigente en ese instante.
+
+        Retorno:
+        - (float): Precio de la última cotización con instante menor o igual al consultado, o `por_defecto`.
+        """
+        instantes = self.instantes.get(empresa)
+        if instantes is None:
+            return por_defecto
+        posicion = bisect_right(instantes, instante)
+        if posicion == 0:
+            return por_defecto
+        return self.precios[empresa][posicion - 1]
+
+    def ultimo_precio(self, empresa: str, por_defecto: float = None) -> float:
+        """
+        Obtiene la cotización más reciente de una empresa.
+
+        Retorno:
+        - (float): Último precio registrado, o `por_defecto` si la empresa no tiene historial.
+        """
+        precios = self.precios.get(empresa)
+        if not precios:
+            return por_defecto
+        return precios[-1]
+
+    def precios_en(self, empresas, instantes, por_defecto: dict = None) -> array:
+        """
+        Resuelve en lote el precio vigente de cada fila de una columna (empresa, instante).
+
+        Args:
+            empresas (sequence): Empresa de cada fila.
+            instantes (sequence): Instante de cada fila (None: precio más reciente).
+            por_defecto (dict, opcional): empresa -> precio a usar cuando no hay cotización vigente (0.0 si falta).
+
+        Comportamiento:
+        - Recuerda, por empresa, la posición de la última búsqueda: si los instantes de esa empresa
+          llegan en orden creciente (lo habitual en una columna cronológica) la búsqueda binaria se
+          acota al tramo restante del historial, y basta una comparación cuando no hubo cotizaciones nuevas.
+        - Los instantes desordenados siguen siendo correctos (búsqueda binaria completa).
+
+        Retorno:
+        - (array): Precio de cada fila, como arreglo 'd'.
+        """
+        if por_defecto is None:
+            por_defecto = {}
+        resultado = array('d', bytes(8 * len(instantes)))
+        ultima_posicion = {}
+        ultimo_instante = {}
+        for i in range(len(instantes)):
+            empresa = empresas[i]
+            instante = instantes[i]
+            historial = self.instantes.get(empresa)
+            if historial is None:
+                resultado[i] = por_defecto.get(empresa, 0.0)
+                continue
+            if instante is None:
+                posicion = len(historial)
+            else:
+                desde = 0
+                if empresa in ultimo_instante and instante >= ultimo_instante[empresa]:
+                    desde = ultima_posicion[empresa]
+                if desde == len(historial) or historial[desde] > instante:
+                    posicion = desde
+                else:
+                    posicion = bisect_right(historial, instante, desde)
+                ultima_posicion[empresa] = posicion
+                ultimo_instante[empresa] = instante
+            if posicion == 0:
+                resultado[i] = por_defecto.get(empresa, 0.0)
+            else:
+                resultado[i] = self.precios[empresa][posicion - 1]
+        return resultado
+
+def cargar_historial_csv(ruta: str, historial: HistorialPrecios, normalizar=None) -> int:
+    """
+    Carga cotizaciones desde un CSV con columnas empresa, instante, precio (con o sin encabezado).
+
+    Args:
+        ruta (str): Archivo CSV.
+        historial (HistorialPrecios): Historial donde se agregan las cotizaciones.
+        normalizar (function, opcional): Normalización a aplicar al nombre de empresa.
+
+    Comportamiento:
+    - Agrupa las cotizaciones por empresa y las agrega con `agregar_lote` (una ordenación por empresa
+      como máximo), de modo que cargar millones de cotizaciones no hace inserciones fila a fila.
+    - Las filas con valores no numéricos (por ejemplo, el encabezado) se ignoran.
+
+    Retorno:
+    - (int): Cantidad de cotizaciones cargadas.
+    """
+    por_empresa = {}
+    cargadas = 0
+    with open(ruta, newline="", encoding="utf-8") as archivo:
+        for fila in csv.reader(archivo):
+            if len(fila) < 3:
+                continue
+            try:
+                instante = float(fila[1])
+                precio = float(fila[2])
+            except ValueError:
+                continue
+            empresa = normalizar(fila[0].strip()) if normalizar else fila[0].strip()
+            columnas = por_empresa.get(empresa)
+            if columnas is None:
+                columnas = [array('d'), array('d')]
+                por_empresa[empresa] = columnas
+            columnas[0].append(instante)
+            columnas[1].append(precio)
+            cargadas += 1
+    for empresa, (instantes, precios) in por_empresa.items():
+        historial.agregar_lote(empresa, instantes, precios)
+    return cargadas
@@ -0,0 +1,199 @@
+import csv
+import json
+from registro import validar_usuario, validar_empresa, validar_cantidad
+from almacen import AlmacenTransacciones
+
+TAMANO_BLOQUE = 50000
+MAXIMO_CACHE_VALIDACION = 100000
+
+def _leer_filas_csv(archivo):
+    """
+    Recorre un archivo CSV de transacciones (usuario, acción, cantidad y, opcionalmente, instante) fila por fila.
+
+    Args:
+        archivo (file): Archivo de texto abierto.
+
+    Comportamiento:
+    - Si la primera fila es un encabezado (su cantidad no es numérica y nombra la columna), la saltea.
+    - No carga el archivo en memoria: cada fila se produce a medida que se lee.
+
+    Retorno:
+    - (generator): Tuplas (número de línea, usuario, acción, cantidad, instante) como texto; el instante
+      es None si la fila no tiene cuarta columna (o está vacía).
+    """
+    lector = csv.reader(archivo)
+    for fila in lector:
+        numero_linea = lector.line_num
+        if numero_linea == 1 and len(fila) >= 3 and fila[2].strip().lower() == "cantidad":
+            continue
+        if len(fila) < 3:
+            yield numero_linea, None, None, None, None
+        else:
+            instante = fila[3].strip() if len(fila) > 3 and fila[3].strip() else None
+            yield numero_linea, fila[0].strip(), fila[1].strip(), fila[2].strip(), instante
+
+def _leer_filas_jsonl(archivo):
+    """
+    Recorre un archivo JSON Lines de transacciones, un objeto por línea.
+
+    Args:
+        archivo (file): Archivo de texto abierto.
+
+    Comportamiento:
+    - Cada objeto debe tener "usuario", "accion" (o "empresa") y "cantidad"; "instante" es opcional.
+    - Las líneas vacías se ignoran; las que no son JSON válido se informan como filas incompletas.
+
+    Retorno:
+    - (generator): Tuplas (número de línea, usuario, acción, cantidad, instante) como texto (instante None si falta).
+    """
+    numero_linea = 0
+    for linea in archivo:
+        numero_linea += 1
+        if not linea.strip():
+            continue
+        try:
+            objeto = json.loads(linea)
+        except ValueError:
+            yield numero_linea, None, None, None, None
+            continue
+        if not isinstance(objeto, dict):
+            yield numero_linea, None, None, None, None
+            continue
+        accion = objeto.get("accion", objeto.get("empresa"))
+        cantidad = objeto.get("cantidad")
+        if objeto.get("usuario") is None or accion is None or cantidad is None:
+            yield numero_linea, None, None, None, None
+        else:
+            instante = objeto.get("instante")
+            yield numero_linea, str(objeto["usuario"]), str(accion), str(cantidad), None if instante is None else str(instante)
+
+def validar_instante(instante_ingresado: str) -> float:
+    """
+    Convierte el instante de una transacción (segundos desde la época Unix) a número.
+
+    Retorno:
+    - (float): El instante, o None si no es un número finito.
+    """
+    try:
+        instante = float(instante_ingresado)
+    except ValueError:
+        return None
+    if instante != instante or instante in (float("inf"), float("-inf")):
+        return None
+    return instante
+
+def _validar_con_cache(valor: str, validador, cache: dict) -> str:
+    """
+    Valida un nombre reutilizando el resultado de valores ya vistos en la importación.
+
+    Args:
+        valor (str): Texto a validar.
+        validador (function): `validar_usuario` o `validar_empresa`.
+        cache (dict): Resultados previos de esta importación.
+
+    Comportamiento:
+    - Los archivos repiten muchísimas veces los mismos usuarios y acciones, así que cada texto distinto
+      se normaliza y valida una única vez.
+    - Si el cache supera `MAXIMO_CACHE_VALIDACION` entradas se vacía, para mantener la memoria acotada.
+
+    Retorno:
+    - (str): Valor normalizado y validado, o cadena vacía si no es válido.
+    """
+    resultado = cache.get(valor)
+    if resultado is None:
+        if len(cache) >= MAXIMO_CACHE_VALIDACION:
+            cache.clear()
+        resultado = validador(valor)
+        cache[valor] = resultado
+    return resultado
+
+def importar_transacciones(ruta: str, almacen: AlmacenTransacciones, ruta_rechazos: str = None, tamano_bloque: int = TAMANO_BLOQUE) -> dict:
+    """
+    Importa transacciones desde un archivo CSV o JSON Lines, validándolas igual que el ingreso por teclado.
+
+    Args:
+        ruta (str): Archivo a importar. Si termina en ".jsonl" o ".json" se lee como JSON Lines; si no, como CSV.
+        almacen (AlmacenTransacciones): Almacén donde se agregan las transacciones válidas.
+        ruta_rechazos (str, opcional): Archivo CSV donde se escriben las filas rechazadas
+            (línea, motivo, usuario, acción, cantidad, instante). Si es None, los rechazos sólo se cuentan.
+        tamano_bloque (int, opcional): Cantidad de filas válidas que se acumulan antes de agregarlas al almacén.
+
+    Comportamiento:
+    - Lee el archivo en streaming y agrega las filas válidas al almacén en bloques de `tamano_bloque`,
+      por lo que la memoria usada depende del tamaño de bloque y no del tamaño del archivo.
+    - Aplica las mismas reglas que el registro interactivo: usuario VIP (`validar_usuario`), acción permitida
+      (`validar_empresa`) y cantidad entera entre 0 y 500 (`validar_cantidad`).
+    - Las filas con instante se valúan al precio vigente en ese instante (historial de precios); las que no
+      lo tienen, al precio vigente hoy.
+    - Cada fila rechazada se escribe en el archivo de rechazos con su número de línea y el motivo.
+
+    Retorno:
+    - (dict): {"leidas": int, "aceptadas": int, "rechazadas": int}.
+    """
+    if ruta.endswith(".jsonl") or ruta.endswith(".json"):
+        lector_filas = _leer_filas_jsonl
+    else:
+        lector_filas = _leer_filas_csv
+
+    resumen = {"leidas": 0, "aceptadas": 0, "rechazadas": 0}
+    cache_usuarios = {}
+    cache_empresas = {}
+    usuarios_bloque = []
+    empresas_bloque = []
+    cantidades_bloque = []
+    instantes_bloque = []
+    bloque_con_instantes = False
+
+    archivo_rechazos = None
+    escritor_rechazos = None
+    if ruta_rechazos:
+        archivo_rechazos = open(ruta_rechazos, "w", newline="", encoding="utf-8")
+        escritor_rechazos = csv.writer(archivo_rechazos)
+        escritor_rechazos.writerow(["linea", "motivo", "usuario", "accion", "cantidad", "instante"])
+
+    try:
+        with open(ruta, "r", newline="", encoding="utf-8") as archivo:
+            for numero_linea, usuario, accion, cantidad, instante in lector_filas(archivo):
+                resumen["leidas"] += 1
+                motivo = ""
+                if usuario is None:
+                    motivo = "fila incompleta"
+                else:
+                    usuario_validado = _validar_con_cache(usuario, validar_usuario, cache_usuarios)
+                    empresa_validada = _validar_con_cache(accion, validar_empresa, cache_empresas)
+                    cantidad_validada = validar_cantidad(cantidad)
+                    instante_validado = None if instante is None else validar_instante(instante)
+                    if not usuario_validado:
+                        motivo = "usuario no VIP"
+                    elif not empresa_validada:
+                        motivo = "acción no válida"
+                    elif cantidad_validada == -1:
+                        motivo = "cantidad no válida"
+                    elif instante is not None and instante_validado is None:
+                        motivo = "instante no válido"
+                if motivo:
+                    resumen["rechazadas"] += 1
+                    if escritor_rechazos is not None:
+                        escritor_rechazos.writerow([numero_linea, motivo, usuario, accion, cantidad, instante])
+                    continue
+                usuarios_bloque += [usuario_validado]
+                empresas_bloque += [empresa_validada]
+                cantidades_bloque += [cantidad_validada]
+                instantes_bloque += [instante_validado]
+                if instante_validado is not None:
+                    bloque_con_instantes = True
+                if len(usuarios_bloque) >= tamano_bloque:
+                    almacen.agregar_lote(usuarios_bloque, empresas_bloque, cantidades_bloque, instantes_bloque if bloque_con_instantes else None)
+                    resumen["aceptadas"] += len(usuarios_bloque)
+                    usuarios_bloque = []
+                    empresas_bloque = []
+                    cantidades_bloque = []
+                    instantes_bloque = []
+                    bloque_con_instantes = False
+        if usuarios_bloque:
+            almacen.agregar_lote(usuarios_bloque, empresas_bloque, cantidades_bloque, instantes_bloque if bloque_con_instantes else None)
+            resumen["aceptadas"] += len(usuarios_bloque)
+    finally:
+        if archivo_rechazos is not None:
+            archivo_rechazos.close()
+    return resumen
@@ -0,0 +1,440 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from registro import validar_usuario, validar_empresa, validar_cantidad
+from importacion import validar_instante
+from almacen import AlmacenTransacciones
+from persistencia import AlmacenPersistente
+
+TAMANO_LOTE = 1000
+ESPERA_LOTE = 0.005
+ESPERA_REPOSO = 0.1
+CAPACIDAD_COLA = 10000
+LATENCIAS_GUARDADAS = 10000
+LARGO_MAXIMO_LINEA = 1 << 16
+
+def validar_transaccion(objeto) -> list:
+    """
+    Valida una transacción recibida como objeto JSON, con las mismas reglas que el registro y la importación.
+
+    Args:
+        objeto (dict): {"usuario", "accion" (o "empresa"), "cantidad"} y, opcionalmente, "instante".
+
+    Retorno:
+    - (list): [motivo de rechazo ("" si es válida), usuario, empresa, cantidad, instante] ya normalizados.
+    """
+    if not isinstance(objeto, dict):
+        return ["fila incompleta", None, None, None, None]
+    usuario = objeto.get("usuario")
+    accion = objeto.get("accion", objeto.get("empresa"))
+    cantidad = objeto.get("cantidad")
+    if usuario is None or accion is None or cantidad is None:
+        return ["fila incompleta", None, None, None, None]
+    usuario_validado = validar_usuario(str(usuario))
+    empresa_validada = validar_empresa(str(accion))
+    cantidad_validada = validar_cantidad(str(cantidad))
+    instante = objeto.get("instante")
+    instante_validado = None if instante is None else validar_instante(str(instante))
+    motivo = ""
+    if not usuario_validado:
+        motivo = "usuario no VIP"
+    elif not empresa_validada:
+        motivo = "acción no válida"
+    elif cantidad_validada == -1:
+        motivo = "cantidad no válida"
+    elif instante is not None and instante_validado is None:
+        motivo = "instante no válido"
+    return [motivo, usuario_validado, empresa_validada, cantidad_validada, instante_validado]
+
+def _percentil(valores: list, percentil: float) -> float:
+    """
+    Percentil de una lista ya ordenada (método del rango más cercano).
+
+    Retorno:
+    - (float): Valor del percentil, o 0.0 si la lista está vacía.
+    """
+    if not valores:
+        return 0.0
+    posicion = min(len(valores) - 1, max(0, int(round(percentil / 100 * len(valores) + 0.5)) - 1))
+    return valores[posicion]
+
+class ServicioIngesta:
+    """
+    Servicio asyncio de ingesta de transacciones por TCP, con protocolo JSON Lines.
+
+    Args:
+        almacen (AlmacenTransacciones): Almacén donde se agregan las transacciones aceptadas.
+        host (str, opcional): Dirección donde escuchar. Por defecto, sólo la máquina local.
+        puerto (int, opcional): Puerto TCP; 0 elige uno libre (ver `puerto` tras `iniciar`).
+        tamano_lote (int, opcional): Máximo de transacciones agregadas al almacén en un mismo lote.
+        espera_lote (float, opcional): Segundos que se espera a que se junte un lote antes de agregarlo.
+        capacidad_cola (int, opcional): Transacciones validadas que pueden esperar a ser agregadas.
+
+    Protocolo:
+    - Cada línea que envía un cliente es un objeto JSON con una transacción:
+      {"usuario": ..., "accion": ..., "cantidad": ..., "instante": ... (opcional)}.
+    - Por cada línea el servicio responde, en el mismo orden, {"ok": true} una vez que la transacción
+      está en el almacén, o {"ok": false, "motivo": ...} si fue rechazada.
+    - La línea {"comando": "metricas"} responde con las métricas del servicio.
+
+    Comportamiento:
+    - Valida cada transacción al recibirla con `validar_transaccion` (mismas reglas que `registro`).
+    - Las transacciones válidas de todas las conexiones pasan por una única cola; un consumidor las
+      agrupa en micro-lotes (hasta `tamano_lote`, o lo que llegue en `espera_lote`) y los agrega con
+      `almacen.agregar_lote`, de modo que el almacén se modifica desde una sola tarea.
+    - Las escrituras al almacén (que pueden hacer fsync o esperar a SQLite) corren en un ejecutor de un
+      único hilo (`run_in_executor`): el bucle de eventos sigue atendiendo conexiones mientras tanto, y un
+      solo hilo mantiene el orden de los lotes. El almacén sólo se usa desde ese hilo mientras el servicio corre.
+    - Contrapresión: con la cola llena, las conexiones dejan de leer de su socket hasta que haya lugar,
+      y el control de flujo de TCP frena a los clientes.
+    - Con un almacén persistente, mientras la cola está vacía el consumidor llama cada `ESPERA_REPOSO`
+      segundos a `confirmar_si_vencido`, para que el plazo del commit agrupado se cumpla aunque dejen de
+      llegar transacciones.
+    """
+
+    def __init__(self, almacen: AlmacenTransacciones, host: str = "127.0.0.1", puerto: int = 0, tamano_lote: int = TAMANO_LOTE, espera_lote: float = ESPERA_LOTE, capacidad_cola: int = CAPACIDAD_COLA) -> None:
+        self.almacen = almacen
+        self.host = host
+        self.puerto = puerto
+        self.tamano_lote = tamano_lote
+        self.espera_lote = espera_lote
+        self.capacidad_cola = capacidad_cola
+        self.cola = None
+        self.servidor = None
+        self.consumidor = None
+        self.ejecutor = None
+        self.inicio = None
+        self.conexiones_activas = 0
+        self.aceptadas = 0
+        self.rechazadas = 0
+        self.lotes = 0
+        self.esperas_por_cola_llena = 0
+        self.latencias = deque(maxlen=LATENCIAS_GUARDADAS)
+
+    async def iniciar(self) -> int:
+        """
+        Empieza a escuchar conexiones y lanza la tarea que agrega los lotes al almacén.
+
+        Retorno:
+        - (int): Puerto en el que escucha el servicio.
+        """
+        self.cola = asyncio.Queue(maxsize=self.capacidad_cola)
+        self.ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingesta")
+        self.inicio = time.perf_counter()
+        self.consumidor = asyncio.create_task(self._consumir())
+        self.servidor = await asyncio.start_server(self._atender, self.host, self.puerto, limit=LARGO_MAXIMO_LINEA)
+        self.puerto = self.servidor.sockets[0].getsockname()[1]
+        return self.puerto
+
+    async def detener(self) -> None:
+        """
+        Deja de aceptar conexiones, agrega al almacén lo que quedaba en la cola y termina el consumidor y su hilo.
+
+        Retorno:
+        None
+        """
+        if self.servidor is not None:
+            self.servidor.close()
+            await self.servidor.wait_closed()
+        if self.cola is not None:
+            await self.cola.join()
+        if self.consumidor is not None:
+            self.consumidor.cancel()
+            try:
+                await self.consumidor
+            except asyncio.CancelledError:
+                pass
+        if self.ejecutor is not None:
+            self.ejecutor.shutdown(wait=True)
+        return None
+
+    async def _atender(self, lector: asyncio.StreamReader, escritor: asyncio.StreamWriter) -> None:
+        """
+        Atiende una conexión: valida cada línea, la encola y responde en orden cuando se confirma.
+
+        Retorno:
+        None
+        """
+        self.conexiones_activas += 1
+        pendientes = asyncio.Queue(maxsize=self.capacidad_cola)
+        respondedor = asyncio.create_task(self._responder(pendientes, escritor))
+        try:
+            while True:
+                try:
+                    linea = await lector.readline()
+                except (ValueError, ConnectionError):
+                    break
+                if not linea:
+                    break
+                if not linea.strip():
+                    continue
+                recibida = time.perf_counter()
+                try:
+                    objeto = json.loads(linea)
+                except ValueError:
+                    objeto = None
+                if isinstance(objeto, dict) and objeto.get("comando") == "metricas":
+                    await pendientes.put(self.metricas())
+                    continue
+                motivo, usuario, empresa, cantidad, instante = validar_transaccion(objeto)
+                if motivo:
+                    self.rechazadas += 1
+                    await pendientes.put({"ok": False, "motivo": motivo})
+                    continue
+                confirmacion = asyncio.get_running_loop().create_future()
+                if self.cola.full():
+                    self.esperas_por_cola_llena += 1
+                await self.cola.put([usuario, empresa, cantidad, instante, recibida, confirmacion])
+                await pendientes.put(confirmacion)
+        finally:
+            await pendientes.put(None)
+            await respondedor
+            self.conexiones_activas -= 1
+            escritor.close()
+            try:
+                await escritor.wait_closed()
+            except ConnectionError:
+                pass
+        return None
+
+    async def _responder(self, pendientes: asyncio.Queue, escritor: asyncio.StreamWriter) -> None:
+        """
+        Escribe las respuestas de una conexión en el orden de sus líneas, vaciando el socket de a bloques.
+
+        Retorno:
+        None
+        """
+        while True:
+            respuesta = await pendientes.get()
+            if respuesta is None:
+                break
+            if isinstance(respuesta, asyncio.Future):
+                respuesta = await respuesta
+            escritor.write(json.dumps(respuesta, ensure_ascii=False).encode("utf-8") + b"\n")
+            if pendientes.empty():
+                try:
+                    await escritor.drain()
+                except ConnectionError:
+                    break
+        return None
+
+    async def _consumir(self) -> None:
+        """
+        Tarea única que junta micro-lotes de la cola y los agrega al almacén.
+
+        Retorno:
+        None
+        """
+        while True:
+            try:
+                lote = [await asyncio.wait_for(self.cola.get(), ESPERA_REPOSO)]
+            except asyncio.TimeoutError:
+                if isinstance(self.almacen, AlmacenPersistente):
+                    await asyncio.get_running_loop().run_in_executor(self.ejecutor, self.almacen.confirmar_si_vencido)
+                continue
+            limite = time.perf_counter() + self.espera_lote
+            while len(lote) < self.tamano_lote:
+                if self.cola.empty():
+                    restante = limite - time.perf_counter()
+                    if restante <= 0:
+                        break
+                    try:
+                        lote += [await asyncio.wait_for(self.cola.get(), restante)]
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    lote += [self.cola.get_nowait()]
+            await self._agregar_lote(lote)
+            for _ in range(len(lote)):
+                self.cola.task_done()
+
+    def _escribir_lote(self, lote: list) -> str:
+        """
+        Agrega un micro-lote al almacén. Corre en el hilo del ejecutor.
+
+        Retorno:
+        - (str): Motivo del error del almacén, o cadena vacía si el lote se agregó.
+        """
+        usuarios = []
+        empresas = []
+        cantidades = []
+        instantes = []
+        con_instantes = False
+        for usuario, empresa, cantidad, instante, _, _ in lote:
+            usuarios += [usuario]
+            empresas += [empresa]
+            cantidades += [cantidad]
+            instantes += [instante]
+            if instante is not None:
+                con_instantes = True
+        try:
+            self.almacen.agregar_lote(usuarios, empresas, cantidades, instantes if con_instantes else None)
+        except Exception as error:
+            return f"error del almacén: {error}"
+        return ""
+
+    async def _agregar_lote(self, lote: list) -> None:
+        """
+        Agrega un micro-lote al almacén desde el hilo del ejecutor y confirma cada transacción a su conexión.
+
+        Retorno:
+        None
+        """
+        motivo = await asyncio.get_running_loop().run_in_executor(self.ejecutor, self._escribir_lote, lote)
+        if motivo:
+            for fila in lote:
+                if not fila[5].done():
+                    fila[5].set_result({"ok": False, "motivo": motivo})
+            return None
+        confirmado = time.perf_counter()
+        self.lotes += 1
+        self.aceptadas += len(lote)
+        for fila in lote:
+            self.latencias.append(confirmado - fila[4])
+            if not fila[5].done():
+                fila[5].set_result({"ok": True})
+        return None
+
+    def metricas(self) -> dict:
+        """
+        Métricas del servicio desde que se inició.
+
+        Retorno:
+        - (dict): aceptadas, rechazadas, lotes, filas por lote, transacciones por segundo, latencias
+          (p50, p99 y máxima, en milisegundos, de las últimas `LATENCIAS_GUARDADAS`), cola y conexiones.
+        """
+        segundos = time.perf_counter() - self.inicio if self.inicio is not None else 0.0
+        latencias = sorted(self.latencias)
+        return {
+            "aceptadas": self.aceptadas,
+            "rechazadas": self.rechazadas,
+            "lotes": self.lotes,
+            "filas_por_lote": self.aceptadas / self.lotes if self.lotes else 0.0,
+            "transacciones_por_segundo": self.aceptadas / segundos if segundos else 0.0,
+            "latencia_p50_ms": _percentil(latencias, 50) * 1000,
+            "latencia_p99_ms": _percentil(latencias, 99) * 1000,
+            "latencia_maxima_ms": (latencias[-1] if latencias else 0.0) * 1000,
+            "en_cola": self.cola.qsize() if self.cola is not None else 0,
+            "esperas_por_cola_llena": self.esperas_por_cola_llena,
+            "conexiones_activas": self.conexiones_activas,
+        }
+
+async def enviar_transacciones(host: str, puerto: int, transacciones: list) -> list:
+    """
+    Cliente de prueba: envía transacciones por una conexión y espera todas las respuestas.
+
+    Args:
+        host (str): Dirección del servicio.
+        puerto (int): Puerto del servicio.
+        transacciones (list): Objetos (dict) a enviar, uno por línea.
+
+    Comportamiento:
+    - Escribe todas las líneas sin esperar respuesta de cada una (pipelining) y luego lee las respuestas.
+
+    Retorno:
+    - (list): Respuestas del servicio, en el mismo orden que las transacciones.
+    """
+    lector, escritor = await asyncio.open_connection(host, puerto, limit=LARGO_MAXIMO_LINEA)
+    async def escribir() -> None:
+        for transaccion in transacciones:
+            escritor.write(json.dumps(transaccion, ensure_ascii=False).encode("utf-8") + b"\n")
+            await escritor.drain()
+        escritor.write_eof()
+    escritura = asyncio.create_task(escribir())
+    respuestas = []
+    for _ in range(len(transacciones)):
+        linea = await lector.readline()
+        if not linea:
+            break
+        respuestas += [json.loads(linea)]
+    await escritura
+    escritor.close()
+    await escritor.wait_closed()
+    return respuestas
+
+async def _probar_en_local(clientes: int, por_cliente: int, opciones_servicio: dict) -> dict:
+    """
+    Levanta el servicio en localhost, lo carga con clientes concurrentes y devuelve sus métricas.
+
+    Retorno:
+    - (dict): Métricas del servicio al terminar, con la cantidad de transacciones del almacén.
+    """
+    from datos import usuarios_vip, empresas
+    almacen = AlmacenTransacciones()
+    servicio = ServicioIngesta(almacen, **opciones_servicio)
+    puerto = await servicio.iniciar()
+    cargas = []
+    for c in range(clientes):
+        transacciones = []
+        for i in range(por_cliente):
+            transacciones += [{
+                "usuario": usuarios_vip[(c + i) % len(usuarios_vip)],
+                "accion": empresas[i % len(empresas)],
+                "cantidad": (c * por_cliente + i) % 500 + 1,
+            }]
+        cargas += [enviar_transacciones("127.0.0.1", puerto, transacciones)]
+    await asyncio.gather(*cargas)
+    await servicio.detener()
+    resultado = servicio.metricas()
+    resultado["transacciones_en_almacen"] = len(almacen)
+    return resultado
+
+def main_ingesta(argumentos: list = None) -> int:
+    """
+    Punto de entrada del servicio de ingesta.
+
+    Comportamiento:
+    - Por defecto atiende en 127.0.0.1:`--puerto` hasta Ctrl+C, agregando al almacén (persistente
+      si se indica `--bitacora`), y al terminar muestra las métricas.
+    - Con `--prueba N` no queda escuchando: levanta el servicio en un puerto libre, lo carga con
+      `--clientes` conexiones concurrentes de N transacciones cada una e imprime las métricas en JSON.
+
+    Retorno:
+    - (int): Código de salida del proceso.
+    """
+    parser = argparse.ArgumentParser(description="Servicio de ingesta de transacciones UTN-Capital (TCP, JSON Lines).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--bitacora", default=None, help="Bitácora persistente donde agregar las transacciones.")
+    parser.add_argument("--tamano-lote", type=int, default=TAMANO_LOTE)
+    parser.add_argument("--espera-lote", type=float, default=ESPERA_LOTE, help="Segundos de espera para juntar un lote.")
+    parser.add_argument("--capacidad-cola", type=int, default=CAPACIDAD_COLA)
+    parser.add_argument("--prueba", type=int, default=None, help="Prueba de carga local: transacciones por cliente.")
+    parser.add_argument("--clientes", type=int, default=8, help="Clientes concurrentes de la prueba de carga.")
+    opciones = parser.parse_args(argumentos)
+    opciones_servicio = {"tamano_lote": opciones.tamano_lote, "espera_lote": opciones.espera_lote, "capacidad_cola": opciones.capacidad_cola}
+
+    if opciones.prueba is not None:
+        resultado = asyncio.run(_probar_en_local(opciones.clientes, opciones.prueba, opciones_servicio))
+        json.dump(resultado, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+        return 0
+
+    from main import crear_almacen, cerrar_almacen
+    almacen = crear_almacen(opciones.bitacora)
+    servicio = ServicioIngesta(almacen, opciones.host, opciones.puerto, **opciones_servicio)
+
+    async def servir() -> None:
+        puerto = await servicio.iniciar()
+        print(f"Escuchando transacciones en {opciones.host}:{puerto} (Ctrl+C para terminar)...")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await servicio.detener()
+
+    try:
+        asyncio.run(servir())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        cerrar_almacen(almacen)
+    json.dump(servicio.metricas(), sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main_ingesta())
@@ -0,0 +1,213 @@
+import atexit
+import importlib
+import json
+import os
+import sys
+import time
+import tracemalloc
+from functools import wraps
+
+VARIABLE_ENTORNO = "UTN_INSTRUMENTACION"
+VARIABLE_SALIDA = "UTN_INSTRUMENTACION_SALIDA"
+RUTA_SALIDA_POR_DEFECTO = "instrumentacion.json"
+
+FUNCIONES_INSTRUMENTADAS = [
+    ["registro", "detallar_transacciones"],
+    ["registro", "obtener_precio"],
+    ["utilidades", "ordenar_alfabeticamente"],
+    ["normalizacion", "normalizar_nombre_usuario"],
+    ["normalizacion", "normalizar_empresas"],
+    ["normalizacion", "normalizar_nombres_usuario"],
+    ["normalizacion", "normalizar_lista_empresas"],
+    ["consultas", "visualizar"],
+]
+
+COLUMNAS_ESTADISTICAS = [
+    ["funcion", "Función", 44, "{}"],
+    ["llamadas", "Llamadas", 10, "{}"],
+    ["segundos", "Total (s)", 11, "{:.4f}"],
+    ["maximo", "Máx (s)", 10, "{:.4f}"],
+    ["filas", "Filas", 10, "{}"],
+    ["bytes", "Bytes", 12, "{}"],
+]
+
+_activa = False
+_con_memoria = False
+_estadisticas = {}
+
+def instrumentacion_activa() -> bool:
+    """
+    Indica si la instrumentación está activa.
+
+    Retorno:
+    - (bool): True si se llamó a `activar` (o se activó con la variable de entorno UTN_INSTRUMENTACION).
+    """
+    return _activa
+
+def _contar_filas(argumentos: tuple) -> int:
+    """
+    Estima las filas procesadas por una llamada: el largo del primer argumento si es una colección
+    (lista, columna o almacén) y 1 si es un valor suelto (por ejemplo, un nombre a normalizar).
+
+    Retorno:
+    - (int): Filas procesadas.
+    """
+    if argumentos and not isinstance(argumentos[0], str):
+        try:
+            return len(argumentos[0])
+        except TypeError:
+            pass
+    return 1
+
+def _envolver(nombre: str, funcion):
+    """
+    Envuelve una función para registrar llamadas, tiempo de pared, filas y asignaciones de memoria.
+
+    Retorno:
+    - (function): Función envoltorio, con el mismo nombre y documentación que la original.
+    """
+    registro_funcion = _estadisticas.setdefault(nombre, {"llamadas": 0, "segundos": 0.0, "maximo": 0.0, "filas": 0, "bytes": 0})
+
+    @wraps(funcion)
+    def envoltorio(*argumentos, **opciones):
+        memoria_inicial = tracemalloc.get_traced_memory()[0] if _con_memoria else 0
+        inicio = time.perf_counter()
+        try:
+            return funcion(*argumentos, **opciones)
+        finally:
+            segundos = time.perf_counter() - inicio
+            registro_funcion["llamadas"] += 1
+            registro_funcion["segundos"] += segundos
+            if segundos > registro_funcion["maximo"]:
+                registro_funcion["maximo"] = segundos
+            registro_funcion["filas"] += _contar_filas(argumentos)
+            if _con_memoria:
+                registro_funcion["bytes"] += tracemalloc.get_traced_memory()[0] - memoria_inicial
+    envoltorio.funcion_original = funcion
+    return envoltorio
+
+def _reemplazar_en_modulos(original, envoltorio) -> None:
+    """
+    Reemplaza una función por su envoltorio en todos los módulos del programa que la importaron por nombre.
+
+    Retorno:
+    None
+    """
+    directorio = os.path.dirname(os.path.abspath(__file__))
+    for modulo in list(sys.modules.values()):
+        archivo = getattr(modulo, "__file__", None)
+        if not archivo or os.path.dirname(os.path.abspath(archivo)) != directorio:
+            continue
+        for atributo, valor in list(vars(modulo).items()):
+            if valor is original:
+                setattr(modulo, atributo, envoltorio)
+    return None
+
+def activar(memoria: bool = False, ruta_salida: str = None) -> None:
+    """
+    Activa la instrumentación de las funciones críticas del programa.
+
+    Args:
+        memoria (bool, opcional): Si es True, también mide las asignaciones de memoria con `tracemalloc`
+            (bastante más costoso que medir sólo tiempos).
+        ruta_salida (str, opcional): Archivo JSON donde volcar las estadísticas al terminar el programa.
+            Por defecto, la variable de entorno UTN_INSTRUMENTACION_SALIDA o "instrumentacion.json".
+
+    Comportamiento:
+    - Instrumenta `FUNCIONES_INSTRUMENTADAS` y cada consulta del submenú (`consultas.CONSULTAS`).
+    - Las funciones se reemplazan por envoltorios recién al activar: mientras la instrumentación está
+      desactivada el programa llama a las funciones originales, sin ningún costo adicional.
+    - Registra el volcado a JSON para cuando termine el programa (`atexit`).
+    - Llamarla más de una vez no vuelve a envolver las funciones.
+
+    Retorno:
+    None
+    """
+    global _activa, _con_memoria
+    if _activa:
+        return None
+    _activa = True
+    _con_memoria = memoria
+    if memoria and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+    for nombre_modulo, nombre_funcion in FUNCIONES_INSTRUMENTADAS:
+        modulo = importlib.import_module(nombre_modulo)
+        original = getattr(modulo, nombre_funcion)
+        _reemplazar_en_modulos(original, _envolver(f"{nombre_modulo}.{nombre_funcion}", original))
+    consultas = importlib.import_module("consultas")
+    for numero, (nombre_consulta, funcion_consulta) in consultas.CONSULTAS.items():
+        envoltorio = _envolver(f"consultas.{nombre_consulta}", funcion_consulta)
+        _reemplazar_en_modulos(funcion_consulta, envoltorio)
+        consultas.CONSULTAS[numero] = [nombre_consulta, envoltorio]
+
+    if ruta_salida is None:
+        ruta_salida = os.environ.get(VARIABLE_SALIDA, RUTA_SALIDA_POR_DEFECTO)
+    atexit.register(volcar_estadisticas, ruta_salida)
+    return None
+
+def estadisticas() -> dict:
+    """
+    Obtiene las estadísticas acumuladas de las funciones que fueron llamadas al menos una vez.
+
+    Retorno:
+    - (dict): nombre de función -> {"llamadas", "segundos", "maximo", "filas", "bytes"}.
+    """
+    resultado = {}
+    for nombre, registro_funcion in _estadisticas.items():
+        if registro_funcion["llamadas"]:
+            resultado[nombre] = dict(registro_funcion)
+    return resultado
+
+def reiniciar_estadisticas() -> None:
+    """
+    Pone en cero las estadísticas acumuladas, sin desactivar la instrumentación.
+
+    Retorno:
+    None
+    """
+    for registro_funcion in _estadisticas.values():
+        registro_funcion.update({"llamadas": 0, "segundos": 0.0, "maximo": 0.0, "filas": 0, "bytes": 0})
+    return None
+
+def volcar_estadisticas(ruta: str) -> None:
+    """
+    Guarda las estadísticas acumuladas en un archivo JSON.
+
+    Retorno:
+    None
+    """
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        json.dump({"memoria": _con_memoria, "funciones": estadisticas()}, archivo, ensure_ascii=False, indent=2)
+    return None
+
+def mostrar_estadisticas(destino=None) -> None:
+    """
+    Muestra las estadísticas acumuladas como tabla, ordenadas por tiempo total (mayor primero).
+
+    Retorno:
+    None
+    """
+    from presentacion import mostrar_lineas, renderizar_filas
+    if not _activa:
+        mostrar_lineas([f"⚠️ La instrumentación está desactivada (active {VARIABLE_ENTORNO}=1 o la opción correspondiente)."], destino)
+        return None
+    filas = []
+    for nombre, registro_funcion in estadisticas().items():
+        filas += [[nombre, registro_funcion["llamadas"], registro_funcion["segundos"], registro_funcion["maximo"], registro_funcion["filas"], registro_funcion["bytes"] if _con_memoria else "-"]]
+    filas.sort(key=lambda fila: fila[2], reverse=True)
+    renderizar_filas(filas, COLUMNAS_ESTADISTICAS, destino=destino, titulo="\n--- 📊 Estadísticas de Instrumentación ---")
+    return None
+
+def activar_desde_entorno() -> None:
+    """
+    Activa la instrumentación si la variable de entorno UTN_INSTRUMENTACION vale "1" (sólo tiempos)
+    o "memoria" (tiempos y asignaciones).
+
+    Retorno:
+    None
+    """
+    valor = os.environ.get(VARIABLE_ENTORNO, "")
+    if valor in ("1", "memoria"):
+        activar(memoria=valor == "memoria")
+    return None
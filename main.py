@@ -1,72 +1,378 @@
-from registro import registrar_usuario, registrar_empresa, registrar_cantidad, detallar_transacciones
-from consultas import visualizar, ejecutar_submenu_consultas
-from utilidades import reconocer_numero
-
-def main() -> None:
-    nombres_transacciones = []
-    acciones_transacciones = []
-    cantidades_transacciones = [] 
-    datos_cargados = False
-    continuar_programa = True
-
-    while continuar_programa:
-        print("\n--- MENÚ UTN-Capital ---")
-        print("1. Registrar Transacción")
-        print("2. Visualizar todos los datos")
-        print("3. Consultas")
-        print("4. Salir")
-        opcion_str = input("Opción: ")
-        es_opcion_valida_formato = True
-        if not opcion_str: 
-            es_opcion_valida_formato = False
-        else:
-            for i in range(len(opcion_str)):
-                if not reconocer_numero(opcion_str[i]):
-                    es_opcion_valida_formato = False
-                    break
-
-        if not es_opcion_valida_formato:
-            print("Error: Opción inválida, ingrese un número.")
-            input("\nPresione Enter para continuar...")
-            continue
-        
-        opcion = int(opcion_str)
-
-        if opcion == 1:
-            usuario = registrar_usuario()
-            accion = registrar_empresa()
-            cantidad = registrar_cantidad()
-            if (usuario and accion and cantidad):
-                nombres_transacciones += [usuario]    
-                acciones_transacciones += [accion]      
-                cantidades_transacciones += [cantidad] 
-                datos_cargados = True
-                print("\n--- ¡Transacción guardada en las listas correspondientes! ---")
-        elif opcion == 2:
-            if datos_cargados:
-                transacciones = detallar_transacciones(nombres_transacciones,acciones_transacciones,cantidades_transacciones)
-                visualizar(transacciones)
-            else:
-                print("⚠️ Primero debe registrar transacciones (opción 1).")
-        elif opcion == 3:
-            if datos_cargados:
-                ejecutar_submenu_consultas(
-                    nombres_transacciones,
-                    acciones_transacciones,
-                    cantidades_transacciones
-                )
-            else:
-                print("⚠️ Primero debe registrar transacciones (opción 1).")
-        elif opcion == 4:
-            print("Saliendo del programa...")
-            continuar_programa = False
-        else:
-            print("Opción no válida.")
-
-        if continuar_programa:
-            input("\nPresione Enter para continuar...")
-
-    return None
-
-if __name__ == "__main__":
-    main()
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from registro import registrar_usuario, registrar_empresa, registrar_cantidad
+from almacen import AlmacenTransacciones
+from consultas import visualizar, ejecutar_submenu_consultas, CONSULTAS, CANTIDAD_RANKING, PERCENTIL_POR_DEFECTO, parametros_consulta
+from consultas import CONSULTAS_RANKING, CONSULTAS_PERCENTIL, es_entero_positivo, pedir_cantidad_ranking, pedir_percentil
+from importacion import importar_transacciones
+from persistencia import AlmacenPersistente
+from almacen_sqlite import AlmacenSQLite
+import vectorizado
+from reporte import generar_reporte, generar_reporte_ventana
+from ventanas import ANCHO_BALDE, CANTIDAD_BALDES
+from paralelo import generar_reporte_paralelo
+from presentacion import FORMATOS_SALIDA
+import instrumentacion
+from historial import cargar_historial_csv
+from datos import historial_precios
+from normalizacion import normalizar_empresas
+from utilidades import reconocer_numero
+
+TAMANO_PAGINA_LISTADO = 50
+
+VENTANAS_PREDEFINIDAS = {
+    1: ["Última hora", 3600, False],
+    2: ["Últimas 24 horas", 86400, False],
+    3: ["Hoy", 86400, True],
+}
+
+def crear_almacen(ruta_bitacora: str = None, ruta_sqlite: str = None) -> AlmacenTransacciones:
+    """
+    Crea el almacén de transacciones del programa.
+
+    Args:
+        ruta_bitacora (str, opcional): Bitácora en disco. Si se indica, el almacén es persistente y se
+            restaura con las transacciones ya guardadas; si no, vive sólo en memoria.
+        ruta_sqlite (str, opcional): Base SQLite. Si se indica, las transacciones se guardan y consultan
+            en la base (`AlmacenSQLite`), para historiales que no entran en memoria.
+
+    Retorno:
+    - (AlmacenTransacciones | AlmacenSQLite): Almacén listo para usar.
+    """
+    if ruta_sqlite:
+        return AlmacenSQLite(ruta_sqlite)
+    if ruta_bitacora:
+        return AlmacenPersistente(ruta_bitacora)
+    return AlmacenTransacciones()
+
+def cerrar_almacen(almacen: AlmacenTransacciones) -> None:
+    """
+    Cierra el almacén, confirmando en disco las transacciones pendientes si es persistente o SQLite.
+
+    Retorno:
+    None
+    """
+    if isinstance(almacen, (AlmacenPersistente, AlmacenSQLite)):
+        almacen.cerrar()
+    return None
+
+def confirmar_almacen(almacen: AlmacenTransacciones) -> None:
+    """
+    Confirma en disco las transacciones pendientes de un almacén persistente, sin esperar el plazo del commit agrupado.
+
+    Comportamiento:
+    - El menú la llama al terminar cada opción, antes de quedar esperando al usuario: sin más escrituras,
+      la bitácora no volvería a revisar el plazo hasta la transacción siguiente.
+
+    Retorno:
+    None
+    """
+    if isinstance(almacen, AlmacenPersistente):
+        almacen.bitacora.confirmar()
+    return None
+
+def ejecutar_consultas_ventana(almacen: AlmacenTransacciones) -> None:
+    """
+    Ejecuta una consulta del submenú sobre las transacciones de una ventana de tiempo.
+
+    Args:
+        almacen (AlmacenTransacciones): Almacén con las transacciones registradas.
+
+    Comportamiento:
+    - Pide la ventana (`VENTANAS_PREDEFINIDAS`), el número de consulta y, si corresponde, la cantidad
+      de posiciones N o el percentil.
+    - Resuelve la consulta con `generar_reporte_ventana`, que combina los baldes de tiempo del almacén
+      sin recorrer las transacciones, y muestra el resultado.
+
+    Retorno:
+    None
+    """
+    print("\n🕒 Ventanas de tiempo:")
+    for numero, (titulo, _, _) in VENTANAS_PREDEFINIDAS.items():
+        print(f"  {numero}. {titulo}.")
+    opcion_str = input("Seleccione una ventana: ")
+    if not es_entero_positivo(opcion_str) or int(opcion_str) not in VENTANAS_PREDEFINIDAS:
+        print("❌ Ventana no válida.")
+        return None
+    titulo, duracion, fija = VENTANAS_PREDEFINIDAS[int(opcion_str)]
+    numero_str = input("Número de consulta (1-8, 10-15): ")
+    if not es_entero_positivo(numero_str) or int(numero_str) not in CONSULTAS:
+        print("❌ Opción de consulta no válida.")
+        return None
+    numero_consulta = int(numero_str)
+    cantidad_ranking = CANTIDAD_RANKING
+    percentil = PERCENTIL_POR_DEFECTO
+    if numero_consulta in CONSULTAS_RANKING:
+        cantidad_ranking = pedir_cantidad_ranking()
+    elif numero_consulta in CONSULTAS_PERCENTIL:
+        percentil = pedir_percentil()
+    print(f"\n🕒 Ventana: {titulo}")
+    generar_reporte_ventana(almacen, duracion, fija, [numero_consulta], cantidad_ranking=cantidad_ranking, percentil=percentil, mostrar=True)
+    return None
+
+def main(ruta_bitacora: str = None, instrumentar: str = None, ruta_sqlite: str = None) -> None:
+    if instrumentar:
+        instrumentacion.activar(memoria=instrumentar == "memoria")
+    else:
+        instrumentacion.activar_desde_entorno()
+    almacen = crear_almacen(ruta_bitacora, ruta_sqlite)
+    datos_cargados = len(almacen) > 0
+    continuar_programa = True
+
+    try:
+        while continuar_programa:
+            print("\n--- MENÚ UTN-Capital ---")
+            print("1. Registrar Transacción")
+            print("2. Visualizar todos los datos")
+            print("3. Consultas")
+            print("4. Importar transacciones desde archivo (CSV/JSONL)")
+            print("5. Estadísticas de rendimiento (instrumentación)")
+            print("6. Consultas por ventana de tiempo (última hora, hoy)")
+            print("7. Salir")
+            opcion_str = input("Opción: ")
+            es_opcion_valida_formato = True
+            if not opcion_str: 
+                es_opcion_valida_formato = False
+            else:
+                for i in range(len(opcion_str)):
+                    if not reconocer_numero(opcion_str[i]):
+                        es_opcion_valida_formato = False
+                        break
+
+            if not es_opcion_valida_formato:
+                print("Error: Opción inválida, ingrese un número.")
+                input("\nPresione Enter para continuar...")
+                continue
+        
+            opcion = int(opcion_str)
+
+            if opcion == 1:
+                usuario = registrar_usuario()
+                accion = registrar_empresa()
+                cantidad = registrar_cantidad()
+                if (usuario and accion and cantidad):
+                    almacen.agregar(usuario, accion, cantidad)
+                    datos_cargados = True
+                    print("\n--- ¡Transacción guardada en el almacén de transacciones! ---")
+            elif opcion == 2:
+                if datos_cargados:
+                    desplazamiento = 0
+                    while desplazamiento is not None:
+                        desplazamiento = visualizar(almacen, TAMANO_PAGINA_LISTADO, desplazamiento)
+                        if desplazamiento is not None and input("Enter para ver más, 'q' para volver: ").strip().lower() == "q":
+                            desplazamiento = None
+                else:
+                    print("⚠️ Primero debe registrar transacciones (opción 1).")
+            elif opcion == 3:
+                if datos_cargados:
+                    ejecutar_submenu_consultas(almacen)
+                else:
+                    print("⚠️ Primero debe registrar transacciones (opción 1).")
+            elif opcion == 4:
+                ruta_archivo = input("Ruta del archivo a importar: ")
+                ruta_rechazos = ruta_archivo + ".rechazos.csv"
+                try:
+                    resumen = importar_transacciones(ruta_archivo, almacen, ruta_rechazos)
+                except OSError as error:
+                    print(f"Error: No se pudo leer el archivo ({error}).")
+                else:
+                    if resumen["aceptadas"]:
+                        datos_cargados = True
+                    print(f"\n--- Importación finalizada: {resumen['aceptadas']} aceptadas, {resumen['rechazadas']} rechazadas de {resumen['leidas']} leídas ---")
+                    if resumen["rechazadas"]:
+                        print(f"Detalle de rechazos en: {ruta_rechazos}")
+            elif opcion == 5:
+                instrumentacion.mostrar_estadisticas()
+            elif opcion == 6:
+                if datos_cargados:
+                    ejecutar_consultas_ventana(almacen)
+                else:
+                    print("⚠️ Primero debe registrar transacciones (opción 1).")
+            elif opcion == 7:
+                print("Saliendo del programa...")
+                continuar_programa = False
+            else:
+                print("Opción no válida.")
+
+            if continuar_programa:
+                confirmar_almacen(almacen)
+                input("\nPresione Enter para continuar...")
+    finally:
+        cerrar_almacen(almacen)
+
+    return None
+
+def main_lote(argumentos: list = None) -> int:
+    """
+    Punto de entrada no interactivo: carga un archivo de transacciones y ejecuta consultas sin usar input().
+
+    Args:
+        argumentos (list, opcional): Argumentos de línea de comandos (por defecto, `sys.argv[1:]`).
+
+    Comportamiento:
+    - Restaura la bitácora indicada con `--bitacora`, si la hay; con `--sqlite` usa en cambio una base
+      SQLite, donde cada consulta se resuelve con una agregación SQL.
+    - Carga el historial de precios indicado con `--precios`, si lo hay.
+    - Importa el archivo indicado con `importar_transacciones` (CSV o JSON Lines).
+    - Ejecuta las consultas pedidas con `--consultas` (números del submenú separados por coma, o "todas");
+      los rankings (10-13) usan `--top` posiciones y los usuarios sobre un percentil (15), `--percentil`.
+    - Mide el tiempo de la carga y de cada consulta (o del reporte completo con `--reporte`, que
+      recalcula todas las consultas pedidas en una única pasada con `generar_reporte`; con `--procesos N`
+      la pasada se reparte entre N procesos con `generar_reporte_paralelo`).
+    - Con `--ventana N` calcula en cambio las consultas sobre los últimos N segundos (o, con `--ventana-fija`,
+      sobre el período de N segundos que contiene al instante final, por ejemplo hoy con 86400), combinando
+      los baldes de tiempo del almacén (`generar_reporte_ventana`). `--hasta` fija el instante final.
+    - Escribe los resultados en JSON (por defecto) o CSV, en `--salida` o en la salida estándar.
+    - Con `--listado` escribe en cambio el listado de transacciones ordenado por usuario (tabla, CSV o
+      JSON Lines, opcionalmente truncado con `--cabeza` / `--cola`) y no ejecuta consultas.
+
+    Retorno:
+    - (int): Código de salida del proceso (0 si todo salió bien).
+    """
+    parser = argparse.ArgumentParser(description="Consultas UTN-Capital en modo lote.")
+    parser.add_argument("archivo", nargs="?", default=None, help="Archivo de transacciones (.csv o .jsonl).")
+    parser.add_argument("--bitacora", default=None, help="Bitácora persistente a restaurar (y donde se agregan las filas importadas).")
+    parser.add_argument("--sqlite", default=None, help="Base SQLite donde guardar y consultar las transacciones (en lugar de la memoria).")
+    parser.add_argument("--consultas", default="todas", help="Números de consulta separados por coma (1-8, 10-15) o 'todas'.")
+    parser.add_argument("--top", type=int, default=CANTIDAD_RANKING, help="Posiciones (N) de los rankings (consultas 10-13).")
+    parser.add_argument("--percentil", type=int, default=PERCENTIL_POR_DEFECTO, help="Percentil de corte (1-99) de la consulta 15.")
+    parser.add_argument("--ventana", type=float, default=None, help="Calcula las consultas sobre los últimos N segundos (ventana deslizante, hasta 86400).")
+    parser.add_argument("--ventana-fija", action="store_true", help="Con --ventana, usa el período fijo de N segundos (alineado a la hora local) que contiene al instante final; por ejemplo, hoy con 86400.")
+    parser.add_argument("--hasta", type=float, default=None, help="Con --ventana, instante final de la ventana en segundos desde la época Unix (por defecto, ahora).")
+    parser.add_argument("--formato", choices=["json", "csv"], default="json")
+    parser.add_argument("--salida", default=None, help="Archivo de salida (por defecto, la salida estándar).")
+    parser.add_argument("--precios", default=None, help="CSV con el historial de precios (empresa, instante, precio) para valuar cada transacción en su instante.")
+    parser.add_argument("--rechazos", default=None, help="Archivo CSV para las filas rechazadas.")
+    parser.add_argument("--reporte", action="store_true", help="Recalcula todas las consultas pedidas en una sola pasada sobre las transacciones.")
+    parser.add_argument("--numpy", action="store_true", help="Usa el backend vectorizado de NumPy para los cálculos masivos.")
+    parser.add_argument("--procesos", type=int, default=1, help="Procesos para calcular el reporte en paralelo (implica --reporte).")
+    parser.add_argument("--listado", choices=FORMATOS_SALIDA, default=None, help="Escribe el listado de transacciones en el formato indicado en lugar de las consultas.")
+    parser.add_argument("--cabeza", type=int, default=None, help="Con --listado, sólo las primeras N transacciones (y las de --cola).")
+    parser.add_argument("--cola", type=int, default=None, help="Con --listado, sólo las últimas N transacciones (y las de --cabeza).")
+    parser.add_argument("--instrumentar", nargs="?", const="tiempos", choices=["tiempos", "memoria"], default=None, help="Registra tiempos (y asignaciones, con 'memoria') de las funciones críticas y los vuelca a JSON al terminar.")
+    opciones = parser.parse_args(argumentos)
+
+    if opciones.consultas == "todas":
+        numeros_consultas = list(CONSULTAS)
+    else:
+        numeros_consultas = []
+        for numero in opciones.consultas.split(","):
+            numero = numero.strip()
+            if not numero.isdigit() or int(numero) not in CONSULTAS:
+                parser.error(f"Consulta inválida: {numero}")
+            numeros_consultas += [int(numero)]
+
+    if not opciones.archivo and not opciones.bitacora and not opciones.sqlite:
+        parser.error("Debe indicar un archivo de transacciones, una bitácora o una base SQLite.")
+    if opciones.numpy:
+        if not vectorizado.numpy_disponible():
+            parser.error("NumPy no está instalado.")
+        vectorizado.usar_numpy(True)
+    if opciones.instrumentar:
+        instrumentacion.activar(memoria=opciones.instrumentar == "memoria")
+    else:
+        instrumentacion.activar_desde_entorno()
+    if opciones.procesos < 1:
+        parser.error("--procesos debe ser al menos 1.")
+    if opciones.top < 1:
+        parser.error("--top debe ser al menos 1.")
+    if not 1 <= opciones.percentil <= 99:
+        parser.error("--percentil debe estar entre 1 y 99.")
+    if opciones.ventana is None and (opciones.ventana_fija or opciones.hasta is not None):
+        parser.error("--ventana-fija y --hasta requieren --ventana.")
+    if opciones.ventana is not None and not 0 < opciones.ventana <= ANCHO_BALDE * CANTIDAD_BALDES:
+        parser.error(f"--ventana debe ser mayor a 0 y a lo sumo {ANCHO_BALDE * CANTIDAD_BALDES} segundos.")
+    if opciones.ventana is not None and (opciones.reporte or opciones.procesos > 1):
+        parser.error("--ventana no se combina con --reporte ni --procesos.")
+    if opciones.sqlite and opciones.bitacora:
+        parser.error("--sqlite y --bitacora son excluyentes.")
+    if opciones.sqlite and (opciones.reporte or opciones.procesos > 1):
+        parser.error("--reporte y --procesos requieren el almacén en memoria (no se combinan con --sqlite).")
+
+    inicio = time.perf_counter()
+    if opciones.precios:
+        cargar_historial_csv(opciones.precios, historial_precios, normalizar_empresas)
+    almacen = crear_almacen(opciones.bitacora, opciones.sqlite)
+    try:
+        resumen_carga = {"leidas": 0, "aceptadas": 0, "rechazadas": 0}
+        if opciones.archivo:
+            resumen_carga = importar_transacciones(opciones.archivo, almacen, opciones.rechazos)
+        segundos_carga = time.perf_counter() - inicio
+        resumen_carga["transacciones"] = len(almacen)
+
+        if opciones.listado:
+            if opciones.salida:
+                salida = open(opciones.salida, "w", newline="", encoding="utf-8")
+            else:
+                salida = sys.stdout
+            try:
+                visualizar(almacen, formato=opciones.listado, destino=salida, cabeza=opciones.cabeza, cola=opciones.cola)
+            finally:
+                if salida is not sys.stdout:
+                    salida.close()
+            return 0
+
+        resultados = {}
+        tiempos = {"carga": segundos_carga}
+        if opciones.ventana is not None:
+            inicio = time.perf_counter()
+            resultados = generar_reporte_ventana(
+                almacen, opciones.ventana, opciones.ventana_fija, numeros_consultas, opciones.hasta,
+                cantidad_ranking=opciones.top, percentil=opciones.percentil,
+            )
+            tiempos["ventana"] = time.perf_counter() - inicio
+        elif opciones.procesos > 1:
+            inicio = time.perf_counter()
+            resultados = generar_reporte_paralelo(almacen, numeros_consultas, opciones.procesos, cantidad_ranking=opciones.top, percentil=opciones.percentil)
+            tiempos["reporte"] = time.perf_counter() - inicio
+        elif opciones.reporte:
+            inicio = time.perf_counter()
+            resultados = generar_reporte(almacen, numeros_consultas, cantidad_ranking=opciones.top, percentil=opciones.percentil)
+            tiempos["reporte"] = time.perf_counter() - inicio
+        else:
+            for numero in numeros_consultas:
+                nombre_consulta, funcion_consulta = CONSULTAS[numero]
+                inicio = time.perf_counter()
+                resultados[nombre_consulta] = funcion_consulta(almacen, *parametros_consulta(numero, opciones.top, opciones.percentil), mostrar=False)
+                tiempos[nombre_consulta] = time.perf_counter() - inicio
+    finally:
+        cerrar_almacen(almacen)
+
+    if opciones.salida:
+        salida = open(opciones.salida, "w", newline="", encoding="utf-8")
+    else:
+        salida = sys.stdout
+    try:
+        if opciones.formato == "json":
+            json.dump({"carga": resumen_carga, "resultados": resultados, "segundos": tiempos}, salida, ensure_ascii=False, indent=2)
+            salida.write("\n")
+        else:
+            escritor = csv.writer(salida)
+            for nombre_consulta, resultado in resultados.items():
+                if not isinstance(resultado, list):
+                    escritor.writerow([nombre_consulta, resultado])
+                elif resultado and isinstance(resultado[0], list):
+                    for fila in resultado:
+                        escritor.writerow([nombre_consulta] + fila)
+                elif nombre_consulta == "accion_con_mayor_inversion":
+                    escritor.writerow([nombre_consulta] + resultado)
+                else:
+                    for valor in resultado:
+                        escritor.writerow([nombre_consulta, valor])
+    finally:
+        if salida is not sys.stdout:
+            salida.close()
+    return 0
+
+if __name__ == "__main__":
+    argumentos = sys.argv[1:]
+    if argumentos and not (argumentos[0] == "--instrumentar" and argumentos[1:] in ([], ["tiempos"], ["memoria"])):
+        sys.exit(main_lote())
+    modo_instrumentacion = None
+    if argumentos:
+        modo_instrumentacion = (argumentos[1:] + ["tiempos"])[0]
+    main(os.environ.get("UTN_BITACORA"), instrumentar=modo_instrumentacion, ruta_sqlite=os.environ.get("UTN_SQLITE"))
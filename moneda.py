@@ -0,0 +1,30 @@
+CENTAVOS_POR_DOLAR = 100
+
+def a_centavos(monto: float) -> int:
+    """
+    Convierte un monto en USD a centavos enteros (punto fijo), redondeando al centavo más cercano.
+
+    Args:
+        monto (float): Monto en USD, por ejemplo un precio del catálogo o del historial.
+
+    Comportamiento:
+    - `round` corrige el error de representación binaria (10.41 * 100 = 1040.9999...).
+    - Una cotización con fracciones de centavo se redondea al centavo.
+
+    Retorno:
+    - (int): Monto en centavos.
+    """
+    return round(monto * CENTAVOS_POR_DOLAR)
+
+def a_dolares(centavos: int) -> float:
+    """
+    Convierte centavos enteros a USD, para mostrar o devolver un resultado.
+
+    Comportamiento:
+    - Una única división: el resultado es el float más cercano al monto exacto, por lo que al
+      formatearlo con dos decimales se obtiene exactamente el monto en centavos.
+
+    Retorno:
+    - (float): Monto en USD.
+    """
+    return centavos / CENTAVOS_POR_DOLAR
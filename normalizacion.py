@@ -1,58 +1,78 @@
-def normalizar_nombre_usuario(usuario: str) -> str:
-    """
-    Convierte el nombre de usuario en un formato estandarizado:
-    - La primera letra en mayúscula.
-    - El resto de los caracteres en minúscula.
-
-    Args:
-        usuario (str): Nombre de usuario a normalizar.
-
-    Comportamiento:
-    - Si el usuario está vacío, retorna una cadena vacía.
-    - Convierte la primera letra a mayúscula si es una letra minúscula ('a' - 'z').
-    - Recorre el resto de los caracteres y convierte cualquier mayúscula ('A' - 'Z') en minúscula.
-    - Retorna el nombre formateado.
-
-    Retorno:
-    - (str): Nombre de usuario con la primera letra en mayúscula y el resto en minúscula.
-    """
-    nombre_normalizado = ""
-    if usuario:
-        primera_letra = ord(usuario[0])
-        if ord('a') <= primera_letra <= ord('z'):
-            nombre_normalizado += chr(primera_letra - 32)
-        else:
-            nombre_normalizado += usuario[0]
-        for i in range(1, len(usuario)):
-            orden_caracter = ord(usuario[i])
-            if ord('A') <= orden_caracter <= ord('Z'):
-                nombre_normalizado += chr(orden_caracter + 32)
-            else:
-                nombre_normalizado += usuario[i]
-    return nombre_normalizado
-
-def normalizar_empresas(empresa: str) -> str:
-    """
-    Convierte el nombre de una empresa a mayúsculas sin usar métodos de cadena.
-
-    Args:
-        empresa (str): Nombre de la empresa a normalizar.
-
-    Comportamiento:
-    - Recorre cada carácter de la cadena `empresa`.
-    - Convierte caracteres en minúscula ('a' - 'z') a mayúscula restando 32 en su código ASCII.
-    - Si el carácter ya está en mayúscula, lo mantiene sin cambios.
-    - Construye y retorna el nombre normalizado.
-
-    Retorno:
-    - (str): Nombre de la empresa con todas las letras en mayúsculas.
-    """
-    nombre_normalizado = ""
-    if empresa:
-        for i in range(len(empresa)):
-            caracter_ascii = ord(empresa[i])
-            if ord('a') <= caracter_ascii <= ord('z'):
-                nombre_normalizado += chr(caracter_ascii - 32)
-            else:
-                nombre_normalizado += empresa[i]
-    return nombre_normalizado
+from functools import lru_cache
+
+TAMANO_CACHE_NORMALIZACION = 65536
+
+MAYUSCULAS_A_MINUSCULAS = {}
+MINUSCULAS_A_MAYUSCULAS = {}
+for i in range(26):
+    MAYUSCULAS_A_MINUSCULAS[ord('A') + i] = ord('a') + i
+    MINUSCULAS_A_MAYUSCULAS[ord('a') + i] = ord('A') + i
+
+@lru_cache(maxsize=TAMANO_CACHE_NORMALIZACION)
+def normalizar_nombre_usuario(usuario: str) -> str:
+    """
+    Convierte el nombre de usuario en un formato estandarizado:
+    - La primera letra en mayúscula.
+    - El resto de los caracteres en minúscula.
+
+    Args:
+        usuario (str): Nombre de usuario a normalizar.
+
+    Comportamiento:
+    - Si el usuario está vacío, retorna una cadena vacía.
+    - Convierte la primera letra a mayúscula si es una letra minúscula ('a' - 'z').
+    - Convierte cualquier mayúscula ('A' - 'Z') del resto del nombre en minúscula.
+    - Sólo se modifican letras ASCII: el resto de los caracteres (por ejemplo 'ñ' o 'Ñ') se mantiene igual.
+    - Usa tablas de traducción (`str.translate`), por lo que el costo es lineal en el largo del nombre.
+    - Guarda en un cache LRU acotado (`TAMANO_CACHE_NORMALIZACION`) los nombres vistos recientemente.
+
+    Retorno:
+    - (str): Nombre de usuario con la primera letra en mayúscula y el resto en minúscula.
+    """
+    if not usuario:
+        return ""
+    return usuario[0].translate(MINUSCULAS_A_MAYUSCULAS) + usuario[1:].translate(MAYUSCULAS_A_MINUSCULAS)
+
+@lru_cache(maxsize=TAMANO_CACHE_NORMALIZACION)
+def normalizar_empresas(empresa: str) -> str:
+    """
+    Convierte el nombre de una empresa a mayúsculas.
+
+    Args:
+        empresa (str): Nombre de la empresa a normalizar.
+
+    Comportamiento:
+    - Convierte caracteres en minúscula ('a' - 'z') a mayúscula; sólo se modifican letras ASCII.
+    - Usa una tabla de traducción (`str.translate`), con costo lineal en el largo del nombre.
+    - Guarda en un cache LRU acotado (`TAMANO_CACHE_NORMALIZACION`) los nombres vistos recientemente.
+
+    Retorno:
+    - (str): Nombre de la empresa con todas las letras en mayúsculas.
+    """
+    if not empresa:
+        return ""
+    return empresa.translate(MINUSCULAS_A_MAYUSCULAS)
+
+def normalizar_nombres_usuario(usuarios) -> list:
+    """
+    Normaliza un lote de nombres de usuario en una sola llamada.
+
+    Args:
+        usuarios (iterable): Nombres de usuario a normalizar (lista, columna, generador...).
+
+    Retorno:
+    - (list): Nombres normalizados, en el mismo orden, con las mismas reglas que `normalizar_nombre_usuario`.
+    """
+    return list(map(normalizar_nombre_usuario, usuarios))
+
+def normalizar_lista_empresas(empresas) -> list:
+    """
+    Normaliza un lote de nombres de empresas en una sola llamada.
+
+    Args:
+        empresas (iterable): Nombres de empresas a normalizar.
+
+    Retorno:
+    - (list): Nombres normalizados, en el mismo orden, con las mismas reglas que `normalizar_empresas`.
+    """
+    return list(map(normalizar_empresas, empresas))
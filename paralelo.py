@@ -0,0 +1,205 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from almacen import AlmacenTransacciones
+from acumulados import AgregadosIncrementales
+from consultas import CONSULTAS, CANTIDAD_RANKING, PERCENTIL_POR_DEFECTO
+from reporte import acumular_rango, completar_mayores, calcular_agregados, agregados_necesarios, nombres_de_consultas, derivar_resultados
+
+COLUMNAS_COMPARTIDAS = ("usuarios", "empresas", "cantidades", "totales")
+FILAS_MINIMAS_POR_FRAGMENTO = 250000
+
+_columnas_del_proceso = {}
+
+def _adjuntar_columnas(segmentos: dict) -> None:
+    """
+    Inicializador de cada proceso trabajador: se adjunta a la memoria compartida de las columnas.
+
+    Args:
+        segmentos (dict): columna -> [nombre del segmento, código de tipo, cantidad de filas].
+
+    Comportamiento:
+    - Las columnas no viajan serializadas: cada proceso las lee directamente del segmento compartido,
+      como una vista tipada sin copia.
+    - Sólo el proceso principal elimina los segmentos (`_liberar_segmentos`); los trabajadores
+      comparten su registro de recursos, por lo que no los liberan al terminar.
+
+    Retorno:
+    None
+    """
+    for columna, (nombre, codigo_tipo, cantidad_filas) in segmentos.items():
+        segmento = shared_memory.SharedMemory(name=nombre)
+        _columnas_del_proceso[columna] = [segmento, segmento.buf.cast(codigo_tipo)[:cantidad_filas]]
+    return None
+
+def _acumular_fragmento(inicio: int, fin: int, necesarios: list, cantidad_usuarios: int, cantidad_empresas: int) -> AgregadosIncrementales:
+    """
+    Tarea de un proceso trabajador: agregados parciales del fragmento [inicio, fin).
+
+    Retorno:
+    - (AgregadosIncrementales): Agregados parciales, sin la mayor tenencia por usuario.
+    """
+    return acumular_rango(
+        _columnas_del_proceso["usuarios"][1], _columnas_del_proceso["empresas"][1],
+        _columnas_del_proceso["cantidades"][1], _columnas_del_proceso["totales"][1],
+        necesarios, inicio, fin, cantidad_usuarios, cantidad_empresas,
+    )
+
+def dividir_en_fragmentos(inicio: int, fin: int, cantidad_fragmentos: int) -> list:
+    """
+    Divide el rango de filas [inicio, fin) en fragmentos contiguos de tamaño parejo.
+
+    Retorno:
+    - (list): Lista de [inicio, fin] de cada fragmento, en orden.
+    """
+    cantidad_filas = fin - inicio
+    fragmentos = []
+    for i in range(cantidad_fragmentos):
+        desde = inicio + cantidad_filas * i // cantidad_fragmentos
+        hasta = inicio + cantidad_filas * (i + 1) // cantidad_fragmentos
+        if hasta > desde:
+            fragmentos += [[desde, hasta]]
+    return fragmentos
+
+def combinar_agregados(parciales: list) -> AgregadosIncrementales:
+    """
+    Combina (reduce) los agregados parciales de fragmentos contiguos, en el orden de los fragmentos.
+
+    Args:
+        parciales (list): AgregadosIncrementales de cada fragmento, ordenados por posición.
+
+    Comportamiento:
+    - Suma cada parcial con `AgregadosIncrementales.combinar`. Recorrer los fragmentos en orden hace que
+      cada clave quede en su posición de primera aparición global, igual que en la pasada secuencial.
+    - Todas las sumas son enteras (acciones, tenencias y montos en centavos), así que el resultado es
+      idéntico al de la pasada secuencial, cualquiera sea la cantidad de fragmentos.
+    - Deriva la mayor tenencia por usuario al final con `completar_mayores`.
+
+    Retorno:
+    - (AgregadosIncrementales): Agregados del rango completo.
+    """
+    combinados = AgregadosIncrementales()
+    for parcial in parciales:
+        combinados.combinar(parcial)
+    return completar_mayores(combinados)
+
+def _crear_segmentos(almacen: AlmacenTransacciones, inicio: int, fin: int) -> dict:
+    """
+    Copia el rango de filas de cada columna a un segmento de memoria compartida.
+
+    Retorno:
+    - (dict): columna -> [SharedMemory, código de tipo, cantidad de filas]. Los índices del rango
+      quedan desplazados: la fila `inicio` es la posición 0 del segmento.
+    """
+    segmentos = {}
+    try:
+        for columna in COLUMNAS_COMPARTIDAS:
+            vista = almacen.vista(columna)
+            tramo = vista[inicio:fin]
+            segmento = shared_memory.SharedMemory(create=True, size=max(tramo.nbytes, 1))
+            segmentos[columna] = [segmento, vista.format, fin - inicio]
+            segmento.buf[:tramo.nbytes] = tramo.cast("B")
+            tramo.release()
+            vista.release()
+    except BaseException:
+        _liberar_segmentos(segmentos)
+        raise
+    return segmentos
+
+def _liberar_segmentos(segmentos: dict) -> None:
+    """
+    Cierra y elimina los segmentos de memoria compartida creados por `_crear_segmentos`.
+
+    Retorno:
+    None
+    """
+    for segmento, _, _ in segmentos.values():
+        segmento.close()
+        segmento.unlink()
+    return None
+
+def calcular_agregados_paralelo(almacen: AlmacenTransacciones, necesarios: list, procesos: int = None, inicio: int = 0, fin: int = None) -> AgregadosIncrementales:
+    """
+    Calcula los agregados pedidos repartiendo las filas entre varios procesos (map-reduce).
+
+    Args:
+        almacen (AlmacenTransacciones): Almacén de origen.
+        necesarios (list): Agregados a calcular (ver `reporte.DEPENDENCIAS_CONSULTAS`).
+        procesos (int, opcional): Cantidad de procesos trabajadores. Por defecto, `os.cpu_count()`.
+        inicio (int, opcional): Primera fila del rango (incluida).
+        fin (int, opcional): Última fila del rango (excluida). Por defecto, el final del almacén.
+
+    Comportamiento:
+    - Copia una sola vez las columnas del rango a memoria compartida; los trabajadores las leen sin serializarlas.
+    - Cada trabajador recorre un fragmento contiguo con `reporte.acumular_rango` (map) y devuelve sólo
+      los diccionarios parciales, cuyo tamaño depende de usuarios y empresas distintos, no de las filas.
+    - Los parciales se combinan en el orden de los fragmentos con `combinar_agregados` (reduce).
+    - El sketch de cuantiles por transacción no se reparte: sus compactaciones dependen del orden de los
+      valores, así que el proceso principal lo alimenta con la columna de totales del rango, en orden,
+      y queda idéntico al de la pasada secuencial.
+    - Con un solo proceso, o con menos de `FILAS_MINIMAS_POR_FRAGMENTO` filas por proceso,
+      calcula en el proceso actual: arrancar procesos no compensaría.
+
+    Retorno:
+    - (AgregadosIncrementales): Agregados del rango.
+    """
+    if fin is None:
+        fin = len(almacen)
+    if procesos is None:
+        procesos = os.cpu_count() or 1
+    procesos = min(procesos, (fin - inicio) // FILAS_MINIMAS_POR_FRAGMENTO)
+    if procesos <= 1:
+        return calcular_agregados(almacen, necesarios, inicio, fin)
+
+    necesarios_trabajadores = [nombre for nombre in necesarios if nombre != "cuantiles_transacciones"]
+    segmentos = _crear_segmentos(almacen, inicio, fin)
+    try:
+        nombres_segmentos = {}
+        for columna, (segmento, codigo_tipo, cantidad_filas) in segmentos.items():
+            nombres_segmentos[columna] = [segmento.name, codigo_tipo, cantidad_filas]
+        fragmentos = dividir_en_fragmentos(0, fin - inicio, procesos)
+        with ProcessPoolExecutor(max_workers=procesos, initializer=_adjuntar_columnas, initargs=(nombres_segmentos,)) as ejecutor:
+            futuros = []
+            for desde, hasta in fragmentos:
+                futuros += [ejecutor.submit(_acumular_fragmento, desde, hasta, necesarios_trabajadores, len(almacen.nombres_usuarios), len(almacen.nombres_empresas))]
+            parciales = []
+            for futuro in futuros:
+                parciales += [futuro.result()]
+    finally:
+        _liberar_segmentos(segmentos)
+    combinados = combinar_agregados(parciales)
+    if "cuantiles_transacciones" in necesarios:
+        vista = almacen.vista("totales")
+        tramo = vista[inicio:fin]
+        combinados.cuantiles_transacciones.extender(tramo)
+        tramo.release()
+        vista.release()
+    return combinados
+
+def generar_reporte_paralelo(almacen: AlmacenTransacciones, numeros_consultas: list = None, procesos: int = None, inicio: int = 0, fin: int = None, cantidad_ranking: int = CANTIDAD_RANKING, percentil: int = PERCENTIL_POR_DEFECTO) -> dict:
+    """
+    Variante multiproceso de `reporte.generar_reporte` para conjuntos grandes de transacciones.
+
+    Args:
+        almacen (AlmacenTransacciones): Almacén de origen.
+        numeros_consultas (list, opcional): Números de consulta de `CONSULTAS`. Por defecto, todas.
+        procesos (int, opcional): Cantidad de procesos trabajadores. Por defecto, `os.cpu_count()`.
+        inicio (int, opcional): Primera fila del rango a reportar.
+        fin (int, opcional): Fila final (excluida) del rango. Por defecto, el final del almacén.
+        cantidad_ranking (int, opcional): Posiciones (N) de las consultas de ranking.
+        percentil (int, opcional): Percentil de corte de las consultas de percentil.
+
+    Comportamiento:
+    - Calcula los agregados necesarios con `calcular_agregados_paralelo` y deriva cada resultado
+      con las mismas funciones de `consultas`, con el mismo orden de salida que la versión secuencial.
+
+    Retorno:
+    - (dict): nombre de consulta -> resultado, en el orden pedido.
+    """
+    if numeros_consultas is None:
+        numeros_consultas = list(CONSULTAS)
+    if fin is None:
+        fin = len(almacen)
+    necesarios = agregados_necesarios(nombres_de_consultas(numeros_consultas))
+    acumulados = calcular_agregados_paralelo(almacen, necesarios, procesos, inicio, fin)
+    return derivar_resultados(almacen, acumulados, numeros_consultas, fin - inicio, cantidad_ranking, percentil)
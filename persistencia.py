@@ -0,0 +1,416 @@
+import json
+import mmap
+import os
+import struct
+import time
+from almacen import AlmacenTransacciones
+from acumulados import AgregadosIncrementales
+from cuantiles import SketchCuantiles
+from ventanas import VentanasAgregados, ANCHO_BALDE, CANTIDAD_BALDES
+from moneda import a_centavos
+
+MAGIA_BITACORA = b"UTNTX\x00"
+VERSION_BITACORA = 3
+VERSION_BITACORA_SIN_INSTANTES = 2
+VERSION_BITACORA_USD = 1
+ENCABEZADO = struct.Struct("<6sHI4x")
+REGISTRO = struct.Struct("<iiiiqqd")
+REGISTRO_ANTERIOR = struct.Struct("<iiiiqq")
+UNIDAD_MONTOS = "centavos"
+REGISTROS_POR_COMMIT = 4096
+SEGUNDOS_POR_COMMIT = 0.5
+REGISTROS_POR_INSTANTANEA = 1000000
+
+class BitacoraTransacciones:
+    """
+    Bitácora binaria de sólo agregado con registros de ancho fijo.
+
+    Formato:
+    - Encabezado de 16 bytes: magia "UTNTX", versión y tamaño de registro.
+    - Registros de 40 bytes (little-endian): id de usuario (i32), id de empresa (i32), cantidad (i32),
+      reservado (i32), precio al momento de la transacción (i64) y total invertido (i64), en centavos,
+      e instante de la transacción (f64, segundos desde la época Unix).
+      Las versiones anteriores usaban registros de 32 bytes sin instante (la 1, además, con precio y total
+      como USD en f64); al restaurarlas se convierten.
+    - Archivo `<ruta>.nombres`: una línea "u<TAB>nombre" o "e<TAB>nombre" por cada id nuevo, en orden de id.
+
+    Comportamiento:
+    - Los registros se acumulan en memoria y se escriben con un único write + fsync cuando se juntan
+      `registros_por_commit` registros o pasan `segundos_por_commit` segundos (commit agrupado).
+    - El plazo se revisa al agregar cada registro y en `confirmar_si_vencido`: si dejan de llegar registros,
+      los pendientes esperan hasta que alguien llame a `confirmar_si_vencido` (el servicio de ingesta lo hace
+      mientras está ocioso), a `confirmar` o a `cerrar`.
+    - Los nombres nuevos se escriben y sincronizan antes que los registros que los usan.
+    """
+
+    def __init__(self, ruta: str, registros_por_commit: int = REGISTROS_POR_COMMIT, segundos_por_commit: float = SEGUNDOS_POR_COMMIT) -> None:
+        self.ruta = ruta
+        self.registros_por_commit = registros_por_commit
+        self.segundos_por_commit = segundos_por_commit
+        self.pendientes = bytearray()
+        self.cantidad_pendientes = 0
+        self.nombres_pendientes = []
+        self.ultimo_commit = time.monotonic()
+        es_nueva = not os.path.exists(ruta) or os.path.getsize(ruta) == 0
+        self.archivo = open(ruta, "ab")
+        if es_nueva:
+            self.archivo.write(ENCABEZADO.pack(MAGIA_BITACORA, VERSION_BITACORA, REGISTRO.size))
+            self.archivo.flush()
+            os.fsync(self.archivo.fileno())
+        else:
+            _truncar_registro_incompleto(ruta, self.archivo)
+        self.archivo_nombres = open(ruta + ".nombres", "a", encoding="utf-8")
+
+    def registrar_nombre(self, tipo: str, nombre: str) -> None:
+        """
+        Anota un nombre recién codificado ("u" para usuarios, "e" para empresas).
+
+        Retorno:
+        None
+        """
+        self.nombres_pendientes += [f"{tipo}\t{nombre}\n"]
+        return None
+
+    def agregar(self, id_usuario: int, id_empresa: int, cantidad: int, precio: int, total: int, instante: float) -> None:
+        """
+        Agrega un registro a la bitácora, confirmándolo en disco según la política de commit agrupado.
+
+        Retorno:
+        None
+        """
+        self.pendientes += REGISTRO.pack(id_usuario, id_empresa, cantidad, 0, precio, total, instante)
+        self.cantidad_pendientes += 1
+        if self.cantidad_pendientes >= self.registros_por_commit or time.monotonic() - self.ultimo_commit >= self.segundos_por_commit:
+            self.confirmar()
+        return None
+
+    def confirmar_si_vencido(self) -> None:
+        """
+        Confirma los registros pendientes si ya pasaron `segundos_por_commit` segundos desde el último commit.
+
+        Comportamiento:
+        - Es el gancho para los momentos sin escrituras: sin él, el plazo sólo se revisa al llegar el registro siguiente.
+
+        Retorno:
+        None
+        """
+        if (self.cantidad_pendientes or self.nombres_pendientes) and time.monotonic() - self.ultimo_commit >= self.segundos_por_commit:
+            self.confirmar()
+        return None
+
+    def confirmar(self) -> None:
+        """
+        Escribe y sincroniza (fsync) los nombres y registros pendientes.
+
+        Retorno:
+        None
+        """
+        if self.nombres_pendientes:
+            self.archivo_nombres.write("".join(self.nombres_pendientes))
+            self.archivo_nombres.flush()
+            os.fsync(self.archivo_nombres.fileno())
+            self.nombres_pendientes = []
+        if self.pendientes:
+            self.archivo.write(self.pendientes)
+            self.archivo.flush()
+            os.fsync(self.archivo.fileno())
+            self.pendientes = bytearray()
+            self.cantidad_pendientes = 0
+        self.ultimo_commit = time.monotonic()
+        return None
+
+    def cerrar(self) -> None:
+        """
+        Confirma lo pendiente y cierra los archivos.
+
+        Retorno:
+        None
+        """
+        self.confirmar()
+        self.archivo.close()
+        self.archivo_nombres.close()
+        return None
+
+def _truncar_registro_incompleto(ruta: str, archivo) -> None:
+    """
+    Descarta un registro final escrito a medias (por ejemplo, tras un corte de energía).
+
+    Retorno:
+    None
+    """
+    tamano = os.path.getsize(ruta)
+    sobrante = (tamano - ENCABEZADO.size) % REGISTRO.size
+    if sobrante:
+        archivo.truncate(tamano - sobrante)
+    return None
+
+def _ruta_instantanea(ruta: str) -> str:
+    return ruta + ".instantanea.json"
+
+def guardar_instantanea(ruta: str, agregados: AgregadosIncrementales, registros: int, ventanas: VentanasAgregados = None) -> None:
+    """
+    Guarda una instantánea de los agregados que cubre los primeros `registros` registros de la bitácora.
+
+    Args:
+        ruta (str): Ruta de la bitácora.
+        agregados (AgregadosIncrementales): Agregados a guardar.
+        registros (int): Cantidad de registros de la bitácora incluidos en los agregados.
+        ventanas (VentanasAgregados, opcional): Anillo de ventanas de tiempo con esos mismos registros.
+
+    Comportamiento:
+    - Escribe un JSON temporal, lo sincroniza y lo reemplaza atómicamente (`os.replace`).
+
+    Retorno:
+    None
+    """
+    contenido = {
+        "registros": registros,
+        "unidad": UNIDAD_MONTOS,
+        "acciones_por_usuario": list(agregados.acciones_por_usuario.items()),
+        "inversion_por_usuario": list(agregados.inversion_por_usuario.items()),
+        "acciones_por_empresa": list(agregados.acciones_por_empresa.items()),
+        "inversion_por_empresa": list(agregados.inversion_por_empresa.items()),
+        "tenencias": [[par[0], par[1], tenencia] for par, tenencia in agregados.tenencias.items()],
+        "mayor_por_usuario": [[id_usuario, mayor[0], mayor[1]] for id_usuario, mayor in agregados.mayor_por_usuario.items()],
+        "inversion_total": agregados.inversion_total,
+        "total_acciones": agregados.total_acciones,
+        "cuantiles_transacciones": agregados.cuantiles_transacciones.a_diccionario(),
+    }
+    if ventanas is not None:
+        contenido["ventanas"] = ventanas.a_diccionario()
+    ruta_temporal = _ruta_instantanea(ruta) + ".tmp"
+    with open(ruta_temporal, "w", encoding="utf-8") as archivo:
+        json.dump(contenido, archivo)
+        archivo.flush()
+        os.fsync(archivo.fileno())
+    os.replace(ruta_temporal, _ruta_instantanea(ruta))
+    return None
+
+def cargar_instantanea(ruta: str) -> list:
+    """
+    Lee la instantánea de agregados de una bitácora, si existe.
+
+    Retorno:
+    - (list): [agregados, registros cubiertos, anillo de ventanas], o [None, 0, None] si no hay instantánea
+      legible o es de un formato anterior (sin sketch de cuantiles); en ese caso los agregados se recalculan
+      desde la bitácora. El anillo es None si la instantánea no lo guardó o tiene otras dimensiones.
+    """
+    try:
+        with open(_ruta_instantanea(ruta), "r", encoding="utf-8") as archivo:
+            contenido = json.load(archivo)
+    except (OSError, ValueError):
+        return [None, 0, None]
+    if contenido.get("unidad") != UNIDAD_MONTOS or "cuantiles_transacciones" not in contenido:
+        return [None, 0, None]
+    agregados = AgregadosIncrementales()
+    for nombre in ("acciones_por_usuario", "inversion_por_usuario", "acciones_por_empresa", "inversion_por_empresa"):
+        destino = getattr(agregados, nombre)
+        for clave, valor in contenido[nombre]:
+            destino[clave] = valor
+    for id_usuario, id_empresa, tenencia in contenido["tenencias"]:
+        agregados.tenencias[(id_usuario, id_empresa)] = tenencia
+        agregados.orden_tenencias[(id_usuario, id_empresa)] = len(agregados.orden_tenencias)
+    for id_usuario, id_empresa, cantidad in contenido["mayor_por_usuario"]:
+        agregados.mayor_por_usuario[id_usuario] = [id_empresa, cantidad]
+    agregados.inversion_total = contenido["inversion_total"]
+    agregados.total_acciones = contenido["total_acciones"]
+    agregados.cuantiles_transacciones = SketchCuantiles.desde_diccionario(contenido["cuantiles_transacciones"])
+    ventanas = None
+    guardadas = contenido.get("ventanas")
+    if guardadas is not None and guardadas["ancho_balde"] == ANCHO_BALDE and guardadas["cantidad_baldes"] == CANTIDAD_BALDES:
+        ventanas = VentanasAgregados.desde_diccionario(guardadas)
+    return [agregados, contenido["registros"], ventanas]
+
+class AlmacenPersistente(AlmacenTransacciones):
+    """
+    Almacén de transacciones que además registra cada transacción en una bitácora en disco.
+
+    Args:
+        ruta (str): Ruta de la bitácora. Si existe, el almacén se reconstruye a partir de ella.
+
+    Comportamiento:
+    - Al iniciar mapea la bitácora en memoria (mmap) y copia cada columna con una única copia
+      estriada a nivel C, sin decodificar registro por registro.
+    - Los agregados y el anillo de ventanas de tiempo se toman de la última instantánea y sólo se
+      reaplican los registros posteriores a ella.
+    - Cada `REGISTROS_POR_INSTANTANEA` transacciones (y al cerrar) guarda una nueva instantánea.
+    """
+
+    def __init__(self, ruta: str, registros_por_commit: int = REGISTROS_POR_COMMIT, registros_por_instantanea: int = REGISTROS_POR_INSTANTANEA) -> None:
+        super().__init__()
+        self.ruta = ruta
+        self.registros_por_instantanea = registros_por_instantanea
+        self.bitacora = None
+        if os.path.exists(ruta) and os.path.getsize(ruta) > 0:
+            self._restaurar()
+        self.registros_instantanea = len(self)
+        self.bitacora = BitacoraTransacciones(ruta, registros_por_commit)
+
+    def _restaurar(self) -> None:
+        """
+        Reconstruye columnas, diccionarios y agregados desde la bitácora y su instantánea.
+
+        Comportamiento:
+        - Una bitácora de la versión 1 (montos en USD) se convierte a centavos y se reescribe con el
+          formato actual; su instantánea, que también estaba en USD, se descarta y los agregados se recalculan.
+        - Una bitácora de la versión 1 o 2 no tiene instantes: sus transacciones quedan con instante 0
+          (fuera de toda ventana de tiempo) y se reescribe con el formato actual.
+        - El anillo de ventanas de tiempo se restaura de la instantánea y se le suman los registros posteriores.
+          Si la instantánea no lo guardó, se reconstruye con las filas recientes de la columna de instantes
+          (`VentanasAgregados.desde_columnas`), sin recorrer las más viejas.
+
+        Retorno:
+        None
+        """
+        if os.path.exists(self.ruta + ".nombres"):
+            with open(self.ruta + ".nombres", "r", encoding="utf-8") as archivo_nombres:
+                for linea in archivo_nombres:
+                    if not linea.endswith("\n"):
+                        break
+                    tipo, nombre = linea[:-1].split("\t", 1)
+                    if tipo == "u":
+                        self.codificar_usuario(nombre)
+                    else:
+                        self.codificar_empresa(nombre)
+
+        with open(self.ruta, "rb") as archivo:
+            with mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+                magia, version, tamano_registro = ENCABEZADO.unpack_from(mapa, 0)
+                formatos = {VERSION_BITACORA: REGISTRO.size, VERSION_BITACORA_SIN_INSTANTES: REGISTRO_ANTERIOR.size, VERSION_BITACORA_USD: REGISTRO_ANTERIOR.size}
+                if magia != MAGIA_BITACORA or formatos.get(version) != tamano_registro:
+                    raise ValueError(f"La bitácora {self.ruta} no tiene un formato compatible.")
+                enteros_por_registro = tamano_registro // 4
+                montos_por_registro = tamano_registro // 8
+                cantidad_registros = (len(mapa) - ENCABEZADO.size) // tamano_registro
+                datos = memoryview(mapa)[ENCABEZADO.size:ENCABEZADO.size + cantidad_registros * tamano_registro]
+                enteros = datos.cast("i")
+                montos = datos.cast("d" if version == VERSION_BITACORA_USD else "q")
+                self.usuarios.frombytes(enteros[0::enteros_por_registro].tobytes())
+                self.empresas.frombytes(enteros[1::enteros_por_registro].tobytes())
+                self.cantidades.frombytes(enteros[2::enteros_por_registro].tobytes())
+                if version == VERSION_BITACORA_USD:
+                    for i in range(cantidad_registros):
+                        precio_unitario = a_centavos(montos[i * montos_por_registro + 2])
+                        self.precios.append(precio_unitario)
+                        self.totales.append(precio_unitario * self.cantidades[i])
+                else:
+                    self.precios.frombytes(montos[2::montos_por_registro].tobytes())
+                    self.totales.frombytes(montos[3::montos_por_registro].tobytes())
+                if version == VERSION_BITACORA:
+                    self.instantes.frombytes(montos[4::montos_por_registro].tobytes())
+                else:
+                    self.instantes.frombytes(bytes(8 * cantidad_registros))
+                enteros.release()
+                montos.release()
+                datos.release()
+        if version != VERSION_BITACORA:
+            self._reescribir_bitacora()
+
+        agregados, registros_cubiertos, ventanas = cargar_instantanea(self.ruta)
+        if agregados is None or registros_cubiertos > len(self):
+            self.acumulados = AgregadosIncrementales.desde_columnas(self.usuarios, self.empresas, self.cantidades, self.totales)
+            ventanas = None
+        else:
+            for i in range(registros_cubiertos, len(self)):
+                agregados.registrar(self.usuarios[i], self.empresas[i], self.cantidades[i], self.totales[i])
+            self.acumulados = agregados
+        if ventanas is None:
+            self.ventanas = VentanasAgregados.desde_columnas(self.instantes, self.usuarios, self.empresas, self.cantidades, self.totales)
+        else:
+            for i in range(registros_cubiertos, len(self)):
+                ventanas.registrar(self.instantes[i], self.usuarios[i], self.empresas[i], self.cantidades[i], self.totales[i])
+            self.ventanas = ventanas
+        self.version += 1
+        return None
+
+    def _reescribir_bitacora(self) -> None:
+        """
+        Reescribe la bitácora con el formato actual (montos en centavos e instantes) a partir de las columnas restauradas.
+
+        Comportamiento:
+        - Escribe un archivo temporal, lo sincroniza y lo reemplaza atómicamente (`os.replace`): si se
+          interrumpe, la bitácora original queda intacta y se vuelve a convertir en el próximo inicio.
+
+        Retorno:
+        None
+        """
+        ruta_temporal = self.ruta + ".tmp"
+        with open(ruta_temporal, "wb") as archivo:
+            archivo.write(ENCABEZADO.pack(MAGIA_BITACORA, VERSION_BITACORA, REGISTRO.size))
+            for i in range(len(self)):
+                archivo.write(REGISTRO.pack(self.usuarios[i], self.empresas[i], self.cantidades[i], 0, self.precios[i], self.totales[i], self.instantes[i]))
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        os.replace(ruta_temporal, self.ruta)
+        return None
+
+    def codificar_usuario(self, usuario: str) -> int:
+        cantidad_previa = len(self.nombres_usuarios)
+        id_usuario = super().codificar_usuario(usuario)
+        if len(self.nombres_usuarios) > cantidad_previa and self.bitacora is not None:
+            self.bitacora.registrar_nombre("u", usuario)
+        return id_usuario
+
+    def codificar_empresa(self, empresa: str) -> int:
+        cantidad_previa = len(self.nombres_empresas)
+        id_empresa = super().codificar_empresa(empresa)
+        if len(self.nombres_empresas) > cantidad_previa and self.bitacora is not None:
+            self.bitacora.registrar_nombre("e", empresa)
+        return id_empresa
+
+    def agregar(self, usuario: str, empresa: str, cantidad: int, instante: float = None) -> None:
+        super().agregar(usuario, empresa, cantidad, instante)
+        self._registrar_desde(len(self) - 1)
+        return None
+
+    def agregar_lote(self, usuarios: list, empresas: list, cantidades: list, instantes: list = None) -> None:
+        inicio = len(self)
+        super().agregar_lote(usuarios, empresas, cantidades, instantes)
+        self._registrar_desde(inicio)
+        return None
+
+    def confirmar_si_vencido(self) -> None:
+        """
+        Confirma la bitácora si venció el plazo del commit agrupado (ver `BitacoraTransacciones.confirmar_si_vencido`).
+
+        Retorno:
+        None
+        """
+        self.bitacora.confirmar_si_vencido()
+        return None
+
+    def _registrar_desde(self, inicio: int) -> None:
+        """
+        Escribe en la bitácora las filas del almacén a partir de `inicio` y guarda una instantánea si corresponde.
+
+        Retorno:
+        None
+        """
+        for i in range(inicio, len(self)):
+            self.bitacora.agregar(self.usuarios[i], self.empresas[i], self.cantidades[i], self.precios[i], self.totales[i], self.instantes[i])
+        if len(self) - self.registros_instantanea >= self.registros_por_instantanea:
+            self.guardar_instantanea()
+        return None
+
+    def guardar_instantanea(self) -> None:
+        """
+        Confirma la bitácora y guarda una instantánea de los agregados y del anillo de ventanas actuales.
+
+        Retorno:
+        None
+        """
+        self.bitacora.confirmar()
+        guardar_instantanea(self.ruta, self.acumulados, len(self), self.ventanas)
+        self.registros_instantanea = len(self)
+        return None
+
+    def cerrar(self) -> None:
+        """
+        Guarda una instantánea final y cierra la bitácora.
+
+        Retorno:
+        None
+        """
+        self.guardar_instantanea()
+        self.bitacora.cerrar()
+        return None
@@ -0,0 +1,194 @@
+import csv
+import io
+import json
+import sys
+from collections import deque
+
+FORMATOS_SALIDA = ("tabla", "csv", "jsonl")
+TAMANO_BUFFER = 1 << 16
+FILAS_POR_LOTE = 2048
+ANCHO_SEPARADOR = 70
+
+COLUMNAS_TRANSACCIONES = [
+    ["usuario", "Usuario", 20, "{}"],
+    ["accion", "Acción", 10, "{}"],
+    ["precio", "Precio/U", 12, "${:.2f}"],
+    ["cantidad", "Cantidad", 10, "{}"],
+    ["total", "Total USD", 12, "${:.2f}"],
+]
+
+class SalidaBuffer:
+    """
+    Acumula texto en memoria y lo escribe en bloques grandes sobre cualquier destino tipo archivo.
+
+    Args:
+        destino (file-like, opcional): Objeto con método `write` (archivo, socket envuelto, StringIO...).
+            Por defecto, la salida estándar vigente al crear el buffer.
+        tamano_buffer (int, opcional): Cantidad de caracteres acumulados a partir de la cual se escribe.
+
+    Comportamiento:
+    - Cada `escribir` sólo agrega el texto a una lista; cuando se supera `tamano_buffer` se hace una única
+      llamada a `destino.write` con todo lo acumulado, en lugar de una por línea como `print`.
+    - Se puede usar como administrador de contexto: al salir se vacía el buffer.
+    """
+
+    def __init__(self, destino=None, tamano_buffer: int = TAMANO_BUFFER) -> None:
+        self.destino = destino if destino is not None else sys.stdout
+        self.tamano_buffer = tamano_buffer
+        self.partes = []
+        self.caracteres = 0
+
+    def escribir(self, texto: str) -> None:
+        """
+        Agrega texto al buffer, escribiéndolo en el destino si se superó el tamaño del buffer.
+
+        Retorno:
+        None
+        """
+        self.partes.append(texto)
+        self.caracteres += len(texto)
+        if self.caracteres >= self.tamano_buffer:
+            self.vaciar()
+        return None
+
+    def escribir_lineas(self, lineas: list) -> None:
+        """
+        Agrega varias líneas de una vez (cada una termina en salto de línea).
+
+        Retorno:
+        None
+        """
+        if lineas:
+            self.escribir("\n".join(lineas) + "\n")
+        return None
+
+    def vaciar(self) -> None:
+        """
+        Escribe en el destino todo lo acumulado con una sola llamada a `write`.
+
+        Retorno:
+        None
+        """
+        if self.partes:
+            self.destino.write("".join(self.partes))
+            self.partes = []
+            self.caracteres = 0
+        return None
+
+    def __enter__(self) -> "SalidaBuffer":
+        return self
+
+    def __exit__(self, tipo_error, error, traza) -> None:
+        self.vaciar()
+        return None
+
+def mostrar_lineas(lineas: list, destino=None) -> None:
+    """
+    Muestra una lista de líneas con una única escritura, en lugar de un `print` por línea.
+
+    Args:
+        lineas (list): Líneas de texto, sin salto de línea final.
+        destino (file-like, opcional): Destino de la escritura. Por defecto, la salida estándar.
+
+    Retorno:
+    None
+    """
+    with SalidaBuffer(destino) as salida:
+        salida.escribir_lineas(lineas)
+    return None
+
+def _formateador_tabla(columnas: list):
+    """
+    Prepara la función que convierte una fila en una línea de la tabla de ancho fijo.
+
+    Retorno:
+    - (function): fila (list) -> línea (str).
+    """
+    plantilla_linea = " ".join("{:<%d}" % columnas[i][2] for i in range(len(columnas)))
+    plantillas_valor = [columnas[i][3] for i in range(len(columnas))]
+    def formatear(fila: list) -> str:
+        return plantilla_linea.format(*[plantillas_valor[i].format(fila[i]) for i in range(len(fila))])
+    return formatear
+
+def _formatear_lote(filas: list, columnas: list, formato: str, formatear_tabla) -> str:
+    """
+    Formatea un lote de filas en un único bloque de texto.
+
+    Retorno:
+    - (str): Texto del lote, con un salto de línea al final de cada fila.
+    """
+    if formato == "tabla":
+        return "".join([formatear_tabla(fila) + "\n" for fila in filas])
+    if formato == "csv":
+        bloque = io.StringIO()
+        csv.writer(bloque, lineterminator="\n").writerows(filas)
+        return bloque.getvalue()
+    claves = [columnas[i][0] for i in range(len(columnas))]
+    return "".join([json.dumps(dict(zip(claves, fila)), ensure_ascii=False) + "\n" for fila in filas])
+
+def renderizar_filas(filas, columnas: list, formato: str = "tabla", destino=None, cabeza: int = None, cola: int = None, titulo: str = None) -> int:
+    """
+    Escribe un listado de filas en lotes, como tabla de ancho fijo, CSV o JSON Lines.
+
+    Args:
+        filas (iterable): Filas a escribir (listas); puede ser un generador, se consume una sola vez.
+        columnas (list): Especificación de cada columna: [clave, título, ancho, plantilla de valor].
+            La clave se usa en el encabezado CSV y en JSON Lines; título, ancho y plantilla en la tabla.
+        formato (str, opcional): "tabla" (por defecto), "csv" o "jsonl".
+        destino (file-like, opcional): Destino de la escritura. Por defecto, la salida estándar.
+        cabeza (int, opcional): Si se indica (o `cola`), sólo escribe las primeras `cabeza` filas...
+        cola (int, opcional): ...y las últimas `cola` filas, indicando en la tabla cuántas se omitieron.
+        titulo (str, opcional): Línea de título previa a la tabla (sólo en formato tabla).
+
+    Comportamiento:
+    - Formatea las filas en lotes de `FILAS_POR_LOTE` y escribe con `SalidaBuffer` en bloques grandes.
+    - En formato tabla agrega título, encabezado y líneas separadoras; en CSV, una fila de encabezado
+      con las claves. Los valores en CSV y JSON Lines se escriben sin redondear.
+    - Con vista cabeza/cola la memoria queda acotada por `cola`: las filas del medio se recorren sin guardarse.
+
+    Retorno:
+    - (int): Cantidad total de filas recorridas (escritas u omitidas).
+    """
+    if formato not in FORMATOS_SALIDA:
+        raise ValueError(f"Formato de salida desconocido: {formato}")
+    formatear_tabla = _formateador_tabla(columnas)
+    truncar = cabeza is not None or cola is not None
+    if cabeza is None:
+        cabeza = 0
+    ultimas = deque(maxlen=cola or 0)
+
+    with SalidaBuffer(destino) as salida:
+        if formato == "tabla":
+            encabezado = []
+            if titulo is not None:
+                encabezado += [titulo]
+            encabezado += [" ".join(f"{columnas[i][1]:<{columnas[i][2]}}" for i in range(len(columnas)))]
+            encabezado += ["-" * ANCHO_SEPARADOR]
+            salida.escribir_lineas(encabezado)
+        elif formato == "csv":
+            salida.escribir(_formatear_lote([[columnas[i][0] for i in range(len(columnas))]], columnas, "csv", None))
+
+        cantidad_filas = 0
+        lote = []
+        for fila in filas:
+            cantidad_filas += 1
+            if truncar and cantidad_filas > cabeza:
+                if ultimas.maxlen:
+                    ultimas.append(fila)
+                continue
+            lote.append(fila)
+            if len(lote) == FILAS_POR_LOTE:
+                salida.escribir(_formatear_lote(lote, columnas, formato, formatear_tabla))
+                lote = []
+        if lote:
+            salida.escribir(_formatear_lote(lote, columnas, formato, formatear_tabla))
+
+        if truncar:
+            omitidas = cantidad_filas - cabeza - len(ultimas)
+            if omitidas > 0 and formato == "tabla":
+                salida.escribir_lineas([f"... ({omitidas} filas omitidas) ..."])
+            if ultimas:
+                salida.escribir(_formatear_lote(list(ultimas), columnas, formato, formatear_tabla))
+        if formato == "tabla":
+            salida.escribir_lineas(["-" * ANCHO_SEPARADOR])
+    return cantidad_filas
@@ -1,168 +1,285 @@
-from normalizacion import normalizar_nombre_usuario, normalizar_empresas
-from utilidades import reconocer_numero
-from datos import vip_normalizados, empresas_normalizadas, precios
-
-def registrar_usuario():
-    """
-    Solicita el ingreso de un nombre de usuario y valida que esté en la lista de usuarios VIP.
-
-    Comportamiento:
-    - Solicita un nombre de usuario al usuario.
-    - Verifica que el campo ingresado no esté vacío.
-    - Normaliza el nombre para que tenga la primera letra en mayúscula y el resto en minúsculas.
-    - Busca el usuario en la lista de usuarios VIP.
-    - Si el usuario está en la lista, lo valida y retorna; de lo contrario, muestra un mensaje de error y vuelve a solicitar el ingreso.
-
-    Retorno:
-    - (str): Nombre del usuario validado y normalizado.
-    """
-    usuario_validado = ""
-    
-    usuario_ok = False
-    while not usuario_ok:
-        usuario_ingresado = input("Ingrese nombre del usuario: ")
-        if not usuario_ingresado:
-            print("Error: El nombre de usuario no puede estar vacío.")
-            continue
-        usuario_normalizado = normalizar_nombre_usuario(usuario_ingresado)
-        esta_en_la_lista = False
-        for i in range(len(vip_normalizados)):
-            if vip_normalizados[i] == usuario_normalizado:
-                esta_en_la_lista = True
-                break
-        if esta_en_la_lista:
-            usuario_validado = usuario_normalizado
-            usuario_ok = True
-        else:
-            print(f"Error: Usuario '{usuario_ingresado}' no encontrado en la lista de usuarios VIP.")
-
-    print(f"  Usuario: {usuario_validado}")    
-    return usuario_validado
-
-def registrar_empresa():
-    """
-    Solicita el ingreso del nombre de una acción y valida que sea una opción permitida.
-
-    Comportamiento:
-    - Pide al usuario que ingrese el nombre de una acción.
-    - Verifica que el campo ingresado no esté vacío.
-    - Normaliza el nombre de la acción (todo en mayúsculas).
-    - Busca la acción en la lista de empresas permitidas.
-    - Si la acción está en la lista, la valida y la retorna; de lo contrario, muestra un mensaje de error y vuelve a solicitar el ingreso.
-
-    Retorno:
-    - (str): Nombre de la acción validada y normalizada.
-    """
-    empresa_validada = ""
-
-    empresa_ok = False
-    while not empresa_ok:
-        accion_ingresada = input(f"Ingrese nombre de la acción (Apple, Tesla, Nvidia): ")
-        if not accion_ingresada:
-            print("Error: El nombre de la acción no puede estar vacío.")
-            continue
-        accion_ingresada_normalizada = normalizar_empresas(accion_ingresada)
-        esta_en_la_lista = False
-        for i in range(len(empresas_normalizadas)):
-            if empresas_normalizadas[i] == accion_ingresada_normalizada:
-                esta_en_la_lista = True
-                break
-        if esta_en_la_lista:
-            empresa_validada = accion_ingresada_normalizada
-            empresa_ok = True
-        else:
-            print(f"Error: Acción '{accion_ingresada}' no válida. Elija entre Apple, Tesla o Nvidia.")
-    print(f"  Acción: {empresa_validada}")
-    return empresa_validada
-
-def registrar_cantidad():
-    """
-    Solicita al usuario una cantidad de acciones a comprar y valida el ingreso.
-
-    Comportamiento:
-    - Pide al usuario que ingrese un número de acciones dentro del rango permitido (0 - 500).
-    - Verifica que el campo no esté vacío.
-    - Recorre cada carácter de la entrada para confirmar que solo contiene números.
-    - Convierte la entrada en un entero y valida que esté dentro del rango permitido.
-    - Si el número es válido, lo retorna; de lo contrario, muestra mensajes de error y solicita nuevamente el ingreso.
-
-    Retorno:
-    - (int): Cantidad de acciones validada.
-    """    
-    cantidad_ok = False
-    min_cantidad = 0
-    max_cantidad = 500
-    while not cantidad_ok:
-        cantidad_ingresada = input(f"Ingrese cantidad de acciones que desea comprar ({min_cantidad}-{max_cantidad}): ")
-        formato_valido = True
-        if not cantidad_ingresada:
-            print("Error: La cantidad no puede estar vacía.")
-            formato_valido = False
-        else:
-            for i in range(len(cantidad_ingresada)):
-                if not reconocer_numero(cantidad_ingresada[i]):
-                    formato_valido = False
-                    break
-        if formato_valido:
-            cantidad_parseada = int(cantidad_ingresada)
-            if min_cantidad <= cantidad_parseada <= max_cantidad:
-                cantidad_validada = cantidad_parseada
-                cantidad_ok = True
-            else:
-                print(f"Error: La cantidad debe estar entre {min_cantidad} y {max_cantidad}.")
-        else:
-            print("Error: Formato de cantidad no válido. Ingrese solo números enteros.")
-    print(f"  Cantidad: {cantidad_validada}")
-
-    return cantidad_validada
-
-def obtener_precio(accion_normalizada_buscada: str) -> float:
-    """
-    Obtiene el precio en USD de una acción específica.
-
-    Args:
-        accion_normalizada_buscada (str): Nombre de la acción normalizado en mayúsculas.
-
-    Comportamiento:
-    - Recorre la lista `empresas_normalizadas` para encontrar la acción buscada.
-    - Si la acción está en la lista, devuelve su precio correspondiente desde `precios`.
-    - Si no se encuentra la acción, retorna 0.0.
-
-    Retorno:
-    - (float): Precio de la acción en USD.
-    """
-    precio_obtenido = 0.0
-    for i in range(len(empresas_normalizadas)):
-        if empresas_normalizadas[i] == accion_normalizada_buscada:
-            precio_obtenido = precios[i]
-            break
-    return precio_obtenido
-
-def detallar_transacciones(nombres_t: list, acciones_t: list, cantidades_t: list) -> list:
-    """
-    Genera un registro de transacciones con información detallada sobre cada compra de acciones.
-
-    Args:
-        nombres_t (list): Lista de nombres de usuarios que realizaron transacciones.
-        acciones_t (list): Lista de nombres de empresas cuyas acciones fueron adquiridas.
-        cantidades_t (list): Lista con las cantidades de acciones compradas por cada usuario.
-
-    Comportamiento:
-    - Recorre las listas de nombres, acciones y cantidades para construir un registro estructurado.
-    - Obtiene el precio unitario de cada acción con "obtener_precio()".
-    - Calcula el total invertido multiplicando el precio unitario por la cantidad comprada.
-    - Almacena cada transacción en una lista con la siguiente estructura:
-        [usuario, empresa, precio por unidad, cantidad adquirida, total invertido].
-
-    Retorno:
-    - (list): Lista de transacciones con los detalles de cada compra.
-    """
-    registro_transacciones = []
-    for i in range(len(nombres_t)):
-        usuario = nombres_t[i]
-        accion = acciones_t[i]
-        cantidad = cantidades_t[i]
-        precio_unitario = obtener_precio(accion)
-        total_invertido = precio_unitario * (cantidad)
-        registro_transacciones += [[usuario, accion, precio_unitario, cantidad, total_invertido]]
-    return registro_transacciones
+from array import array
+from normalizacion import normalizar_nombre_usuario, normalizar_empresas
+from utilidades import reconocer_numero
+from datos import catalogo, historial_precios
+from moneda import a_centavos, a_dolares
+
+CANTIDAD_MINIMA = 0
+CANTIDAD_MAXIMA = 500
+
+def validar_usuario(usuario_ingresado: str) -> str:
+    """
+    Normaliza un nombre de usuario y verifica que pertenezca a la lista de usuarios VIP.
+
+    Args:
+        usuario_ingresado (str): Nombre tal como fue ingresado (por teclado o desde un archivo).
+
+    Retorno:
+    - (str): Nombre normalizado si es un usuario VIP; cadena vacía si está vacío o no es VIP.
+    """
+    usuario_validado = ""
+    if usuario_ingresado:
+        usuario_normalizado = normalizar_nombre_usuario(usuario_ingresado)
+        if catalogo.es_usuario_vip(usuario_normalizado):
+            usuario_validado = usuario_normalizado
+    return usuario_validado
+
+def validar_empresa(accion_ingresada: str) -> str:
+    """
+    Normaliza el nombre de una acción y verifica que sea una de las empresas permitidas.
+
+    Args:
+        accion_ingresada (str): Nombre de la acción tal como fue ingresado.
+
+    Retorno:
+    - (str): Nombre normalizado si la acción está permitida; cadena vacía en caso contrario.
+    """
+    empresa_validada = ""
+    if accion_ingresada:
+        accion_normalizada = normalizar_empresas(accion_ingresada)
+        if catalogo.es_empresa_valida(accion_normalizada):
+            empresa_validada = accion_normalizada
+    return empresa_validada
+
+def es_cantidad_con_formato_valido(cantidad_ingresada: str) -> bool:
+    """
+    Verifica que una cantidad ingresada no esté vacía y contenga sólo dígitos.
+
+    Args:
+        cantidad_ingresada (str): Texto a evaluar.
+
+    Retorno:
+    - (bool): True si el formato es válido, False en caso contrario.
+    """
+    formato_valido = True
+    if not cantidad_ingresada:
+        formato_valido = False
+    else:
+        for i in range(len(cantidad_ingresada)):
+            if not reconocer_numero(cantidad_ingresada[i]):
+                formato_valido = False
+                break
+    return formato_valido
+
+def validar_cantidad(cantidad_ingresada: str) -> int:
+    """
+    Convierte una cantidad ingresada a entero y verifica que esté en el rango permitido.
+
+    Args:
+        cantidad_ingresada (str): Texto con la cantidad de acciones.
+
+    Retorno:
+    - (int): La cantidad validada, o -1 si el formato no es válido o está fuera de rango.
+    """
+    cantidad_validada = -1
+    if es_cantidad_con_formato_valido(cantidad_ingresada):
+        cantidad_parseada = int(cantidad_ingresada)
+        if CANTIDAD_MINIMA <= cantidad_parseada <= CANTIDAD_MAXIMA:
+            cantidad_validada = cantidad_parseada
+    return cantidad_validada
+
+def registrar_usuario():
+    """
+    Solicita el ingreso de un nombre de usuario y valida que esté en la lista de usuarios VIP.
+
+    Comportamiento:
+    - Solicita un nombre de usuario al usuario.
+    - Verifica que el campo ingresado no esté vacío.
+    - Normaliza el nombre y lo busca en la lista de usuarios VIP con `validar_usuario`.
+    - Si el usuario está en la lista, lo valida y retorna; de lo contrario, muestra un mensaje de error y vuelve a solicitar el ingreso.
+
+    Retorno:
+    - (str): Nombre del usuario validado y normalizado.
+    """
+    usuario_validado = ""
+    
+    usuario_ok = False
+    while not usuario_ok:
+        usuario_ingresado = input("Ingrese nombre del usuario: ")
+        if not usuario_ingresado:
+            print("Error: El nombre de usuario no puede estar vacío.")
+            continue
+        usuario_validado = validar_usuario(usuario_ingresado)
+        if usuario_validado:
+            usuario_ok = True
+        else:
+            print(f"Error: Usuario '{usuario_ingresado}' no encontrado en la lista de usuarios VIP.")
+
+    print(f"  Usuario: {usuario_validado}")    
+    return usuario_validado
+
+def registrar_empresa():
+    """
+    Solicita el ingreso del nombre de una acción y valida que sea una opción permitida.
+
+    Comportamiento:
+    - Pide al usuario que ingrese el nombre de una acción.
+    - Verifica que el campo ingresado no esté vacío.
+    - Normaliza el nombre de la acción y la busca en la lista de empresas permitidas con `validar_empresa`.
+    - Si la acción está en la lista, la valida y la retorna; de lo contrario, muestra un mensaje de error y vuelve a solicitar el ingreso.
+
+    Retorno:
+    - (str): Nombre de la acción validada y normalizada.
+    """
+    empresa_validada = ""
+
+    empresa_ok = False
+    while not empresa_ok:
+        accion_ingresada = input(f"Ingrese nombre de la acción (Apple, Tesla, Nvidia): ")
+        if not accion_ingresada:
+            print("Error: El nombre de la acción no puede estar vacío.")
+            continue
+        empresa_validada = validar_empresa(accion_ingresada)
+        if empresa_validada:
+            empresa_ok = True
+        else:
+            print(f"Error: Acción '{accion_ingresada}' no válida. Elija entre Apple, Tesla o Nvidia.")
+    print(f"  Acción: {empresa_validada}")
+    return empresa_validada
+
+def registrar_cantidad():
+    """
+    Solicita al usuario una cantidad de acciones a comprar y valida el ingreso.
+
+    Comportamiento:
+    - Pide al usuario que ingrese un número de acciones dentro del rango permitido (0 - 500).
+    - Verifica que el campo no esté vacío.
+    - Recorre cada carácter de la entrada para confirmar que solo contiene números.
+    - Convierte la entrada en un entero y valida que esté dentro del rango permitido.
+    - Si el número es válido, lo retorna; de lo contrario, muestra mensajes de error y solicita nuevamente el ingreso.
+
+    Retorno:
+    - (int): Cantidad de acciones validada.
+    """    
+    cantidad_ok = False
+    min_cantidad = CANTIDAD_MINIMA
+    max_cantidad = CANTIDAD_MAXIMA
+    while not cantidad_ok:
+        cantidad_ingresada = input(f"Ingrese cantidad de acciones que desea comprar ({min_cantidad}-{max_cantidad}): ")
+        if not cantidad_ingresada:
+            print("Error: La cantidad no puede estar vacía.")
+        formato_valido = es_cantidad_con_formato_valido(cantidad_ingresada)
+        if formato_valido:
+            cantidad_validada = validar_cantidad(cantidad_ingresada)
+            if cantidad_validada != -1:
+                cantidad_ok = True
+            else:
+                print(f"Error: La cantidad debe estar entre {min_cantidad} y {max_cantidad}.")
+        else:
+            print("Error: Formato de cantidad no válido. Ingrese solo números enteros.")
+    print(f"  Cantidad: {cantidad_validada}")
+
+    return cantidad_validada
+
+def obtener_precio(accion_normalizada_buscada: str, instante: float = None) -> float:
+    """
+    Obtiene el precio en USD de una acción específica.
+
+    Args:
+        accion_normalizada_buscada (str): Nombre de la acción normalizado en mayúsculas.
+        instante (float, opcional): Momento de la transacción (segundos desde la época Unix).
+            Si es None, se usa el precio vigente hoy.
+
+    Comportamiento:
+    - Si la acción tiene historial de precios (`datos.historial_precios`), devuelve la cotización vigente
+      en `instante` (búsqueda binaria), o la más reciente si no se indica instante.
+    - Si no hay historial, o el instante es anterior a la primera cotización, usa el precio del catálogo
+      de `datos` (búsqueda por diccionario, O(1)).
+    - Si no se encuentra la acción, retorna 0.0.
+
+    Retorno:
+    - (float): Precio de la acción en USD.
+    """
+    precio_catalogo = catalogo.precio(accion_normalizada_buscada)
+    if instante is None:
+        return historial_precios.ultimo_precio(accion_normalizada_buscada, precio_catalogo)
+    return historial_precios.precio_en(accion_normalizada_buscada, instante, precio_catalogo)
+
+def obtener_precios(acciones, instantes=None) -> array:
+    """
+    Obtiene en lote el precio de cada fila de una columna de acciones.
+
+    Args:
+        acciones (sequence): Acción (normalizada) de cada fila.
+        instantes (sequence, opcional): Instante de cada fila (None en una fila: precio vigente hoy).
+            Si no se indica, todas las filas se valúan al precio vigente hoy.
+
+    Comportamiento:
+    - Sin instantes, resuelve el precio de cada acción distinta una sola vez.
+    - Con instantes, usa la búsqueda en lote del historial (`HistorialPrecios.precios_en`), que aprovecha
+      que las columnas suelen venir en orden cronológico; el catálogo cubre las filas sin cotización vigente.
+
+    Retorno:
+    - (array): Precio de cada fila, como arreglo 'd'.
+    """
+    precios_actuales = {}
+    if instantes is None:
+        precios_filas = array('d')
+        for i in range(len(acciones)):
+            precio_unitario = precios_actuales.get(acciones[i])
+            if precio_unitario is None:
+                precio_unitario = obtener_precio(acciones[i])
+                precios_actuales[acciones[i]] = precio_unitario
+            precios_filas.append(precio_unitario)
+        return precios_filas
+    for i in range(len(acciones)):
+        if acciones[i] not in precios_actuales:
+            precios_actuales[acciones[i]] = catalogo.precio(acciones[i])
+    return historial_precios.precios_en(acciones, instantes, precios_actuales)
+
+def iterar_transacciones(nombres_t, acciones_t, cantidades_t, instantes_t=None):
+    """
+    Genera perezosamente las transacciones detalladas, una por vez.
+
+    Args:
+        nombres_t (sequence): Nombres de usuarios que realizaron transacciones.
+        acciones_t (sequence): Nombres de empresas cuyas acciones fueron adquiridas.
+        cantidades_t (sequence): Cantidades de acciones compradas por cada usuario.
+        instantes_t (sequence, opcional): Momento de cada transacción; si se indica, cada fila se valúa
+            al precio vigente en su instante. Si no, al precio vigente hoy.
+
+    Comportamiento:
+    - El precio unitario ("obtener_precio()") y el total invertido de cada fila se calculan recién cuando
+      se pide esa fila, por lo que la memoria no depende del largo del historial.
+    - El total se calcula en centavos enteros (precio redondeado al centavo * cantidad), igual que en el almacén.
+    - Acepta cualquier secuencia indexable (listas o columnas) y también iterables, por ejemplo otro generador.
+
+    Retorno:
+    - (generator): Transacciones con la estructura [usuario, empresa, precio por unidad, cantidad adquirida, total invertido].
+    """
+    if instantes_t is None:
+        for usuario, accion, cantidad in zip(nombres_t, acciones_t, cantidades_t):
+            precio_unitario = a_centavos(obtener_precio(accion))
+            yield [usuario, accion, a_dolares(precio_unitario), cantidad, a_dolares(precio_unitario * cantidad)]
+    else:
+        for usuario, accion, cantidad, instante in zip(nombres_t, acciones_t, cantidades_t, instantes_t):
+            precio_unitario = a_centavos(obtener_precio(accion, instante))
+            yield [usuario, accion, a_dolares(precio_unitario), cantidad, a_dolares(precio_unitario * cantidad)]
+
+def detallar_transacciones(nombres_t: list, acciones_t: list, cantidades_t: list, instantes_t: list = None) -> list:
+    """
+    Genera un registro de transacciones con información detallada sobre cada compra de acciones.
+
+    Args:
+        nombres_t (list): Lista de nombres de usuarios que realizaron transacciones.
+        acciones_t (list): Lista de nombres de empresas cuyas acciones fueron adquiridas.
+        cantidades_t (list): Lista con las cantidades de acciones compradas por cada usuario.
+        instantes_t (list, opcional): Momento de cada transacción, para valuarla al precio vigente en
+            ese instante. Si no se indica, se usa el precio vigente hoy.
+
+    Comportamiento:
+    - Resuelve los precios de toda la columna de acciones en lote con `obtener_precios`.
+    - El total se calcula en centavos enteros (precio redondeado al centavo * cantidad), igual que en el almacén.
+    - Para recorrer historiales grandes sin construir la lista completa conviene usar `iterar_transacciones`.
+    - Cada transacción tiene la siguiente estructura:
+        [usuario, empresa, precio por unidad, cantidad adquirida, total invertido].
+
+    Retorno:
+    - (list): Lista de transacciones con los detalles de cada compra.
+    """
+    precios_t = obtener_precios(acciones_t, instantes_t)
+    registro_transacciones = []
+    for i in range(len(nombres_t)):
+        precio_unitario = a_centavos(precios_t[i])
+        registro_transacciones += [[nombres_t[i], acciones_t[i], a_dolares(precio_unitario), cantidades_t[i], a_dolares(precio_unitario * cantidades_t[i])]]
+    return registro_transacciones
@@ -0,0 +1,273 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datos import usuarios_vip, empresas, catalogo
+from normalizacion import normalizar_nombre_usuario, normalizar_empresas, normalizar_nombres_usuario, normalizar_lista_empresas
+from registro import detallar_transacciones, validar_usuario, validar_empresa, validar_cantidad, CANTIDAD_MAXIMA
+from almacen import AlmacenTransacciones
+from consultas import visualizar, CONSULTAS
+from reporte import generar_reporte
+from presentacion import renderizar_filas
+from utilidades import ordenar_alfabeticamente
+
+FILAS_POR_DEFECTO = "1e3,1e4,1e5"
+TOLERANCIA_POR_DEFECTO = 0.25
+REPETICIONES_POR_DEFECTO = 3
+SEGUNDOS_MINIMOS_COMPARABLES = 0.005
+
+COLUMNAS_RESULTADOS = [
+    ["prueba", "Prueba", 48, "{}"],
+    ["filas", "Filas", 10, "{}"],
+    ["segundos", "Segundos", 12, "{:.6f}"],
+    ["memoria_pico", "Pico (bytes)", 14, "{}"],
+]
+
+def generar_transacciones(cantidad: int, cantidad_usuarios: int = len(usuarios_vip), cantidad_empresas: int = len(empresas), sesgo: float = 1.0, semilla: int = 0) -> list:
+    """
+    Genera transacciones sintéticas con la forma de los datos reales (`datos.py`), tal como se ingresarían.
+
+    Args:
+        cantidad (int): Cantidad de transacciones.
+        cantidad_usuarios (int, opcional): Usuarios VIP distintos. Si supera los de `usuarios_vip`,
+            se agregan usuarios sintéticos derivados de ellos (por ejemplo "ecoerrante7").
+        cantidad_empresas (int, opcional): Empresas distintas. Las que excedan `empresas` se agregan
+            como "EMPRESA<n>" con un precio sintético.
+        sesgo (float, opcional): Exponente de una distribución tipo Zipf: 0 reparte las transacciones
+            de forma uniforme; valores mayores concentran la actividad en pocos usuarios y empresas.
+        semilla (int, opcional): Semilla del generador pseudoaleatorio, para obtener siempre los mismos datos.
+
+    Comportamiento:
+    - Registra en `catalogo` los usuarios y empresas sintéticos, para que pasen la validación y tengan precio.
+    - Los nombres se devuelven con mayúsculas y minúsculas mezcladas al azar, como entradas sin normalizar.
+
+    Retorno:
+    - (list): [usuarios, empresas, cantidades] como listas paralelas (cantidades como texto).
+    """
+    generador = random.Random(semilla)
+    nombres_usuarios = []
+    for i in range(cantidad_usuarios):
+        nombre = usuarios_vip[i % len(usuarios_vip)]
+        if i >= len(usuarios_vip):
+            nombre += str(i // len(usuarios_vip))
+        nombres_usuarios += [nombre]
+        catalogo.agregar_usuario(normalizar_nombre_usuario(nombre))
+    nombres_empresas = []
+    for i in range(cantidad_empresas):
+        if i < len(empresas):
+            nombres_empresas += [empresas[i]]
+        else:
+            nombres_empresas += [f"Empresa{i}"]
+            catalogo.agregar_empresa(normalizar_empresas(f"Empresa{i}"), round(generador.uniform(1, 500), 2))
+
+    pesos_usuarios = [1 / (i + 1) ** sesgo for i in range(cantidad_usuarios)]
+    pesos_empresas = [1 / (i + 1) ** sesgo for i in range(cantidad_empresas)]
+    usuarios_t = generador.choices(nombres_usuarios, pesos_usuarios, k=cantidad)
+    empresas_t = generador.choices(nombres_empresas, pesos_empresas, k=cantidad)
+    for i in range(cantidad):
+        if generador.random() < 0.5:
+            usuarios_t[i] = usuarios_t[i].upper()
+        if generador.random() < 0.5:
+            empresas_t[i] = empresas_t[i].lower()
+    cantidades_t = [str(generador.randint(1, CANTIDAD_MAXIMA)) for _ in range(cantidad)]
+    return [usuarios_t, empresas_t, cantidades_t]
+
+def medir(funcion, preparar, repeticiones: int, con_memoria: bool) -> dict:
+    """
+    Mide una función: mejor tiempo de pared entre varias repeticiones y pico de memoria asignada.
+
+    Args:
+        funcion (function): Función a medir; recibe los argumentos que devuelve `preparar`.
+        preparar (function): Arma los argumentos de cada repetición (no se incluye en la medición).
+        repeticiones (int): Cantidad de repeticiones; se informa la más rápida. Como en `timeit`,
+            el recolector de basura se desactiva durante cada repetición para reducir el ruido.
+        con_memoria (bool): Si es True, hace una ejecución extra bajo `tracemalloc` para medir el pico.
+
+    Retorno:
+    - (dict): {"segundos": float, "memoria_pico": int o None}.
+    """
+    mejor = None
+    for _ in range(repeticiones):
+        argumentos = preparar()
+        gc_activo = gc.isenabled()
+        gc.disable()
+        try:
+            inicio = time.perf_counter()
+            funcion(*argumentos)
+            segundos = time.perf_counter() - inicio
+        finally:
+            if gc_activo:
+                gc.enable()
+        if mejor is None or segundos < mejor:
+            mejor = segundos
+    memoria_pico = None
+    if con_memoria:
+        argumentos = preparar()
+        tracemalloc.start()
+        try:
+            funcion(*argumentos)
+            memoria_pico = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {"segundos": mejor, "memoria_pico": memoria_pico}
+
+def _validar_filas(usuarios_t: list, empresas_t: list, cantidades_t: list) -> None:
+    for i in range(len(usuarios_t)):
+        validar_usuario(usuarios_t[i])
+        validar_empresa(empresas_t[i])
+        validar_cantidad(cantidades_t[i])
+    return None
+
+def _limpiar_caches_normalizacion() -> list:
+    normalizar_nombre_usuario.cache_clear()
+    normalizar_empresas.cache_clear()
+    return []
+
+def ejecutar_pruebas(cantidades_filas: list, cantidad_usuarios: int, cantidad_empresas: int, sesgo: float, repeticiones: int, con_memoria: bool, semilla: int = 0) -> dict:
+    """
+    Ejecuta todas las pruebas de rendimiento para cada tamaño de datos.
+
+    Comportamiento:
+    - Registro: validación de cada fila, normalización por lotes (con el cache vacío) y `agregar_lote`.
+    - Listados: `detallar_transacciones`, `ordenar_alfabeticamente` sobre el detalle y `visualizar`
+      (tabla completa hacia un destino nulo).
+    - Consultas: cada función de `CONSULTAS` y el reporte completo de una pasada (`generar_reporte`).
+
+    Retorno:
+    - (dict): "<prueba>@<filas>" -> {"prueba", "filas", "segundos", "memoria_pico"}.
+    """
+    resultados = {}
+    for cantidad in cantidades_filas:
+        usuarios_t, empresas_t, cantidades_t = generar_transacciones(cantidad, cantidad_usuarios, cantidad_empresas, sesgo, semilla)
+        usuarios_n = normalizar_nombres_usuario(usuarios_t)
+        empresas_n = normalizar_lista_empresas(empresas_t)
+        cantidades_n = [int(c) for c in cantidades_t]
+        almacen = AlmacenTransacciones()
+        almacen.agregar_lote(usuarios_n, empresas_n, cantidades_n)
+        detalle = detallar_transacciones(usuarios_n, empresas_n, cantidades_n)
+        nulo = open(os.devnull, "w", encoding="utf-8")
+
+        pruebas = [
+            ["registro.validar_fila", _validar_filas, lambda: [usuarios_t, empresas_t, cantidades_t]],
+            ["normalizacion.normalizar_nombres_usuario", normalizar_nombres_usuario, lambda: _limpiar_caches_normalizacion() + [usuarios_t]],
+            ["normalizacion.normalizar_lista_empresas", normalizar_lista_empresas, lambda: _limpiar_caches_normalizacion() + [empresas_t]],
+            ["almacen.agregar_lote", lambda: AlmacenTransacciones().agregar_lote(usuarios_n, empresas_n, cantidades_n), lambda: []],
+            ["registro.detallar_transacciones", detallar_transacciones, lambda: [usuarios_n, empresas_n, cantidades_n]],
+            ["utilidades.ordenar_alfabeticamente", ordenar_alfabeticamente, lambda: [detalle[:], 0]],
+            ["consultas.visualizar", lambda: visualizar(almacen, destino=nulo), lambda: []],
+        ]
+        for numero in CONSULTAS:
+            nombre_consulta, funcion_consulta = CONSULTAS[numero]
+            pruebas += [[f"consultas.{nombre_consulta}", lambda funcion=funcion_consulta: funcion(almacen, mostrar=False), lambda: []]]
+        pruebas += [["reporte.generar_reporte", lambda: generar_reporte(almacen), lambda: []]]
+
+        try:
+            for nombre_prueba, funcion, preparar in pruebas:
+                medicion = medir(funcion, preparar, repeticiones, con_memoria)
+                resultados[f"{nombre_prueba}@{cantidad}"] = {"prueba": nombre_prueba, "filas": cantidad, **medicion}
+        finally:
+            nulo.close()
+    return resultados
+
+def comparar_con_base(resultados: dict, base: dict, tolerancia: float) -> list:
+    """
+    Compara los resultados con una línea base guardada y detecta regresiones.
+
+    Args:
+        resultados (dict): Resultados actuales (ver `ejecutar_pruebas`).
+        base (dict): Resultados de la línea base, con la misma estructura.
+        tolerancia (float): Aumento relativo permitido (0.25 = 25 %) en tiempo y en pico de memoria.
+            Los tiempos menores a `SEGUNDOS_MINIMOS_COMPARABLES` no se comparan: son dominados por el ruido.
+
+    Retorno:
+    - (list): [[prueba@filas, medida, valor base, valor actual], ...] de las regresiones encontradas.
+    """
+    regresiones = []
+    for clave, actual in resultados.items():
+        anterior = base.get(clave)
+        if anterior is None:
+            continue
+        for medida in ("segundos", "memoria_pico"):
+            if actual.get(medida) is None or anterior.get(medida) is None:
+                continue
+            if medida == "segundos" and max(actual[medida], anterior[medida]) < SEGUNDOS_MINIMOS_COMPARABLES:
+                continue
+            if actual[medida] > anterior[medida] * (1 + tolerancia):
+                regresiones += [[clave, medida, anterior[medida], actual[medida]]]
+    return regresiones
+
+def main_rendimiento(argumentos: list = None) -> int:
+    """
+    Punto de entrada de las pruebas de rendimiento.
+
+    Comportamiento:
+    - Genera datos sintéticos para cada tamaño de `--filas` (por ejemplo "1e3,1e4,1e5,1e6,1e7").
+    - Muestra una tabla con el mejor tiempo y el pico de memoria de cada prueba.
+    - Con `--guardar` escribe los resultados como nueva línea base (JSON); con `--base` los compara
+      con una línea base guardada y termina con código 1 si hay regresiones.
+
+    Retorno:
+    - (int): Código de salida del proceso.
+    """
+    parser = argparse.ArgumentParser(description="Pruebas de rendimiento de UTN-Capital con datos sintéticos.")
+    parser.add_argument("--filas", default=FILAS_POR_DEFECTO, help="Tamaños de datos separados por coma (admite notación 1e6).")
+    parser.add_argument("--usuarios", type=int, default=len(usuarios_vip), help="Usuarios VIP distintos.")
+    parser.add_argument("--empresas", type=int, default=len(empresas), help="Empresas distintas.")
+    parser.add_argument("--sesgo", type=float, default=1.0, help="Sesgo tipo Zipf de la actividad (0 = uniforme).")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--repeticiones", type=int, default=REPETICIONES_POR_DEFECTO)
+    parser.add_argument("--sin-memoria", action="store_true", help="No mide el pico de memoria (evita la ejecución extra con tracemalloc).")
+    parser.add_argument("--guardar", default=None, help="Archivo JSON donde guardar los resultados como línea base.")
+    parser.add_argument("--base", default=None, help="Línea base JSON contra la cual comparar.")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA_POR_DEFECTO, help="Aumento relativo permitido antes de considerar regresión.")
+    opciones = parser.parse_args(argumentos)
+
+    cantidades_filas = []
+    for texto in opciones.filas.split(","):
+        try:
+            cantidades_filas += [int(float(texto))]
+        except ValueError:
+            parser.error(f"Tamaño inválido: {texto}")
+    if opciones.usuarios < 1 or opciones.empresas < 1 or opciones.repeticiones < 1:
+        parser.error("--usuarios, --empresas y --repeticiones deben ser al menos 1.")
+
+    resultados = ejecutar_pruebas(
+        cantidades_filas, opciones.usuarios, opciones.empresas, opciones.sesgo,
+        opciones.repeticiones, not opciones.sin_memoria, opciones.semilla,
+    )
+    filas_tabla = [[r["prueba"], r["filas"], r["segundos"], r["memoria_pico"]] for r in resultados.values()]
+    renderizar_filas(filas_tabla, COLUMNAS_RESULTADOS, titulo="\n--- ⏱️ Rendimiento ---")
+
+    parametros = {"usuarios": opciones.usuarios, "empresas": opciones.empresas, "sesgo": opciones.sesgo, "semilla": opciones.semilla}
+    if opciones.guardar:
+        with open(opciones.guardar, "w", encoding="utf-8") as archivo:
+            json.dump({
+                "entorno": {"python": platform.python_version(), "plataforma": platform.platform()},
+                "parametros": parametros,
+                "resultados": resultados,
+            }, archivo, ensure_ascii=False, indent=2)
+        print(f"Línea base guardada en: {opciones.guardar}")
+
+    codigo_salida = 0
+    if opciones.base:
+        with open(opciones.base, encoding="utf-8") as archivo:
+            base = json.load(archivo)
+        if base.get("parametros") != parametros:
+            print(f"⚠️ Los datos sintéticos de la línea base se generaron con otros parámetros: {base.get('parametros')}")
+        regresiones = comparar_con_base(resultados, base["resultados"], opciones.tolerancia)
+        if regresiones:
+            codigo_salida = 1
+            print(f"\n❌ {len(regresiones)} regresiones respecto de {opciones.base}:")
+            for clave, medida, anterior, actual in regresiones:
+                print(f"  {clave} [{medida}]: {anterior} -> {actual}")
+        else:
+            print(f"\n✅ Sin regresiones respecto de {opciones.base} (tolerancia {opciones.tolerancia:.0%}).")
+    return codigo_salida
+
+if __name__ == "__main__":
+    sys.exit(main_rendimiento())
@@ -0,0 +1,289 @@
+from almacen import AlmacenTransacciones
+from acumulados import AgregadosIncrementales
+from consultas import CONSULTAS, CANTIDAD_RANKING, PERCENTIL_POR_DEFECTO, parametros_consulta
+
+DEPENDENCIAS_CONSULTAS = {
+    "total_acciones_por_usuario": ["acciones_por_usuario"],
+    "promedio_acciones_por_empresa": ["acciones_por_empresa", "acciones_por_usuario"],
+    "total_invertido_por_usuario": ["inversion_por_usuario"],
+    "inversion_total": ["inversion_total"],
+    "empresa_con_mas_acciones_por_usuario": ["tenencias"],
+    "accion_con_mayor_inversion": ["inversion_por_empresa"],
+    "porcentaje_inversion_por_usuario": ["inversion_por_usuario", "inversion_total"],
+    "usuarios_superan_promedio": ["inversion_por_usuario", "inversion_total"],
+    "top_inversores": ["inversion_por_usuario"],
+    "top_empresas_por_inversion": ["inversion_por_empresa"],
+    "top_empresas_por_acciones": ["acciones_por_empresa"],
+    "top_tenencias_por_usuario": ["tenencias"],
+    "percentiles_inversion": ["inversion_por_usuario", "cuantiles_transacciones"],
+    "usuarios_sobre_percentil": ["inversion_por_usuario"],
+}
+
+class AlmacenResumido:
+    """
+    Vista mínima de un almacén para derivar resultados de consultas a partir de agregados ya calculados.
+
+    Args:
+        almacen (AlmacenTransacciones): Almacén del que se toman los diccionarios de nombres.
+        acumulados (AgregadosIncrementales): Agregados calculados para el rango de filas del reporte.
+        cantidad_filas (int): Cantidad de filas que cubren los agregados.
+
+    Comportamiento:
+    - Expone lo que usan las funciones de `consultas` (`acumulados`, nombres, ids y `len`), sin columnas.
+    """
+
+    def __init__(self, almacen: AlmacenTransacciones, acumulados: AgregadosIncrementales, cantidad_filas: int) -> None:
+        self.acumulados = acumulados
+        self.nombres_usuarios = almacen.nombres_usuarios
+        self.nombres_empresas = almacen.nombres_empresas
+        self.ids_usuarios = almacen.ids_usuarios
+        self.ids_empresas = almacen.ids_empresas
+        self.cantidad_filas = cantidad_filas
+
+    def __len__(self) -> int:
+        return self.cantidad_filas
+
+def agregados_necesarios(nombres_consultas: list) -> list:
+    """
+    Calcula la unión de los agregados intermedios que necesitan las consultas pedidas.
+
+    Args:
+        nombres_consultas (list): Nombres de consultas (claves de `DEPENDENCIAS_CONSULTAS`).
+
+    Retorno:
+    - (list): Nombres de agregados, sin repetir.
+    """
+    necesarios = []
+    for i in range(len(nombres_consultas)):
+        dependencias = DEPENDENCIAS_CONSULTAS[nombres_consultas[i]]
+        for j in range(len(dependencias)):
+            if dependencias[j] not in necesarios:
+                necesarios += [dependencias[j]]
+    return necesarios
+
+def acumular_rango(usuarios, empresas, cantidades, totales, necesarios: list, inicio: int, fin: int, cantidad_usuarios: int = None, cantidad_empresas: int = None) -> AgregadosIncrementales:
+    """
+    Recorre una única vez las filas [inicio, fin) de las columnas y acumula sólo los agregados pedidos.
+
+    Args:
+        usuarios, empresas, cantidades, totales (sequence): Columnas de transacciones.
+        necesarios (list): Agregados a calcular (ver `DEPENDENCIAS_CONSULTAS`).
+        inicio (int): Primera fila del rango (incluida).
+        fin (int): Última fila del rango (excluida).
+        cantidad_usuarios (int, opcional): Cantidad de ids de usuario del almacén (ids 0..n-1). Si no se
+            indica, se calcula con el mayor id del rango.
+        cantidad_empresas (int, opcional): Cantidad de ids de empresa del almacén, con el mismo criterio.
+
+    Comportamiento:
+    - Los ids de usuario y de empresa son compactos (codificación por diccionario), así que los acumuladores
+      por usuario y por empresa son listas indexadas por id: cada fila suma en una posición, sin calcular
+      el hash de una clave. Las tenencias usan una clave entera (usuario * empresas + empresa) en lugar de una tupla.
+    - Cada clave se anota la primera vez que aparece en el rango, y los diccionarios del resultado se arman
+      en ese orden, igual que si se hubiera acumulado directamente en diccionarios.
+    - En cada fila actualiza únicamente los acumuladores requeridos.
+    - El sketch de cuantiles por transacción, si se pide, recibe los totales del rango en orden, fuera del ciclo principal.
+    - No calcula la mayor tenencia por usuario (ver `completar_mayores`), para que el resultado
+      pueda combinarse con el de otros rangos.
+
+    Retorno:
+    - (AgregadosIncrementales): Agregados parciales del rango; los no pedidos quedan vacíos.
+    """
+    agregados = AgregadosIncrementales()
+    por_acciones_usuario = "acciones_por_usuario" in necesarios
+    por_inversion_usuario = "inversion_por_usuario" in necesarios
+    por_usuario = por_acciones_usuario or por_inversion_usuario
+    por_acciones_empresa = "acciones_por_empresa" in necesarios
+    por_inversion_empresa = "inversion_por_empresa" in necesarios
+    por_empresa = por_acciones_empresa or por_inversion_empresa
+    por_tenencias = "tenencias" in necesarios
+    por_total = "inversion_total" in necesarios
+    por_cuantiles = "cuantiles_transacciones" in necesarios
+    if fin <= inicio:
+        return agregados
+    if cantidad_usuarios is None:
+        cantidad_usuarios = max(usuarios[inicio:fin]) + 1
+    if cantidad_empresas is None:
+        cantidad_empresas = max(empresas[inicio:fin]) + 1
+
+    acciones_por_usuario = [0] * cantidad_usuarios
+    inversion_por_usuario = [0] * cantidad_usuarios
+    usuario_visto = bytearray(cantidad_usuarios)
+    orden_usuarios = []
+    acciones_por_empresa = [0] * cantidad_empresas
+    inversion_por_empresa = [0] * cantidad_empresas
+    empresa_vista = bytearray(cantidad_empresas)
+    orden_empresas = []
+    tenencias = {}
+    inversion_total = 0
+    for i in range(inicio, fin):
+        id_usuario = usuarios[i]
+        id_empresa = empresas[i]
+        if por_usuario:
+            if not usuario_visto[id_usuario]:
+                usuario_visto[id_usuario] = 1
+                orden_usuarios.append(id_usuario)
+            if por_acciones_usuario:
+                acciones_por_usuario[id_usuario] += cantidades[i]
+            if por_inversion_usuario:
+                inversion_por_usuario[id_usuario] += totales[i]
+        if por_empresa:
+            if not empresa_vista[id_empresa]:
+                empresa_vista[id_empresa] = 1
+                orden_empresas.append(id_empresa)
+            if por_acciones_empresa:
+                acciones_por_empresa[id_empresa] += cantidades[i]
+            if por_inversion_empresa:
+                inversion_por_empresa[id_empresa] += totales[i]
+        if por_tenencias:
+            par = id_usuario * cantidad_empresas + id_empresa
+            tenencias[par] = tenencias.get(par, 0) + cantidades[i]
+        if por_total:
+            inversion_total += totales[i]
+
+    for id_usuario in orden_usuarios:
+        if por_acciones_usuario:
+            agregados.acciones_por_usuario[id_usuario] = acciones_por_usuario[id_usuario]
+        if por_inversion_usuario:
+            agregados.inversion_por_usuario[id_usuario] = inversion_por_usuario[id_usuario]
+    for id_empresa in orden_empresas:
+        if por_acciones_empresa:
+            agregados.acciones_por_empresa[id_empresa] = acciones_por_empresa[id_empresa]
+        if por_inversion_empresa:
+            agregados.inversion_por_empresa[id_empresa] = inversion_por_empresa[id_empresa]
+    for par, tenencia in tenencias.items():
+        agregados.tenencias[divmod(par, cantidad_empresas)] = tenencia
+    agregados.inversion_total = inversion_total
+    if por_cuantiles:
+        agregados.cuantiles_transacciones.extender(totales[inicio:fin])
+    return agregados
+
+def completar_mayores(agregados: AgregadosIncrementales) -> AgregadosIncrementales:
+    """
+    Deriva la mayor tenencia de cada usuario recorriendo las tenencias (pares), no las filas.
+
+    Comportamiento:
+    - Ante un empate gana la empresa cuyo par apareció primero, igual que en los agregados incrementales.
+
+    Retorno:
+    - (AgregadosIncrementales): Los mismos agregados, con `orden_tenencias` y `mayor_por_usuario` completos.
+    """
+    for par, tenencia in agregados.tenencias.items():
+        agregados.orden_tenencias[par] = len(agregados.orden_tenencias)
+        mayor_actual = agregados.mayor_por_usuario.get(par[0])
+        if mayor_actual is None or tenencia > mayor_actual[1]:
+            agregados.mayor_por_usuario[par[0]] = [par[1], tenencia]
+    return agregados
+
+def calcular_agregados(almacen: AlmacenTransacciones, necesarios: list, inicio: int = 0, fin: int = None) -> AgregadosIncrementales:
+    """
+    Calcula en una única pasada sobre las columnas sólo los agregados pedidos.
+
+    Args:
+        almacen (AlmacenTransacciones): Almacén de origen.
+        necesarios (list): Agregados a calcular (ver `DEPENDENCIAS_CONSULTAS`).
+        inicio (int, opcional): Primera fila del rango (incluida).
+        fin (int, opcional): Última fila del rango (excluida). Por defecto, el final del almacén.
+
+    Comportamiento:
+    - Los agregados compartidos por varias consultas (por ejemplo la inversión por usuario y el total)
+      se calculan una vez, en la misma pasada (`acumular_rango`).
+    - La mayor tenencia por usuario se deriva al final con `completar_mayores`.
+
+    Retorno:
+    - (AgregadosIncrementales): Agregados del rango; los no pedidos quedan vacíos.
+    """
+    if fin is None:
+        fin = len(almacen)
+    agregados = acumular_rango(
+        almacen.vista("usuarios"), almacen.vista("empresas"), almacen.vista("cantidades"), almacen.vista("totales"),
+        necesarios, inicio, fin, len(almacen.nombres_usuarios), len(almacen.nombres_empresas),
+    )
+    return completar_mayores(agregados)
+
+def nombres_de_consultas(numeros_consultas: list) -> list:
+    """
+    Traduce números de consulta del submenú (1-8) a sus nombres en `CONSULTAS`.
+
+    Retorno:
+    - (list): Nombres de las consultas, en el mismo orden.
+    """
+    nombres_consultas = []
+    for i in range(len(numeros_consultas)):
+        nombres_consultas += [CONSULTAS[numeros_consultas[i]][0]]
+    return nombres_consultas
+
+def derivar_resultados(almacen: AlmacenTransacciones, acumulados: AgregadosIncrementales, numeros_consultas: list, cantidad_filas: int, cantidad_ranking: int = CANTIDAD_RANKING, percentil: int = PERCENTIL_POR_DEFECTO, mostrar: bool = False) -> dict:
+    """
+    Obtiene el resultado de cada consulta a partir de agregados ya calculados, sin recorrer filas.
+    Los rankings se calculan con `cantidad_ranking` posiciones y las consultas de percentil con `percentil`;
+    con `mostrar` cada consulta imprime además su resultado.
+
+    Retorno:
+    - (dict): nombre de consulta -> resultado, en el orden pedido.
+    """
+    resumido = AlmacenResumido(almacen, acumulados, cantidad_filas)
+    resultados = {}
+    for i in range(len(numeros_consultas)):
+        nombre_consulta, funcion_consulta = CONSULTAS[numeros_consultas[i]]
+        resultados[nombre_consulta] = funcion_consulta(resumido, *parametros_consulta(numeros_consultas[i], cantidad_ranking, percentil), mostrar=mostrar)
+    return resultados
+
+def generar_reporte(almacen: AlmacenTransacciones, numeros_consultas: list = None, inicio: int = 0, fin: int = None, cantidad_ranking: int = CANTIDAD_RANKING, percentil: int = PERCENTIL_POR_DEFECTO) -> dict:
+    """
+    Calcula varias consultas del submenú con una sola pasada sobre las transacciones.
+
+    Args:
+        almacen (AlmacenTransacciones): Almacén de origen.
+        numeros_consultas (list, opcional): Números de consulta de `CONSULTAS`. Por defecto, todas.
+        inicio (int, opcional): Primera fila del rango a reportar (por ejemplo, la primera del día).
+        fin (int, opcional): Fila final (excluida) del rango. Por defecto, el final del almacén.
+        cantidad_ranking (int, opcional): Posiciones (N) de las consultas de ranking.
+        percentil (int, opcional): Percentil de corte de las consultas de percentil.
+
+    Comportamiento:
+    - Determina con `agregados_necesarios` qué agregados intermedios comparten las consultas pedidas.
+    - Los calcula en una única pasada (`calcular_agregados`) sobre el rango de filas.
+    - Deriva cada resultado con las mismas funciones de `consultas`, sin volver a recorrer las filas.
+
+    Retorno:
+    - (dict): nombre de consulta -> resultado, en el orden pedido.
+    """
+    if numeros_consultas is None:
+        numeros_consultas = list(CONSULTAS)
+    if fin is None:
+        fin = len(almacen)
+    necesarios = agregados_necesarios(nombres_de_consultas(numeros_consultas))
+    acumulados = calcular_agregados(almacen, necesarios, inicio, fin)
+    return derivar_resultados(almacen, acumulados, numeros_consultas, fin - inicio, cantidad_ranking, percentil)
+
+def generar_reporte_ventana(almacen: AlmacenTransacciones, duracion: float, fija: bool = False, numeros_consultas: list = None, ahora: float = None, cantidad_ranking: int = CANTIDAD_RANKING, percentil: int = PERCENTIL_POR_DEFECTO, mostrar: bool = False) -> dict:
+    """
+    Calcula consultas del submenú sobre las transacciones de una ventana de tiempo.
+
+    Args:
+        almacen (AlmacenTransacciones): Almacén de origen (en memoria, persistente o SQLite).
+        duracion (float): Largo de la ventana en segundos (3600 = una hora, 86400 = un día).
+        fija (bool, opcional): Si es False (por defecto) la ventana es deslizante: los últimos `duracion`
+            segundos hasta `ahora`. Si es True es fija (tumbling): el período de `duracion` segundos,
+            alineado a la hora local, que contiene a `ahora` (con 86400, "hoy").
+        numeros_consultas (list, opcional): Números de consulta de `CONSULTAS`. Por defecto, todas.
+        ahora (float, opcional): Fin de la ventana. Por defecto, el instante actual.
+        cantidad_ranking (int, opcional): Posiciones (N) de las consultas de ranking.
+        percentil (int, opcional): Percentil de corte de las consultas de percentil.
+        mostrar (bool, opcional): Si es True, cada consulta imprime su resultado en la consola.
+
+    Comportamiento:
+    - Combina los baldes de `almacen.ventanas` que cubre la ventana (O(baldes), sin recorrer transacciones)
+      y deriva cada resultado con las mismas funciones de `consultas`.
+    - Las ventanas tienen la resolución de un balde y cubren como máximo las últimas 24 horas.
+
+    Retorno:
+    - (dict): nombre de consulta -> resultado, en el orden pedido.
+    """
+    if numeros_consultas is None:
+        numeros_consultas = list(CONSULTAS)
+    if fija:
+        acumulados, cantidad_filas = almacen.ventanas.fija(duracion, ahora)
+    else:
+        acumulados, cantidad_filas = almacen.ventanas.deslizante(duracion, ahora)
+    return derivar_resultados(almacen, completar_mayores(acumulados), numeros_consultas, cantidad_filas, cantidad_ranking, percentil, mostrar)
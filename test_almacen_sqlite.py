@@ -0,0 +1,109 @@
+import sqlite3
+import pytest
+import almacen_sqlite
+from almacen import AlmacenTransacciones
+from almacen_sqlite import AlmacenSQLite, VERSION_ESQUEMA
+from consultas import CONSULTAS, parametros_consulta
+
+def test_sqlite_igual_a_memoria(tmp_path, transacciones, cargar, estado, resultados):
+    ruta = str(tmp_path / "almacen.db")
+    memoria = cargar(AlmacenTransacciones(), transacciones)
+    sqlite = cargar(AlmacenSQLite(ruta), transacciones)
+    memoria.agregar("usuario010", "APPLE", 7, transacciones[3][-1])
+    sqlite.agregar("usuario010", "APPLE", 7, transacciones[3][-1])
+    assert estado(sqlite.acumulados) == estado(memoria.acumulados)
+    assert sqlite.ventanas.a_diccionario() == memoria.ventanas.a_diccionario()
+    assert resultados(sqlite) == resultados(memoria)
+    sqlite.cerrar()
+
+    reabierto = AlmacenSQLite(ruta)
+    assert reabierto.acumulados.cuantiles_transacciones.a_diccionario() == memoria.acumulados.cuantiles_transacciones.a_diccionario()
+    assert reabierto.ventanas.a_diccionario() == memoria.ventanas.a_diccionario()
+    assert resultados(reabierto) == resultados(memoria)
+    reabierto.cerrar()
+
+def test_percentiles_agrupan_una_sola_vez(tmp_path, transacciones, cargar):
+    almacen = cargar(AlmacenSQLite(str(tmp_path / "almacen.db")), transacciones)
+    sentencias = []
+    almacen.conexion.set_trace_callback(sentencias.append)
+    for numero in (14, 15):
+        sentencias.clear()
+        CONSULTAS[numero][1](almacen, *parametros_consulta(numero, 4, 75), mostrar=False)
+        assert len([sentencia for sentencia in sentencias if "GROUP BY" in sentencia]) == 1
+    almacen.conexion.set_trace_callback(None)
+    almacen.cerrar()
+
+@pytest.mark.parametrize("version", [1, 2])
+def test_migra_bases_sin_id_con_rowids_salteados(tmp_path, version):
+    ruta = str(tmp_path / "anterior.db")
+    conexion = sqlite3.connect(ruta)
+    columna_instante = ", instante REAL NOT NULL DEFAULT 0" if version == 2 else ""
+    conexion.executescript(f"""
+        CREATE TABLE usuarios (id INTEGER PRIMARY KEY, nombre TEXT NOT NULL UNIQUE);
+        CREATE TABLE empresas (id INTEGER PRIMARY KEY, nombre TEXT NOT NULL UNIQUE);
+        CREATE TABLE transacciones (
+            usuario INTEGER NOT NULL, empresa INTEGER NOT NULL, cantidad INTEGER NOT NULL,
+            precio INTEGER NOT NULL, total INTEGER NOT NULL{columna_instante}
+        );
+        CREATE INDEX transacciones_usuario ON transacciones (usuario);
+        INSERT INTO usuarios VALUES (0, 'ana'), (1, 'bruno');
+        INSERT INTO empresas VALUES (0, 'APPLE');
+        INSERT INTO transacciones (rowid, usuario, empresa, cantidad, precio, total) VALUES
+            (10, 1, 0, 2, 100, 200), (25, 0, 0, 3, 100, 300), (40, 1, 0, 5, 100, 500);
+        PRAGMA user_version = {version};
+    """)
+    conexion.close()
+
+    almacen = AlmacenSQLite(ruta)
+    assert len(almacen) == 3
+    assert [almacen.fila(i)[0] for i in range(3)] == ["bruno", "ana", "bruno"]
+    assert [fila[3] for fila in almacen.iterar(1)] == [3, 5]
+    assert [fila[3] for fila in almacen.iterar_por_usuario()] == [3, 2, 5]
+    assert almacen.acumulados.cuantiles_transacciones.cuantiles([0.0, 1.0]) == [200, 500]
+    almacen.agregar("ana", "APPLE", 1, 1000.0)
+    assert almacen.fila(3)[0] == "ana"
+    assert almacen.conexion.execute("PRAGMA user_version").fetchone()[0] == VERSION_ESQUEMA
+    almacen.conexion.execute("VACUUM")
+    assert [fila[3] for fila in almacen.iterar()] == [2, 3, 5, 1]
+    almacen.cerrar()
+
+def test_nombres_de_una_insercion_fallida_se_descartan(tmp_path):
+    almacen = AlmacenSQLite(str(tmp_path / "almacen.db"))
+    almacen.agregar("ana", "APPLE", 1, 1000.0)
+    with pytest.raises(TypeError):
+        almacen.agregar_lote(["bruno", "carla"], ["TESLA", "NVIDIA"], [2, None], [1001.0, 1002.0])
+    with pytest.raises(TypeError):
+        almacen.agregar("dario", "TESLA", None, 1003.0)
+    assert almacen.nombres_usuarios == ["ana"] and almacen.nombres_empresas == ["APPLE"]
+    assert almacen.ids_usuarios == {"ana": 0} and almacen.ids_empresas == {"APPLE": 0}
+    assert almacen.conexion.execute("SELECT COUNT(*) FROM usuarios").fetchone()[0] == 1
+
+    almacen.agregar_lote(["carla", "bruno"], ["NVIDIA", "TESLA"], [3, 4], [1004.0, 1005.0])
+    assert [fila[:2] for fila in almacen.iterar()] == [["ana", "APPLE"], ["carla", "NVIDIA"], ["bruno", "TESLA"]]
+    almacen.cerrar()
+
+def test_sketch_se_guarda_por_tandas_y_al_cerrar(tmp_path, monkeypatch):
+    ruta = str(tmp_path / "almacen.db")
+    monkeypatch.setattr(almacen_sqlite, "FILAS_POR_RESUMEN", 8)
+    almacen = AlmacenSQLite(ruta)
+    escrituras = []
+    almacen.conexion.set_trace_callback(lambda sentencia: escrituras.append(sentencia) if "resumenes" in sentencia else None)
+    for i in range(10):
+        almacen.agregar(f"usuario{i}", "APPLE", i + 1, 1000.0 + i)
+    assert len(escrituras) == 1
+    almacen.agregar_lote(["usuario1"] * 3, ["TESLA"] * 3, [1, 2, 3], [2000.0, 2001.0, 2002.0])
+    assert len(escrituras) == 1
+    assert almacen.conexion.execute("SELECT filas FROM resumenes").fetchone()[0] == 8
+
+    sin_cerrar = AlmacenSQLite(ruta)
+    assert sin_cerrar.acumulados.cuantiles_transacciones.a_diccionario() == almacen.acumulados.cuantiles_transacciones.a_diccionario()
+    sin_cerrar.conexion.close()
+    almacen.conexion.close()
+
+    ruta_otra = str(tmp_path / "otra.db")
+    otra = AlmacenSQLite(ruta_otra)
+    otra.agregar_lote(["usuario1"] * 3, ["TESLA"] * 3, [1, 2, 3], [2000.0, 2001.0, 2002.0])
+    otra.cerrar()
+    conexion = sqlite3.connect(ruta_otra)
+    assert conexion.execute("SELECT filas FROM resumenes").fetchone()[0] == 3
+    conexion.close()
@@ -0,0 +1,56 @@
+from almacen import AlmacenTransacciones
+from cache_resultados import CacheConsultas
+
+def _consulta_contada(llamadas: list):
+    def consulta(almacen, limite, mostrar=True):
+        llamadas.append(limite)
+        resultado = sum(almacen.cantidades[:limite])
+        if mostrar:
+            print(f"suma: {resultado}")
+        return resultado
+    return consulta
+
+def test_reutiliza_hasta_que_cambia_la_version():
+    llamadas = []
+    consulta = _consulta_contada(llamadas)
+    cache = CacheConsultas()
+    almacen = AlmacenTransacciones()
+    almacen.agregar_lote(["usuario1", "usuario2"], ["APPLE", "TESLA"], [3, 4])
+
+    assert cache.ejecutar(almacen, "suma", consulta, (10,), mostrar=False) == 7
+    assert cache.ejecutar(almacen, "suma", consulta, (10,), mostrar=False) == 7
+    assert cache.ejecutar(almacen, "suma", consulta, (1,), mostrar=False) == 3
+    assert llamadas == [10, 1]
+    assert cache.aciertos == 1 and len(cache) == 2
+
+    almacen.agregar("usuario3", "NVIDIA", 5)
+    assert cache.ejecutar(almacen, "suma", consulta, (10,), mostrar=False) == 12
+    assert llamadas == [10, 1, 10]
+    assert len(cache) == 1
+
+    otro = AlmacenTransacciones()
+    assert cache.ejecutar(otro, "suma", consulta, (10,), mostrar=False) == 0
+    assert len(cache) == 2
+
+def test_repite_la_salida_sin_recalcular(capsys):
+    llamadas = []
+    consulta = _consulta_contada(llamadas)
+    cache = CacheConsultas()
+    almacen = AlmacenTransacciones()
+    almacen.agregar("usuario1", "APPLE", 8)
+
+    cache.ejecutar(almacen, "suma", consulta, (10,), mostrar=False)
+    cache.ejecutar(almacen, "suma", consulta, (10,))
+    cache.ejecutar(almacen, "suma", consulta, (10,))
+    assert capsys.readouterr().out == "suma: 8\n" * 2
+    assert llamadas == [10, 10]
+
+def test_descarta_el_menos_usado():
+    llamadas = []
+    consulta = _consulta_contada(llamadas)
+    cache = CacheConsultas(capacidad=2)
+    almacen = AlmacenTransacciones()
+    for limite in (1, 2, 1, 3, 1, 2):
+        cache.ejecutar(almacen, "suma", consulta, (limite,), mostrar=False)
+    assert llamadas == [1, 2, 3, 2]
+    assert len(cache) == 2
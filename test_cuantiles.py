@@ -0,0 +1,55 @@
+import random
+from acumulados import AgregadosIncrementales
+from conftest import CANTIDAD_FILAS, CANTIDAD_USUARIOS
+from cuantiles import SketchCuantiles
+
+def test_desde_columnas_igual_a_registrar_fila_por_fila(estado):
+    generador = random.Random(11)
+    columnas = [[], [], [], []]
+    for _ in range(CANTIDAD_FILAS):
+        columnas[0] += [generador.randrange(CANTIDAD_USUARIOS)]
+        columnas[1] += [generador.randrange(40)]
+        columnas[2] += [generador.randint(1, 500)]
+        columnas[3] += [generador.randint(1, 10 ** 7)]
+    fila_por_fila = AgregadosIncrementales()
+    for i in range(CANTIDAD_FILAS):
+        fila_por_fila.registrar(columnas[0][i], columnas[1][i], columnas[2][i], columnas[3][i])
+    reconstruidos = AgregadosIncrementales.desde_columnas(*columnas)
+    assert estado(reconstruidos) == estado(fila_por_fila)
+    assert reconstruidos.mayor_por_usuario == fila_por_fila.mayor_por_usuario
+
+def test_sketch_exacto_sin_compactar():
+    sketch = SketchCuantiles()
+    sketch.extender([4, 1, 3, 2])
+    assert sketch.cuantiles([0.25, 0.5, 1.0]) == [1, 2, 4]
+    assert SketchCuantiles().cuantil(0.5) is None
+
+def test_extender_y_combinar_igual_a_agregar_uno_por_uno():
+    generador = random.Random(3)
+    valores = [generador.randint(1, 10 ** 6) for _ in range(20000)]
+    uno_por_uno = SketchCuantiles()
+    for valor in valores:
+        uno_por_uno.agregar(valor)
+    extendido = SketchCuantiles()
+    extendido.extender(valores)
+    assert extendido.a_diccionario() == uno_por_uno.a_diccionario()
+
+    combinado = SketchCuantiles()
+    for inicio in range(0, len(valores), 100):
+        parte = SketchCuantiles()
+        parte.extender(valores[inicio:inicio + 100])
+        combinado.combinar(parte)
+    assert combinado.a_diccionario() == uno_por_uno.a_diccionario()
+
+def test_sketch_dentro_del_error_y_serializable():
+    generador = random.Random(5)
+    valores = [generador.random() for _ in range(50000)]
+    sketch = SketchCuantiles()
+    sketch.extender(valores)
+    ordenados = sorted(valores)
+    for fraccion, estimado in zip([0.1, 0.5, 0.9, 0.99], sketch.cuantiles([0.1, 0.5, 0.9, 0.99])):
+        rango = ordenados.index(estimado) / len(ordenados)
+        assert abs(rango - fraccion) < 0.02
+    copia = SketchCuantiles.desde_diccionario(sketch.a_diccionario())
+    assert copia.cuantiles([0.5, 0.9]) == sketch.cuantiles([0.5, 0.9])
+    assert len(copia) == len(valores)
@@ -0,0 +1,58 @@
+import random
+import registro
+from almacen import AlmacenTransacciones
+from datos import catalogo
+from historial import HistorialPrecios, cargar_historial_csv
+
+def test_precio_vigente_por_instante():
+    historial = HistorialPrecios()
+    historial.agregar("APPLE", 100.0, 10.0)
+    historial.agregar("APPLE", 300.0, 30.0)
+    historial.agregar("APPLE", 200.0, 20.0)
+    historial.agregar("APPLE", 300.0, 31.0)
+    assert len(historial) == 3
+    assert historial.precio_en("APPLE", 99.0) is None
+    assert historial.precio_en("APPLE", 99.0, 1.5) == 1.5
+    assert [historial.precio_en("APPLE", t) for t in (100.0, 199.9, 200.0, 1000.0)] == [10.0, 10.0, 20.0, 31.0]
+    assert historial.ultimo_precio("APPLE") == 31.0
+    assert historial.precio_en("TESLA", 150.0, 2.0) == 2.0
+
+def test_lote_desordenado_y_busqueda_en_lote():
+    generador = random.Random(2)
+    instantes = [float(generador.randrange(10000)) for _ in range(500)]
+    precios = [float(i) for i in range(500)]
+    historial = HistorialPrecios()
+    historial.agregar_lote("TESLA", instantes, precios)
+    ultimo_por_instante = dict(zip(instantes, precios))
+    assert list(historial.instantes["TESLA"]) == sorted(ultimo_por_instante)
+    assert historial.precio_en("TESLA", max(instantes)) == ultimo_por_instante[max(instantes)]
+
+    consultados = sorted(generador.uniform(-10, 10010) for _ in range(300)) + [5000.0, 1.0, None]
+    empresas = ["TESLA"] * len(consultados)
+    esperado = [historial.precio_en("TESLA", t, 0.0) if t is not None else historial.ultimo_precio("TESLA") for t in consultados]
+    assert list(historial.precios_en(empresas, consultados)) == esperado
+
+def test_obtener_precio_usa_historial_y_catalogo(monkeypatch):
+    historial = HistorialPrecios()
+    historial.agregar_lote("NVIDIA", [1000.0, 2000.0], [50.0, 60.0])
+    monkeypatch.setattr(registro, "historial_precios", historial)
+    assert registro.obtener_precio("NVIDIA", 1500.0) == 50.0
+    assert registro.obtener_precio("NVIDIA", 2500.0) == 60.0
+    assert registro.obtener_precio("NVIDIA") == 60.0
+    assert registro.obtener_precio("NVIDIA", 10.0) == catalogo.precio("NVIDIA")
+    assert registro.obtener_precio("APPLE", 1500.0) == catalogo.precio("APPLE")
+    assert registro.obtener_precio("INEXISTENTE") == 0.0
+    assert list(registro.obtener_precios(["NVIDIA", "NVIDIA", "APPLE"], [2000.0, 1999.0, None])) == [60.0, 50.0, catalogo.precio("APPLE")]
+
+    almacen = AlmacenTransacciones()
+    almacen.agregar_lote(["usuario1", "usuario1"], ["NVIDIA", "NVIDIA"], [2, 3], [1500.0, 2500.0])
+    assert [almacen.fila(i)[2:] for i in range(2)] == [[50.0, 2, 100.0], [60.0, 3, 180.0]]
+
+def test_cargar_historial_csv(tmp_path):
+    ruta = tmp_path / "precios.csv"
+    ruta.write_text("empresa,instante,precio\napple,200,21.5\napple,100,20\ntesla,100,7\nincompleta,1\n", encoding="utf-8")
+    historial = HistorialPrecios()
+    assert cargar_historial_csv(str(ruta), historial, str.upper) == 3
+    assert historial.precio_en("APPLE", 150.0) == 20.0
+    assert historial.precio_en("APPLE", 250.0) == 21.5
+    assert historial.ultimo_precio("TESLA") == 7.0
@@ -0,0 +1,57 @@
+import csv
+import json
+from almacen import AlmacenTransacciones
+from importacion import importar_transacciones
+
+def _rechazos(ruta) -> list:
+    with open(ruta, newline="", encoding="utf-8") as archivo:
+        return list(csv.reader(archivo))
+
+def test_importar_csv_con_rechazos(tmp_path):
+    ruta = tmp_path / "transacciones.csv"
+    ruta.write_text(
+        "usuario,accion,cantidad,instante\n"
+        "Lunatico_Pixel,apple,10,\n"
+        "intruso,APPLE,5\n"
+        "ecoerrante,MICROSOFT,5\n"
+        "navefantasma,tesla,501\n"
+        "relojoxidado,nvidia\n"
+        "circuitoazul,NVIDIA,0,ayer\n"
+        "claveoculta,Tesla,7,1700000000\n"
+        "fuego_niebla,NVIDIA,3\n",
+        encoding="utf-8",
+    )
+    ruta_rechazos = str(tmp_path / "rechazos.csv")
+    almacen = AlmacenTransacciones()
+    resumen = importar_transacciones(str(ruta), almacen, ruta_rechazos, tamano_bloque=2)
+
+    assert resumen == {"leidas": 8, "aceptadas": 3, "rechazadas": 5}
+    assert [almacen.fila(i)[:2] + [almacen.cantidades[i]] for i in range(len(almacen))] == [
+        ["Lunatico_pixel", "APPLE", 10], ["Claveoculta", "TESLA", 7], ["Fuego_niebla", "NVIDIA", 3],
+    ]
+    assert almacen.instantes[1] == 1700000000.0
+    filas = _rechazos(ruta_rechazos)
+    assert filas[0] == ["linea", "motivo", "usuario", "accion", "cantidad", "instante"]
+    assert [fila[:2] for fila in filas[1:]] == [
+        ["3", "usuario no VIP"], ["4", "acción no válida"], ["5", "cantidad no válida"],
+        ["6", "fila incompleta"], ["7", "instante no válido"],
+    ]
+
+def test_importar_jsonl(tmp_path):
+    ruta = tmp_path / "transacciones.jsonl"
+    lineas = [
+        json.dumps({"usuario": "sombra_cristal", "accion": "Apple", "cantidad": 4}),
+        "",
+        json.dumps({"usuario": "teclaerrante", "empresa": "tesla", "cantidad": "12", "instante": 1700000000}),
+        "{no es json",
+        json.dumps(["teclaerrante", "tesla", 1]),
+        json.dumps({"usuario": "teclaerrante", "cantidad": 1}),
+    ]
+    ruta.write_text("\n".join(lineas) + "\n", encoding="utf-8")
+    almacen = AlmacenTransacciones()
+    resumen = importar_transacciones(str(ruta), almacen)
+
+    assert resumen == {"leidas": 5, "aceptadas": 2, "rechazadas": 3}
+    assert [almacen.fila(i)[:2] + [almacen.cantidades[i]] for i in range(len(almacen))] == [
+        ["Sombra_cristal", "APPLE", 4], ["Teclaerrante", "TESLA", 12],
+    ]
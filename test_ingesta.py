@@ -0,0 +1,99 @@
+import asyncio
+import os
+import time
+from almacen import AlmacenTransacciones
+from almacen_sqlite import AlmacenSQLite
+from datos import usuarios_vip
+from ingesta import ServicioIngesta, enviar_transacciones
+from persistencia import AlmacenPersistente, REGISTRO
+
+class AlmacenLento(AlmacenTransacciones):
+    def agregar_lote(self, usuarios, empresas, cantidades, instantes=None):
+        time.sleep(0.002)
+        return super().agregar_lote(usuarios, empresas, cantidades, instantes)
+
+def _transacciones(cantidad: int) -> list:
+    transacciones = []
+    for i in range(cantidad):
+        transacciones += [{"usuario": usuarios_vip[i % len(usuarios_vip)], "accion": "Apple", "cantidad": i % 500 + 1}]
+    return transacciones
+
+def _ingestar(almacen, transacciones: list, **opciones) -> list:
+    async def ejecutar():
+        servicio = ServicioIngesta(almacen, **opciones)
+        puerto = await servicio.iniciar()
+        respuestas = await enviar_transacciones("127.0.0.1", puerto, transacciones)
+        await servicio.detener()
+        return [respuestas, servicio.metricas()]
+    return asyncio.run(ejecutar())
+
+def test_agrupa_en_lotes_y_responde_en_orden():
+    transacciones = _transacciones(300)
+    transacciones[10] = {"usuario": "intruso", "accion": "Apple", "cantidad": 1}
+    transacciones[20] = {"usuario": usuarios_vip[0], "accion": "Apple"}
+    almacen = AlmacenTransacciones()
+    respuestas, metricas = _ingestar(almacen, transacciones, tamano_lote=64, espera_lote=0.05)
+
+    assert respuestas[10] == {"ok": False, "motivo": "usuario no VIP"}
+    assert respuestas[20] == {"ok": False, "motivo": "fila incompleta"}
+    assert respuestas.count({"ok": True}) == 298
+    assert len(almacen) == 298
+    assert list(almacen.cantidades) == [t["cantidad"] for i, t in enumerate(transacciones) if i not in (10, 20)]
+    assert metricas["aceptadas"] == 298 and metricas["rechazadas"] == 2
+    assert 298 / 64 <= metricas["lotes"] < 298
+
+def test_contrapresion_con_cola_llena():
+    transacciones = _transacciones(200)
+    almacen = AlmacenLento()
+    respuestas, metricas = _ingestar(almacen, transacciones, tamano_lote=4, espera_lote=0, capacidad_cola=8)
+
+    assert respuestas == [{"ok": True}] * 200
+    assert metricas["esperas_por_cola_llena"] > 0
+    assert metricas["en_cola"] == 0
+    assert list(almacen.cantidades) == [t["cantidad"] for t in transacciones]
+
+def test_confirma_la_bitacora_mientras_esta_ocioso(tmp_path):
+    ruta = str(tmp_path / "bitacora.bin")
+    almacen = AlmacenPersistente(ruta)
+    almacen.bitacora.segundos_por_commit = 0.05
+    tamano_inicial = os.path.getsize(ruta)
+
+    async def ejecutar():
+        servicio = ServicioIngesta(almacen)
+        puerto = await servicio.iniciar()
+        await enviar_transacciones("127.0.0.1", puerto, _transacciones(3))
+        await asyncio.sleep(0.3)
+        tamano = os.path.getsize(ruta)
+        await servicio.detener()
+        return tamano
+    assert asyncio.run(ejecutar()) == tamano_inicial + 3 * REGISTRO.size
+    almacen.cerrar()
+
+def test_almacen_sqlite_desde_el_hilo_de_escritura(tmp_path):
+    almacen = AlmacenSQLite(str(tmp_path / "almacen.db"))
+    transacciones = _transacciones(50)
+    respuestas, metricas = _ingestar(almacen, transacciones, tamano_lote=16)
+    assert respuestas == [{"ok": True}] * 50
+    assert [fila[3] for fila in almacen.iterar()] == [t["cantidad"] for t in transacciones]
+    almacen.cerrar()
+
+def test_el_bucle_atiende_mientras_se_escribe_un_lote():
+    class AlmacenMuyLento(AlmacenTransacciones):
+        def agregar_lote(self, usuarios, empresas, cantidades, instantes=None):
+            time.sleep(0.3)
+            return super().agregar_lote(usuarios, empresas, cantidades, instantes)
+
+    async def ejecutar():
+        servicio = ServicioIngesta(AlmacenMuyLento(), espera_lote=0)
+        puerto = await servicio.iniciar()
+        escritura = asyncio.create_task(enviar_transacciones("127.0.0.1", puerto, _transacciones(1)))
+        await asyncio.sleep(0.05)
+        inicio = time.perf_counter()
+        metricas = await enviar_transacciones("127.0.0.1", puerto, [{"comando": "metricas"}])
+        demora = time.perf_counter() - inicio
+        await escritura
+        await servicio.detener()
+        return [metricas[0], demora]
+    metricas, demora = asyncio.run(ejecutar())
+    assert metricas["aceptadas"] == 0
+    assert demora < 0.15
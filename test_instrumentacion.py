@@ -0,0 +1,33 @@
+import json
+import os
+import subprocess
+import sys
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+def _ejecutar_lote(tmp_path, entorno_extra: dict) -> subprocess.CompletedProcess:
+    ruta = tmp_path / "transacciones.csv"
+    ruta.write_text("usuario,accion,cantidad\nlunatico_pixel,apple,3\nsombra_cristal,tesla,4\n", encoding="utf-8")
+    entorno = dict(os.environ)
+    entorno.pop("UTN_INSTRUMENTACION", None)
+    entorno.update(entorno_extra)
+    return subprocess.run(
+        [sys.executable, os.path.join(DIRECTORIO, "main.py"), str(ruta), "--consultas", "1"],
+        cwd=tmp_path, env=entorno, capture_output=True, text=True, check=True,
+    )
+
+def test_vuelca_llamadas_filas_y_memoria(tmp_path):
+    ruta_salida = tmp_path / "estadisticas.json"
+    _ejecutar_lote(tmp_path, {"UTN_INSTRUMENTACION": "memoria", "UTN_INSTRUMENTACION_SALIDA": str(ruta_salida)})
+    volcado = json.loads(ruta_salida.read_text(encoding="utf-8"))
+    assert volcado["memoria"] is True
+    funciones = volcado["funciones"]
+    assert funciones["consultas.total_acciones_por_usuario"]["llamadas"] == 1
+    assert funciones["consultas.total_acciones_por_usuario"]["filas"] == 2
+    assert funciones["normalizacion.normalizar_nombre_usuario"]["llamadas"] == 2
+    for estadistica in funciones.values():
+        assert estadistica["segundos"] >= estadistica["maximo"] > 0
+
+def test_desactivada_no_deja_rastro(tmp_path):
+    _ejecutar_lote(tmp_path, {})
+    assert not (tmp_path / "instrumentacion.json").exists()
@@ -0,0 +1,42 @@
+import json
+import os
+import pytest
+import main
+from consultas import CONSULTAS
+from persistencia import AlmacenPersistente, ENCABEZADO, REGISTRO
+
+def _archivo_transacciones(tmp_path) -> str:
+    ruta = tmp_path / "transacciones.csv"
+    ruta.write_text("usuario,accion,cantidad\nlunatico_pixel,apple,3\nsombra_cristal,tesla,4\nintruso,apple,1\n", encoding="utf-8")
+    return str(ruta)
+
+def test_lote_escribe_resultados_en_json(tmp_path):
+    ruta_salida = tmp_path / "resultados.json"
+    assert main.main_lote([_archivo_transacciones(tmp_path), "--consultas", "1,5", "--formato", "json", "--salida", str(ruta_salida)]) == 0
+    salida = json.loads(ruta_salida.read_text(encoding="utf-8"))
+    assert salida["carga"] == {"leidas": 3, "aceptadas": 2, "rechazadas": 1, "transacciones": 2}
+    assert salida["resultados"]["total_acciones_por_usuario"] == [["Lunatico_pixel", 3], ["Sombra_cristal", 4]]
+    assert set(salida["segundos"]) == {"carga", "total_acciones_por_usuario", CONSULTAS[5][0]}
+
+def test_lote_cierra_el_almacen_si_falla_una_consulta(tmp_path, monkeypatch):
+    def consulta_fallida(almacen, mostrar=True):
+        raise RuntimeError("falla de prueba")
+    monkeypatch.setitem(CONSULTAS, 1, ["total_acciones_por_usuario", consulta_fallida])
+    ruta_bitacora = str(tmp_path / "bitacora.bin")
+    with pytest.raises(RuntimeError):
+        main.main_lote([_archivo_transacciones(tmp_path), "--bitacora", ruta_bitacora, "--consultas", "1"])
+    reabierto = AlmacenPersistente(ruta_bitacora)
+    assert len(reabierto) == 2
+    reabierto.cerrar()
+
+def test_menu_confirma_la_bitacora_antes_de_esperar(tmp_path, monkeypatch):
+    ruta_bitacora = str(tmp_path / "bitacora.bin")
+    respuestas = iter(["1", "lunatico_pixel", "apple", "3", "", "7"])
+    tamanos = []
+    def entrada(mensaje=""):
+        if "Presione Enter" in mensaje:
+            tamanos.append(os.path.getsize(ruta_bitacora))
+        return next(respuestas)
+    monkeypatch.setattr("builtins.input", entrada)
+    main.main(ruta_bitacora)
+    assert tamanos == [ENCABEZADO.size + REGISTRO.size]
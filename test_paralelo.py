@@ -0,0 +1,12 @@
+import paralelo
+from almacen import AlmacenTransacciones
+from reporte import generar_reporte
+
+def test_paralelo_igual_a_secuencial(monkeypatch, transacciones, cargar):
+    almacen = cargar(AlmacenTransacciones(), transacciones)
+    monkeypatch.setattr(paralelo, "FILAS_MINIMAS_POR_FRAGMENTO", 500)
+    secuencial = generar_reporte(almacen, cantidad_ranking=4, percentil=75)
+    assert paralelo.generar_reporte_paralelo(almacen, procesos=3, cantidad_ranking=4, percentil=75) == secuencial
+    necesarios = ["cuantiles_transacciones"]
+    combinados = paralelo.calcular_agregados_paralelo(almacen, necesarios, procesos=3)
+    assert combinados.cuantiles_transacciones.a_diccionario() == almacen.acumulados.cuantiles_transacciones.a_diccionario()
@@ -0,0 +1,55 @@
+import os
+import time
+import pytest
+from conftest import desordenar_instantes
+from persistencia import AlmacenPersistente, BitacoraTransacciones, REGISTRO
+
+@pytest.mark.parametrize("desordenadas", [False, True])
+def test_reinicio_equivale_al_almacen_vivo(tmp_path, transacciones, cargar, estado, resultados, desordenadas):
+    if desordenadas:
+        transacciones = desordenar_instantes(transacciones)
+    ruta = str(tmp_path / "bitacora.bin")
+    vivo = cargar(AlmacenPersistente(ruta, registros_por_instantanea=1000), transacciones)
+    vivo.agregar_lote(["usuario001", "usuario002"], ["APPLE", "TESLA"], [3, 4])
+    vivo.agregar("usuario003", "NVIDIA", 5)
+    vivo.bitacora.confirmar()
+    assert vivo.registros_instantanea < len(vivo)
+
+    reabierto = AlmacenPersistente(ruta)
+    assert estado(reabierto.acumulados) == estado(vivo.acumulados)
+    assert reabierto.acumulados.mayor_por_usuario == vivo.acumulados.mayor_por_usuario
+    assert reabierto.ventanas.a_diccionario() == vivo.ventanas.a_diccionario()
+    assert resultados(reabierto) == resultados(vivo)
+    reabierto.bitacora.cerrar()
+
+    os.remove(ruta + ".instantanea.json")
+    reconstruido = AlmacenPersistente(ruta)
+    assert estado(reconstruido.acumulados) == estado(vivo.acumulados)
+    assert reconstruido.ventanas.a_diccionario() == vivo.ventanas.a_diccionario()
+    reconstruido.bitacora.cerrar()
+    vivo.cerrar()
+
+def test_registro_incompleto_se_descarta_al_reabrir(tmp_path):
+    ruta = str(tmp_path / "bitacora.bin")
+    almacen = AlmacenPersistente(ruta)
+    almacen.agregar_lote(["usuario001", "usuario002"], ["APPLE", "TESLA"], [3, 4], [1000.0, 2000.0])
+    almacen.cerrar()
+    with open(ruta, "ab") as archivo:
+        archivo.write(b"\x01\x02\x03")
+
+    reabierto = AlmacenPersistente(ruta)
+    assert len(reabierto) == 2
+    assert list(reabierto.cantidades) == [3, 4]
+    reabierto.cerrar()
+
+def test_commit_agrupado_vence_sin_nuevas_escrituras(tmp_path):
+    ruta = str(tmp_path / "bitacora.bin")
+    bitacora = BitacoraTransacciones(ruta, registros_por_commit=1000, segundos_por_commit=0.05)
+    tamano_inicial = os.path.getsize(ruta)
+    bitacora.agregar(0, 0, 1, 100, 100, 1000.0)
+    bitacora.confirmar_si_vencido()
+    assert os.path.getsize(ruta) == tamano_inicial
+    time.sleep(0.06)
+    bitacora.confirmar_si_vencido()
+    assert os.path.getsize(ruta) == tamano_inicial + REGISTRO.size
+    bitacora.cerrar()
@@ -0,0 +1,49 @@
+import random
+import pytest
+import vectorizado
+from acumulados import AgregadosIncrementales
+from almacen import AlmacenTransacciones
+
+pytest.importorskip("numpy")
+
+@pytest.fixture
+def con_numpy():
+    anterior = vectorizado.numpy_activo()
+    vectorizado.usar_numpy(True)
+    yield
+    vectorizado.usar_numpy(anterior)
+
+def _cargar_sin_instantes(transacciones: list) -> AlmacenTransacciones:
+    usuarios, empresas, cantidades, _ = transacciones
+    almacen = AlmacenTransacciones()
+    for inicio in range(0, len(usuarios), 700):
+        almacen.agregar_lote(usuarios[inicio:inicio + 700], empresas[inicio:inicio + 700], cantidades[inicio:inicio + 700])
+    return almacen
+
+def test_agregar_lote_vectorizado_igual_a_python(con_numpy, transacciones, estado, resultados):
+    vectorizado.usar_numpy(False)
+    python = _cargar_sin_instantes(transacciones)
+    vectorizado.usar_numpy(True)
+    numpy = _cargar_sin_instantes(transacciones)
+    assert list(numpy.precios) == list(python.precios)
+    assert list(numpy.totales) == list(python.totales)
+    assert estado(numpy.acumulados) == estado(python.acumulados)
+    assert resultados(numpy) == resultados(python)
+
+def test_desde_columnas_vectorizado_igual_a_python(con_numpy):
+    generador = random.Random(13)
+    columnas = [[], [], [], []]
+    for _ in range(5000):
+        columnas[0] += [generador.randrange(300)]
+        columnas[1] += [generador.randrange(40)]
+        columnas[2] += [generador.randint(1, 500)]
+        columnas[3] += [generador.randint(1, 2 ** 40)]
+    numpy = AgregadosIncrementales.desde_columnas(*columnas)
+    vectorizado.usar_numpy(False)
+    python = AgregadosIncrementales.desde_columnas(*columnas)
+    for atributo in ("acciones_por_usuario", "inversion_por_usuario", "acciones_por_empresa", "inversion_por_empresa", "tenencias"):
+        assert list(getattr(numpy, atributo).items()) == list(getattr(python, atributo).items())
+    assert numpy.inversion_total == python.inversion_total
+    assert numpy.total_acciones == python.total_acciones
+    assert numpy.mayor_por_usuario == python.mayor_por_usuario
+    assert numpy.cuantiles_transacciones.a_diccionario() == python.cuantiles_transacciones.a_diccionario()
@@ -0,0 +1,39 @@
+import math
+import time
+import pytest
+from almacen import AlmacenTransacciones
+from conftest import desordenar_instantes
+from reporte import generar_reporte, generar_reporte_ventana
+from ventanas import VentanasAgregados
+
+@pytest.mark.parametrize("desordenadas", [False, True])
+def test_ventanas_igual_a_recalculo_filtrado(transacciones, cargar, desordenadas):
+    if desordenadas:
+        transacciones = desordenar_instantes(transacciones)
+    almacen = cargar(AlmacenTransacciones(), transacciones)
+    ahora = max(almacen.instantes)
+    ventanas = almacen.ventanas
+    for duracion, fija in ((600, False), (3600, False), (86400, False), (3600, True), (86400, True)):
+        hasta = ventanas.balde(ahora)
+        if fija:
+            desde = ventanas.balde(ahora - (ahora + time.localtime(ahora).tm_gmtoff) % duracion)
+        else:
+            desde = hasta - math.ceil(duracion / ventanas.ancho_balde) + 1
+        desde = max(desde, ventanas.primer_balde())
+        filtrado = AlmacenTransacciones()
+        indices = [i for i in range(len(almacen)) if desde <= ventanas.balde(almacen.instantes[i]) <= hasta]
+        indices.sort(key=lambda i: ventanas.balde(almacen.instantes[i]))
+        filtrado.agregar_lote(
+            [almacen.nombres_usuarios[almacen.usuarios[i]] for i in indices],
+            [almacen.nombres_empresas[almacen.empresas[i]] for i in indices],
+            [almacen.cantidades[i] for i in indices],
+            [almacen.instantes[i] for i in indices],
+        )
+        esperado = generar_reporte(filtrado, cantidad_ranking=4, percentil=75)
+        assert generar_reporte_ventana(almacen, duracion, fija, ahora=ahora, cantidad_ranking=4, percentil=75) == esperado
+
+def test_desde_columnas_igual_al_anillo_vivo_con_instantes_desordenados(transacciones_desordenadas, cargar):
+    almacen = cargar(AlmacenTransacciones(), transacciones_desordenadas)
+    assert almacen.instantes[-1] < max(almacen.instantes)
+    reconstruido = VentanasAgregados.desde_columnas(almacen.instantes, almacen.usuarios, almacen.empresas, almacen.cantidades, almacen.totales)
+    assert reconstruido.a_diccionario() == almacen.ventanas.a_diccionario()
@@ -1,51 +1,119 @@
-def reconocer_numero(caracter: str) -> bool:
-    """
-    Verifica si un carácter dado es un número entre '0' y '9'.
-
-    Args:
-        caracter (str): Carácter a evaluar.
-
-    Comportamiento:
-    - Comprueba si el carácter está dentro del rango de '0' a '9'.
-    - Si el carácter es un número, devuelve True.
-    - Si no lo es, devuelve False.
-
-    Retorno:
-    - (bool): True si es un número, False en caso contrario.
-    """
-    es_numero = False
-    if '0' <= caracter <= '9':
-        es_numero = True
-    return es_numero
-
-def ordenar_alfabeticamente(lista: list, indice: int, descendente: bool = False) -> None:
-    """
-    Ordena una lista de listas alfabéticamente según el índice especificado.
-
-    Args:
-        lista (list): Lista de listas donde cada sublista contiene al menos un elemento en la posición `indice`.
-        indice (int): Posición dentro de cada sublista por la cual se realizará la ordenación.
-        descendente (bool, opcional): Define si la ordenación será de mayor a menor (Z-A). Por defecto es False (A-Z).
-
-    Comportamiento:
-    - Recorre la lista de listas y aplica el algoritmo de ordenamiento burbuja para organizar los elementos.
-    - Si `descendente` es True, ordena de Z-A; si es False, ordena de A-Z.
-    - No retorna ningún valor, ya que modifica "lista" directamente.
-
-    Retorno:
-    None
-    """
-    for i in range(len(lista) - 1):
-        for j in range(0, len(lista) - i - 1):
-            condicion_swap = False
-            if descendente:
-                if lista[j][indice] < lista[j+1][indice]:
-                    condicion_swap = True
-            else:
-                if lista[j][indice] > lista[j+1][indice]:
-                    condicion_swap = True
-            if condicion_swap:
-                aux = lista[j]
-                lista[j] = lista[j+1]
-                lista[j+1] = aux
-    return None
+import heapq
+from operator import itemgetter
+
+def reconocer_numero(caracter: str) -> bool:
+    """
+    Verifica si un carácter dado es un número entre '0' y '9'.
+
+    Args:
+        caracter (str): Carácter a evaluar.
+
+    Comportamiento:
+    - Comprueba si el carácter está dentro del rango de '0' a '9'.
+    - Si el carácter es un número, devuelve True.
+    - Si no lo es, devuelve False.
+
+    Retorno:
+    - (bool): True si es un número, False en caso contrario.
+    """
+    es_numero = False
+    if '0' <= caracter <= '9':
+        es_numero = True
+    return es_numero
+
+def _normalizar_criterios(indice, descendente) -> list:
+    """
+    Convierte `indice` / `descendente` (simples o múltiples) en una lista de criterios (indice, descendente).
+
+    Args:
+        indice (int | list | tuple): Posición o posiciones de ordenación, de la más a la menos significativa.
+        descendente (bool | list | tuple): Sentido de cada criterio; un único bool se aplica a todos.
+
+    Retorno:
+    - (list): Lista de pares [indice, descendente].
+    """
+    if isinstance(indice, int):
+        indices = [indice]
+    else:
+        indices = list(indice)
+    if isinstance(descendente, bool):
+        sentidos = [descendente] * len(indices)
+    else:
+        sentidos = list(descendente)
+        if len(sentidos) != len(indices):
+            raise ValueError("Debe indicarse un sentido de orden por cada índice.")
+    criterios = []
+    for i in range(len(indices)):
+        criterios += [[indices[i], sentidos[i]]]
+    return criterios
+
+def ordenar_alfabeticamente(lista: list, indice, descendente = False) -> None:
+    """
+    Ordena una lista de listas alfabéticamente según el índice (o los índices) especificados.
+
+    Args:
+        lista (list): Lista de listas donde cada sublista contiene al menos un elemento en la posición `indice`.
+        indice (int | list | tuple): Posición dentro de cada sublista por la cual se realizará la ordenación.
+            Si es una lista de posiciones, se ordena por la primera y se desempata con las siguientes
+            (por ejemplo [0, 1, 4] = usuario, luego empresa, luego monto).
+        descendente (bool | list | tuple, opcional): Define si la ordenación será de mayor a menor (Z-A).
+            Puede ser un bool para todos los criterios o uno por cada índice. Por defecto es False (A-Z).
+
+    Comportamiento:
+    - Usa el ordenamiento estable de Python (Timsort, O(n log n)): a igualdad de clave se conserva el orden original.
+    - La clave de cada fila se calcula una sola vez antes de ordenar.
+    - Si todos los criterios tienen el mismo sentido se ordena en una única pasada con clave compuesta;
+      si los sentidos se mezclan se ordena una vez por criterio, del menos al más significativo.
+    - No retorna ningún valor, ya que modifica "lista" directamente.
+
+    Retorno:
+    None
+    """
+    criterios = _normalizar_criterios(indice, descendente)
+    mismo_sentido = True
+    for i in range(1, len(criterios)):
+        if criterios[i][1] != criterios[0][1]:
+            mismo_sentido = False
+            break
+    if mismo_sentido:
+        indices = [criterio[0] for criterio in criterios]
+        lista.sort(key=itemgetter(*indices), reverse=criterios[0][1])
+    else:
+        for i in range(len(criterios) - 1, -1, -1):
+            lista.sort(key=itemgetter(criterios[i][0]), reverse=criterios[i][1])
+    return None
+
+def primeros_ordenados(lista: list, indice, cantidad: int, descendente = False) -> list:
+    """
+    Devuelve las primeras `cantidad` filas que resultarían de ordenar `lista`, sin ordenarla completa.
+
+    Args:
+        lista (list): Lista de listas a consultar (no se modifica).
+        indice (int | list | tuple): Igual que en `ordenar_alfabeticamente`.
+        cantidad (int): Cantidad de filas a devolver.
+        descendente (bool | list | tuple, opcional): Igual que en `ordenar_alfabeticamente`.
+
+    Comportamiento:
+    - Con un único sentido de orden usa un heap acotado (`heapq.nsmallest` / `heapq.nlargest`), O(n log k).
+    - El resultado es idéntico (incluido el desempate estable) a ordenar toda la lista y cortar los primeros k.
+    - Si los sentidos se mezclan, ordena una copia y la recorta.
+
+    Retorno:
+    - (list): Lista con a lo sumo `cantidad` filas, en orden.
+    """
+    if cantidad <= 0:
+        return []
+    criterios = _normalizar_criterios(indice, descendente)
+    mismo_sentido = True
+    for i in range(1, len(criterios)):
+        if criterios[i][1] != criterios[0][1]:
+            mismo_sentido = False
+            break
+    if not mismo_sentido or cantidad >= len(lista):
+        copia = list(lista)
+        ordenar_alfabeticamente(copia, indice, descendente)
+        return copia[:cantidad]
+    clave = itemgetter(*[criterio[0] for criterio in criterios])
+    if criterios[0][1]:
+        return heapq.nlargest(cantidad, lista, key=clave)
+    return heapq.nsmallest(cantidad, lista, key=clave)
@@ -0,0 +1,132 @@
+import os
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_numpy_activo = np is not None and os.environ.get("UTN_NUMPY", "") == "1"
+
+def numpy_disponible() -> bool:
+    """
+    Indica si NumPy está instalado.
+
+    Retorno:
+    - (bool): True si NumPy se pudo importar.
+    """
+    return np is not None
+
+def numpy_activo() -> bool:
+    """
+    Indica si los cálculos masivos deben usar el backend de NumPy.
+
+    Comportamiento:
+    - Por defecto se usa el camino en Python puro; se activa con la variable de entorno UTN_NUMPY=1
+      o llamando a `usar_numpy(True)`.
+
+    Retorno:
+    - (bool): True si el backend de NumPy está seleccionado.
+    """
+    return _numpy_activo
+
+def usar_numpy(activar: bool) -> None:
+    """
+    Selecciona en tiempo de ejecución el backend de cálculo.
+
+    Args:
+        activar (bool): True para usar NumPy, False para Python puro.
+
+    Comportamiento:
+    - Si se pide NumPy y no está instalado, lanza RuntimeError.
+
+    Retorno:
+    None
+    """
+    global _numpy_activo
+    if activar and np is None:
+        raise RuntimeError("NumPy no está instalado; no se puede activar el backend vectorizado.")
+    _numpy_activo = activar
+    return None
+
+def calcular_precios_y_totales(ids_empresas, cantidades, precios_por_id: list) -> list:
+    """
+    Obtiene precio unitario y total invertido de un bloque de filas con dos operaciones vectoriales.
+
+    Args:
+        ids_empresas (sequence): Ids de empresa de cada fila.
+        cantidades (sequence): Cantidad de acciones de cada fila.
+        precios_por_id (list): Precio de cada empresa en centavos, indexado por id.
+
+    Comportamiento:
+    - Los precios se obtienen por indexación avanzada (`precios_por_id[ids_empresas]`).
+    - Los totales son una única multiplicación vectorial en int64, idéntica al producto fila por fila.
+
+    Retorno:
+    - (list): [precios, totales] como arreglos int64 de NumPy (centavos).
+    """
+    precios = np.asarray(precios_por_id, dtype=np.int64)[np.asarray(ids_empresas, dtype=np.intp)]
+    totales = precios * np.asarray(cantidades, dtype=np.int64)
+    return [precios, totales]
+
+def sumas_por_clave(claves, valores, enteros: bool = False) -> dict:
+    """
+    Suma `valores` por clave entera no negativa.
+
+    Args:
+        claves (sequence): Claves enteras (ids) de cada fila.
+        valores (sequence): Valores a sumar.
+        enteros (bool, opcional): Si es True, los valores son enteros (acciones o centavos) y se suman en int64.
+
+    Comportamiento:
+    - Con `enteros`, acumula en int64 con `np.add.at` sobre el índice de cada clave entre las claves
+      distintas: la suma entera es exacta (no pasa por float64, que sólo es exacto hasta 2**53).
+    - Si no, usa `np.bincount`, que acumula en float64 en el orden de las filas partiendo de 0.0, por
+      lo que cada suma coincide bit a bit con la acumulación secuencial en Python.
+    - El diccionario resultante respeta el orden de primera aparición de cada clave.
+
+    Retorno:
+    - (dict): clave -> suma.
+    """
+    claves_np = np.asarray(claves, dtype=np.intp)
+    if len(claves_np) == 0:
+        return {}
+    unicas, primeras, posiciones = np.unique(claves_np, return_index=True, return_inverse=True)
+    orden = np.argsort(primeras, kind="stable")
+    if enteros:
+        sumas = np.zeros(len(unicas), dtype=np.int64)
+        np.add.at(sumas, posiciones.ravel(), np.asarray(valores, dtype=np.int64))
+    else:
+        sumas = np.bincount(posiciones.ravel(), weights=np.asarray(valores, dtype=np.float64), minlength=len(unicas))
+    return dict(zip(unicas[orden].tolist(), sumas[orden].tolist()))
+
+def sumas_por_par(claves_a, claves_b, valores) -> dict:
+    """
+    Suma `valores` por par de claves enteras (por ejemplo, usuario y empresa).
+
+    Comportamiento:
+    - Codifica cada par como la clave única `a * (max(b) + 1) + b` y reutiliza `sumas_por_clave`.
+
+    Retorno:
+    - (dict): (a, b) -> suma entera, en orden de primera aparición del par.
+    """
+    claves_b_np = np.asarray(claves_b, dtype=np.intp)
+    if len(claves_b_np) == 0:
+        return {}
+    base = int(claves_b_np.max()) + 1
+    claves_pares = np.asarray(claves_a, dtype=np.intp) * base + claves_b_np
+    sumas = {}
+    for clave, suma in sumas_por_clave(claves_pares, valores, enteros=True).items():
+        sumas[(clave // base, clave % base)] = suma
+    return sumas
+
+def suma_entera(valores) -> int:
+    """
+    Suma una columna de enteros (por ejemplo, totales en centavos) en int64.
+
+    Comportamiento:
+    - La suma entera es exacta, así que el orden de acumulación de `np.sum` no cambia el resultado.
+
+    Retorno:
+    - (int): Suma de los valores.
+    """
+    return int(np.asarray(valores, dtype=np.int64).sum())
@@ -0,0 +1,276 @@
+import time
+from math import ceil
+from acumulados import SumasParciales, AgregadosIncrementales
+from cuantiles import SketchCuantiles
+
+ANCHO_BALDE = 60
+CANTIDAD_BALDES = 1440
+
+class VentanasAgregados:
+    """
+    Agregados de la cartera por ventana de tiempo, sobre un anillo de baldes con sumas parciales.
+
+    Args:
+        ancho_balde (int, opcional): Segundos que cubre cada balde (resolución de las ventanas).
+        cantidad_baldes (int, opcional): Baldes del anillo. Con los valores por defecto (60 s x 1440)
+            se conservan las últimas 24 horas.
+
+    Comportamiento:
+    - Cada balde guarda unas `SumasParciales` con las transacciones de su intervalo
+      [n * ancho, (n + 1) * ancho), más la cantidad de filas. Registrar una transacción es O(1) y no
+      mantiene la mayor tenencia por usuario: se deriva sólo al consultar una ventana.
+    - Los baldes se alinean a la época Unix, y el anillo se indexa por número de balde módulo `cantidad_baldes`.
+    - Al llegar una transacción de un balde más nuevo que el último, el anillo avanza y vacía los baldes
+      que quedan fuera. Una transacción anterior al balde más viejo conservado se ignora: queda en el
+      almacén, pero ya no entra en ninguna ventana.
+    - Una ventana se resuelve combinando los baldes que cubre, en orden cronológico: el costo depende
+      de la cantidad de baldes (y de claves distintas en cada uno), no de la cantidad de transacciones.
+    - Las ventanas tienen la resolución de un balde: el balde del instante inicial y el del actual se
+      incluyen completos.
+    """
+
+    def __init__(self, ancho_balde: int = ANCHO_BALDE, cantidad_baldes: int = CANTIDAD_BALDES) -> None:
+        self.ancho_balde = ancho_balde
+        self.cantidad_baldes = cantidad_baldes
+        self.baldes = [None] * cantidad_baldes
+        self.filas = [0] * cantidad_baldes
+        self.ultimo_balde = None
+
+    def balde(self, instante: float) -> int:
+        """
+        Número de balde (absoluto, desde la época Unix) de un instante.
+
+        Retorno:
+        - (int): Número de balde.
+        """
+        return int(instante // self.ancho_balde)
+
+    def primer_balde(self) -> int:
+        """
+        Número del balde más viejo que conserva el anillo.
+
+        Retorno:
+        - (int): Número de balde, o None si todavía no se registró ninguna transacción.
+        """
+        if self.ultimo_balde is None:
+            return None
+        return self.ultimo_balde - self.cantidad_baldes + 1
+
+    def _avanzar(self, balde: int) -> None:
+        """
+        Mueve el final del anillo hasta `balde`, vaciando los baldes que dejan de estar cubiertos.
+
+        Retorno:
+        None
+        """
+        if self.ultimo_balde is None or balde - self.ultimo_balde >= self.cantidad_baldes:
+            self.baldes = [None] * self.cantidad_baldes
+            self.filas = [0] * self.cantidad_baldes
+        else:
+            for numero in range(self.ultimo_balde + 1, balde + 1):
+                self.baldes[numero % self.cantidad_baldes] = None
+                self.filas[numero % self.cantidad_baldes] = 0
+        self.ultimo_balde = balde
+        return None
+
+    def registrar(self, instante: float, id_usuario: int, id_empresa: int, cantidad: int, total: int) -> None:
+        """
+        Suma una transacción al balde de su instante.
+
+        Args:
+            instante (float): Momento de la transacción (segundos desde la época Unix).
+            id_usuario, id_empresa, cantidad, total: Igual que en `SumasParciales.registrar`.
+
+        Retorno:
+        None
+        """
+        balde = int(instante // self.ancho_balde)
+        if self.ultimo_balde is None or balde > self.ultimo_balde:
+            self._avanzar(balde)
+        elif balde <= self.ultimo_balde - self.cantidad_baldes:
+            return None
+        posicion = balde % self.cantidad_baldes
+        agregados = self.baldes[posicion]
+        if agregados is None:
+            agregados = SumasParciales()
+            self.baldes[posicion] = agregados
+        agregados.registrar(id_usuario, id_empresa, cantidad, total)
+        self.filas[posicion] += 1
+        return None
+
+    def registrar_bloque(self, instante: float, bloque: SumasParciales, totales) -> None:
+        """
+        Suma al balde de `instante` un bloque de transacciones que comparten ese instante, ya agregado.
+
+        Args:
+            instante (float): Instante común del bloque (por ejemplo, una importación sin instantes).
+            bloque (SumasParciales): Sumas del bloque (sin sketch).
+            totales (sequence): Total invertido de cada transacción del bloque, en orden, para el sketch de cuantiles.
+
+        Retorno:
+        None
+        """
+        if not len(totales):
+            return None
+        balde = int(instante // self.ancho_balde)
+        if self.ultimo_balde is None or balde > self.ultimo_balde:
+            self._avanzar(balde)
+        elif balde <= self.ultimo_balde - self.cantidad_baldes:
+            return None
+        posicion = balde % self.cantidad_baldes
+        if self.baldes[posicion] is None:
+            self.baldes[posicion] = SumasParciales()
+        self.baldes[posicion].combinar(bloque)
+        self.baldes[posicion].cuantiles_transacciones.extender(totales)
+        self.filas[posicion] += len(totales)
+        return None
+
+    def combinar_baldes(self, desde: int, hasta: int) -> list:
+        """
+        Combina los baldes numerados de `desde` a `hasta` (ambos incluidos), en orden cronológico.
+
+        Comportamiento:
+        - El rango se recorta a los baldes que conserva el anillo.
+        - No deriva la mayor tenencia por usuario (ver `reporte.completar_mayores`).
+        - Los sketches de cuantiles de los baldes con menos de unos k valores se combinan sin compactar
+          (`SketchCuantiles.combinar`): con los instantes en orden de registro, la ventana da los mismos
+          percentiles que un sketch armado sólo con sus filas.
+
+        Retorno:
+        - (list): [agregados combinados (AgregadosIncrementales), cantidad de filas].
+        """
+        combinados = AgregadosIncrementales()
+        cantidad_filas = 0
+        if self.ultimo_balde is not None:
+            for numero in range(max(desde, self.primer_balde()), min(hasta, self.ultimo_balde) + 1):
+                agregados = self.baldes[numero % self.cantidad_baldes]
+                if agregados is not None:
+                    combinados.combinar(agregados)
+                    cantidad_filas += self.filas[numero % self.cantidad_baldes]
+        return [combinados, cantidad_filas]
+
+    def _validar_duracion(self, duracion: float) -> None:
+        """
+        Verifica que una ventana de `duracion` segundos entre en el anillo.
+
+        Retorno:
+        None
+        """
+        if duracion <= 0:
+            raise ValueError("La duración de la ventana debe ser positiva.")
+        if duracion > self.ancho_balde * self.cantidad_baldes:
+            raise ValueError(f"La ventana supera los {self.ancho_balde * self.cantidad_baldes} segundos que conservan los baldes.")
+        return None
+
+    def deslizante(self, duracion: float, ahora: float = None) -> list:
+        """
+        Agregados de la ventana deslizante de los últimos `duracion` segundos hasta `ahora`.
+
+        Args:
+            duracion (float): Largo de la ventana en segundos (por ejemplo 3600 para la última hora).
+            ahora (float, opcional): Fin de la ventana. Por defecto, el instante actual.
+
+        Retorno:
+        - (list): [agregados (AgregadosIncrementales), cantidad de filas].
+        """
+        self._validar_duracion(duracion)
+        if ahora is None:
+            ahora = time.time()
+        hasta = self.balde(ahora)
+        return self.combinar_baldes(hasta - ceil(duracion / self.ancho_balde) + 1, hasta)
+
+    def fija(self, duracion: float, ahora: float = None) -> list:
+        """
+        Agregados de la ventana fija (tumbling) de `duracion` segundos que contiene a `ahora`.
+
+        Args:
+            duracion (float): Largo de los períodos en segundos (por ejemplo 86400 para "hoy").
+            ahora (float, opcional): Instante dentro del período. Por defecto, el instante actual.
+
+        Comportamiento:
+        - Los períodos se alinean a la hora local: con 86400 el período empieza a la medianoche local,
+          con 3600 en la hora en punto. Cubre desde el inicio del período hasta `ahora`.
+
+        Retorno:
+        - (list): [agregados (AgregadosIncrementales), cantidad de filas].
+        """
+        self._validar_duracion(duracion)
+        if ahora is None:
+            ahora = time.time()
+        inicio = ahora - (ahora + time.localtime(ahora).tm_gmtoff) % duracion
+        return self.combinar_baldes(self.balde(inicio), self.balde(ahora))
+
+    def a_diccionario(self) -> dict:
+        """
+        Representación serializable (JSON) del anillo, con sólo los baldes no vacíos.
+
+        Retorno:
+        - (dict): Dimensiones del anillo, último balde y, por cada balde, su número, filas y sumas.
+        """
+        baldes = []
+        if self.ultimo_balde is not None:
+            for numero in range(self.primer_balde(), self.ultimo_balde + 1):
+                sumas = self.baldes[numero % self.cantidad_baldes]
+                if sumas is not None:
+                    baldes += [{
+                        "numero": numero,
+                        "filas": self.filas[numero % self.cantidad_baldes],
+                        "acciones_por_usuario": list(sumas.acciones_por_usuario.items()),
+                        "inversion_por_usuario": list(sumas.inversion_por_usuario.items()),
+                        "acciones_por_empresa": list(sumas.acciones_por_empresa.items()),
+                        "inversion_por_empresa": list(sumas.inversion_por_empresa.items()),
+                        "tenencias": [[par[0], par[1], tenencia] for par, tenencia in sumas.tenencias.items()],
+                        "inversion_total": sumas.inversion_total,
+                        "total_acciones": sumas.total_acciones,
+                        "cuantiles_transacciones": sumas.cuantiles_transacciones.a_diccionario(),
+                    }]
+        return {"ancho_balde": self.ancho_balde, "cantidad_baldes": self.cantidad_baldes, "ultimo_balde": self.ultimo_balde, "baldes": baldes}
+
+    @classmethod
+    def desde_diccionario(cls, contenido: dict) -> "VentanasAgregados":
+        """
+        Reconstruye un anillo guardado con `a_diccionario`.
+
+        Retorno:
+        - (VentanasAgregados): Anillo equivalente al guardado.
+        """
+        ventanas = cls(contenido["ancho_balde"], contenido["cantidad_baldes"])
+        ventanas.ultimo_balde = contenido["ultimo_balde"]
+        for balde in contenido["baldes"]:
+            sumas = SumasParciales()
+            for nombre in ("acciones_por_usuario", "inversion_por_usuario", "acciones_por_empresa", "inversion_por_empresa"):
+                destino = getattr(sumas, nombre)
+                for clave, valor in balde[nombre]:
+                    destino[clave] = valor
+            for id_usuario, id_empresa, tenencia in balde["tenencias"]:
+                sumas.tenencias[(id_usuario, id_empresa)] = tenencia
+            sumas.inversion_total = balde["inversion_total"]
+            sumas.total_acciones = balde["total_acciones"]
+            sumas.cuantiles_transacciones = SketchCuantiles.desde_diccionario(balde["cuantiles_transacciones"])
+            ventanas.baldes[balde["numero"] % ventanas.cantidad_baldes] = sumas
+            ventanas.filas[balde["numero"] % ventanas.cantidad_baldes] = balde["filas"]
+        return ventanas
+
+    @classmethod
+    def desde_columnas(cls, instantes, usuarios, empresas, cantidades, totales, ancho_balde: int = ANCHO_BALDE, cantidad_baldes: int = CANTIDAD_BALDES) -> "VentanasAgregados":
+        """
+        Reconstruye el anillo a partir de las columnas completas de un almacén.
+
+        Comportamiento:
+        - Toma como referencia el instante más reciente de la columna (no el de la última fila: un almacén
+          puede tener filas fuera de orden) y registra, en orden de registro, todas las filas que caen en
+          los baldes que conservaría el anillo, igual que `AlmacenSQLite._reconstruir_ventanas`.
+        - Recorre la columna de instantes completa (O(n)), pero sólo registra las filas recientes.
+        - Es el camino de respaldo: normalmente el anillo se restaura desde la instantánea (`desde_diccionario`).
+
+        Retorno:
+        - (VentanasAgregados): Anillo equivalente a registrar fila por fila.
+        """
+        ventanas = cls(ancho_balde, cantidad_baldes)
+        if len(instantes):
+            ventanas._avanzar(ventanas.balde(max(instantes)))
+            limite = ventanas.primer_balde() * ancho_balde
+            for i in range(len(instantes)):
+                if instantes[i] >= limite:
+                    ventanas.registrar(instantes[i], usuarios[i], empresas[i], cantidades[i], totales[i])
+        return ventanas